@@ -7,19 +7,86 @@ from flask import (
     url_for,
     jsonify,
     Response,
+    abort,
 )
+from flask.json.provider import DefaultJSONProvider
 import csv
 import io
 import json
+import os
+import queue
 
 from utils.search_utils import filter_data, query_data
-from utils.validation import validate_rows
-from config import DEFAULT_DATABASE, READ_ONLY
+from utils.validation import validate_delta, validate_rows
+from config import (
+    COMPRESS_MIN_SIZE,
+    DEFAULT_DATABASE,
+    JOURNAL_DIR,
+    LARGE_TABLE_ROWS,
+    READ_ONLY,
+    WATCH_INTERVAL,
+)
 from utils.db import connect_sql_server
 from utils.units import mm_to_inch, inch_to_mm
-from backup_db import backup_database
+from utils import catalog
+from utils.anchor_catalog import FACETS, build_anchor_catalog, browse
+from utils.availability import LEVELS as AVAILABILITY_LEVELS
+from utils.availability import AvailabilityCube, parse_selection
+from utils.change_watch import ChangeWatcher, subscribe, unsubscribe
+from utils.connectors import TABLES as CONNECTOR_TABLES
+from utils.connectors import (
+    build_connector_catalog,
+    lookup_connector,
+    lookup_connectors,
+    verify_connectors,
+)
+from utils.bolt_sets import build_set_index, lookup_set, unresolved_sets
+from utils.distances import (
+    DISTANCE_TABLES,
+    build_distance_table,
+    lookup_distances,
+)
+from utils.duplicates import TOLERANCES, analyze_table
+from utils.export import FORMATS as EXPORT_FORMATS
+from utils.export import check_format, column_kinds, iter_batches, iter_export
+from utils.federated import plan_queries, run_queries
+from utils.fuzzy_index import TrigramIndex
+from utils.grip_length import build_grip_index, select_length, select_lengths
+from utils.http_cache import BodyCache, choose_encoding, table_etag
+from utils.journal import Journal, inverse_delta, parse_time
+from utils.row_keys import build_delta, natural_key, row_version
+from utils.rows import Row, fetch_rows
+from utils.schema import SchemaCatalog, column_types, identity_column
+from utils.table_cache import bump_version, get_cached, sync_versions, update_cached
+
+
+class RowJSONProvider(DefaultJSONProvider):
+    """JSON provider that also serializes :class:`utils.rows.Row`."""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, Row):
+            return o.copy()
+        return DefaultJSONProvider.default(o)
+
 
 app = Flask(__name__)
+app.json = RowJSONProvider(app)
+
+SETOFBOLTS_FILE = f"{DEFAULT_DATABASE}__SetOfBolts.json"
+SETNUTSBOLTS_FILE = f"{DEFAULT_DATABASE}__SetNutsBolts.json"
+SCREWNEW_FILE = f"{DEFAULT_DATABASE}__ScrewNew.json"
+ANCHORSNAME_FILE = f"{DEFAULT_DATABASE}__AnchorsName.json"
+ANCHORSDEFINITION_FILE = f"{DEFAULT_DATABASE}__AnchorsDefinition.json"
+SETBOLTS_FILE = f"{DEFAULT_DATABASE}__SetBolts.json"
+AVAILABILITY_FILES = [SETOFBOLTS_FILE, SCREWNEW_FILE]
+CONNECTOR_FILES = [f"{DEFAULT_DATABASE}__{t}.json" for t in CONNECTOR_TABLES]
+HEARTBEAT_SECONDS = 15
+
+journal = Journal(JOURNAL_DIR)
+response_bodies = BodyCache()
+# Looked up at call time so tests can replace connect_sql_server.
+schema_catalog = SchemaCatalog(lambda database: connect_sql_server(database))
 
 
 def parse_sql_path(filename: str):
@@ -29,25 +96,243 @@ def parse_sql_path(filename: str):
     return db_part, table
 
 
+def database_schema(database: str):
+    """Return the cached schema of ``database``, or ``None`` if it cannot be read."""
+    try:
+        return schema_catalog.get(database)
+    except Exception:
+        return None
+
+
+def table_schema(filename: str):
+    """Return the schema of the table behind ``filename``, or ``None``."""
+    db, table = parse_sql_path(filename)
+    tables = database_schema(db)
+    return tables.get(table) if tables else None
+
+
 def load_table_data(filename: str):
-    """Load table rows directly from SQL."""
+    """Load table rows from the preloaded catalog or directly from SQL."""
+    rows = catalog.get_rows(filename)
+    if rows is not None:
+        return rows
     db, table = parse_sql_path(filename)
     conn, cur = connect_sql_server(db)
     cur.execute(f"SELECT * FROM [{table}]")
-    columns = [c[0] for c in cur.description]
-    rows = [dict(zip(columns, r)) for r in cur.fetchall()]
+    rows = fetch_rows(cur)
     conn.close()
     return rows
 
 
 def save_table_data(filename: str, json_string: str) -> None:
-    """Save table rows directly to the SQL table."""
+    """Save table rows to SQL, writing only the rows that differ.
+
+    The submitted rows are compared with the table by key column so untouched
+    rows are never rewritten or locked.
+    """
     rows = json.loads(json_string)
     validate_rows(rows)
+    current = load_table_data(filename)
+    key_columns = table_key_columns(filename, rows or current)
+    if key_columns:
+        apply_table_delta(filename, build_delta(current, rows, key_columns))
+
+
+def fetch_row(cur, table: str, key_columns, key_values, lock: bool = False):
+    """Return the row of ``table`` matching ``key_values`` or ``None``.
+
+    ``lock`` takes an update row lock so the row cannot change before the
+    surrounding transaction ends.
+    """
+    hint = " WITH (UPDLOCK, ROWLOCK)" if lock else ""
+    where = " AND ".join(f"[{c}]=?" for c in key_columns)
+    cur.execute(f"SELECT * FROM [{table}]{hint} WHERE {where}", list(key_values))
+    found = fetch_rows(cur)
+    return found[0].copy() if found else None
+
+
+def fetch_inserted(cur, table: str, key_columns, row: dict):
+    """Return the row just inserted from ``row``, or ``None``.
+
+    A key column missing from ``row`` is taken to be an IDENTITY column and
+    its value is read back with ``@@IDENTITY``; ``SCOPE_IDENTITY()`` is
+    empty here because each statement runs in its own scope.
+    """
+    missing = [c for c in key_columns if row.get(c) is None]
+    if not missing:
+        return fetch_row(cur, table, key_columns, [row[c] for c in key_columns])
+    if len(missing) > 1:
+        return None
+    cur.execute("SELECT @@IDENTITY")
+    found = cur.fetchone()
+    if not found or found[0] is None:
+        return None
+    key = dict(row, **{missing[0]: int(found[0])})
+    return fetch_row(cur, table, key_columns, [key[c] for c in key_columns])
+
+
+def with_key(row: dict, added, key_columns) -> dict:
+    """Return ``row`` with the key values the database assigned to ``added``."""
+    if added is None:
+        return row
+    return dict(row, **{c: added.get(c) for c in key_columns})
+
+
+def apply_table_delta(filename: str, delta: dict, undo_of=None) -> dict:
+    """Apply keyed add/replace/remove ops to the SQL table in one transaction.
+
+    Only the rows and columns named in ``delta`` are touched. Replace and
+    remove ops carrying a ``version`` token are checked against the current
+    row (read with an update row lock) and skipped as conflicts when the row
+    changed or disappeared since it was loaded; ops without a token whose
+    key matches no row are reported as ``not found``. The applied ops are recorded
+    in the change journal with their before images; ``undo_of`` lists the
+    journal entries this delta reverts.
+
+    Returns the number of rows added, updated and removed, the conflicts,
+    the new version tokens of updated rows and the journal entry id.
+    """
+    validate_delta(delta)
+    key_columns = delta['key']
     db, table = parse_sql_path(filename)
     conn, cur = connect_sql_server(db)
-    cur.execute(f"DELETE FROM [{table}]")
-    for row in rows:
+    where = " AND ".join(f"[{c}]=?" for c in key_columns)
+    counts = {'add': 0, 'replace': 0, 'remove': 0}
+    conflicts = []
+    versions = []
+    applied = []
+    removed_rows = []
+    added_rows = []
+
+    conn.autocommit = False
+    try:
+        if undo_of and any(op['op'] == 'add' for op in delta['ops']):
+            # Restored rows keep their original IDENTITY values.
+            cur.execute(
+                f"IF OBJECTPROPERTY(OBJECT_ID('[{table}]'), 'TableHasIdentity') = 1 "
+                f"SET IDENTITY_INSERT [{table}] ON"
+            )
+        for op in delta['ops']:
+            action = op['op']
+            if action == 'add':
+                row = op['value']
+                cols = list(row.keys())
+                placeholders = ",".join("?" for _ in cols)
+                col_names = ",".join(f"[{c}]" for c in cols)
+                cur.execute(
+                    f"INSERT INTO [{table}] ({col_names}) VALUES ({placeholders})",
+                    [row[c] for c in cols],
+                )
+                added = fetch_inserted(cur, table, key_columns, row)
+                applied.append({
+                    'op': 'add',
+                    'value': with_key(row, added, key_columns),
+                    'version': row_version(added) if added else None,
+                })
+                added_rows.append(added or row)
+                counts[action] += 1
+                continue
+
+            key_values = [op['key'][c] for c in key_columns]
+            current = fetch_row(cur, table, key_columns, key_values, lock=True)
+            if 'version' in op and (
+                current is None or row_version(current) != op['version']
+            ):
+                conflicts.append({
+                    'key': op['key'],
+                    'reason': 'deleted' if current is None else 'modified',
+                    'current': current,
+                })
+                continue
+            if current is None:
+                # Nothing to update or remove; say so instead of counting it.
+                conflicts.append({'key': op['key'], 'reason': 'not found', 'current': None})
+                continue
+            if action == 'remove':
+                cur.execute(f"DELETE FROM [{table}] WHERE {where}", key_values)
+                applied.append({'op': 'remove', 'key': op['key'], 'before': current})
+                removed_rows.append(current)
+            elif op['value']:
+                cols = list(op['value'].keys())
+                assignments = ",".join(f"[{c}]=?" for c in cols)
+                cur.execute(
+                    f"UPDATE [{table}] SET {assignments} WHERE {where}",
+                    [op['value'][c] for c in cols] + key_values,
+                )
+                new_key = {c: op['value'].get(c, op['key'][c]) for c in key_columns}
+                updated = fetch_row(cur, table, key_columns, new_key.values())
+                if updated is not None:
+                    version = row_version(updated)
+                    if 'version' in op:
+                        versions.append({'key': new_key, 'version': version})
+                    applied.append({
+                        'op': 'replace',
+                        'key': op['key'],
+                        'before': {c: current.get(c) for c in cols},
+                        'value': op['value'],
+                        'version': version,
+                    })
+                    removed_rows.append(current)
+                    added_rows.append(updated)
+            counts[action] += 1
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    bump_version(filename)
+    update_indexes(filename, removed_rows, added_rows)
+    entry = journal.record(filename, key_columns, applied, undo_of)
+    return {
+        'added': counts['add'],
+        'updated': counts['replace'],
+        'removed': counts['remove'],
+        'conflicts': conflicts,
+        'versions': versions,
+        'entry': entry,
+    }
+
+
+def update_indexes(filename: str, removed=(), added=()) -> None:
+    """Apply rows written through the app to the indexes updated in place.
+
+    Call right after ``bump_version(filename)``. Indexes that were already
+    stale are left to be rebuilt on their next use.
+    """
+    if filename in AVAILABILITY_FILES:
+        table = parse_sql_path(filename)[1]
+
+        def update(cube):
+            for row in removed:
+                cube.remove(table, row)
+            for row in added:
+                cube.add(table, row)
+
+        update_cached('availability', AVAILABILITY_FILES, filename, update)
+
+
+def table_key_columns(filename: str, rows) -> list:
+    """Return the columns the editor uses to key rows of ``filename``.
+
+    The table's primary key is used when it has one, otherwise its natural key.
+    """
+    if not rows:
+        return []
+    info = table_schema(filename)
+    if info and info['primary_key']:
+        return list(info['primary_key'])
+    _, table = parse_sql_path(filename)
+    return natural_key(table, list(rows[0].keys()))
+
+
+def insert_row(filename: str, row: dict) -> None:
+    """Insert a single row into the SQL table."""
+    validate_rows([row])
+    db, table = parse_sql_path(filename)
+    key_columns = table_key_columns(filename, [row])
+    conn, cur = connect_sql_server(db)
+    try:
         cols = list(row.keys())
         placeholders = ",".join("?" for _ in cols)
         col_names = ",".join(f"[{c}]" for c in cols)
@@ -56,101 +341,412 @@ def save_table_data(filename: str, json_string: str) -> None:
             f"INSERT INTO [{table}] ({col_names}) VALUES ({placeholders})",
             values,
         )
-    conn.close()
-
-
-def insert_row(filename: str, row: dict) -> None:
-    """Insert a single row into the SQL table."""
-    validate_rows([row])
-    db, table = parse_sql_path(filename)
-    conn, cur = connect_sql_server(db)
-    cols = list(row.keys())
-    placeholders = ",".join("?" for _ in cols)
-    col_names = ",".join(f"[{c}]" for c in cols)
-    values = [row[c] for c in cols]
-    cur.execute(
-        f"INSERT INTO [{table}] ({col_names}) VALUES ({placeholders})",
-        values,
-    )
-    conn.close()
+        added = fetch_inserted(cur, table, key_columns, row)
+    finally:
+        conn.close()
+    bump_version(filename)
+    update_indexes(filename, added=[added or row])
+    journal.record(filename, key_columns, [{
+        'op': 'add',
+        'value': with_key(row, added, key_columns),
+        'version': row_version(added) if added else None,
+    }])
 
 
 def delete_row(filename: str, row_id: int) -> None:
     """Delete a row from the SQL table by ID."""
     db, table = parse_sql_path(filename)
     conn, cur = connect_sql_server(db)
+    before = fetch_row(cur, table, ['ID'], [row_id])
     cur.execute(f"DELETE FROM [{table}] WHERE ID=?", (row_id,))
     conn.close()
+    bump_version(filename)
+    if before is not None:
+        update_indexes(filename, removed=[before])
+        journal.record(filename, ['ID'], [
+            {'op': 'remove', 'key': {'ID': row_id}, 'before': before}
+        ])
+
+
+def undo_changes(entry_ids=None, since=None, until=None, table=None) -> list:
+    """Revert journal entries by applying their inverse deltas, newest first.
+
+    Either ``entry_ids`` or a time range (epoch seconds, optionally limited
+    to ``table``) selects the entries. A range skips undo entries and
+    entries that were already undone; naming an undo entry explicitly redoes
+    the edit it reverted. Rows changed again after an entry are reported as
+    conflicts and left untouched.
+
+    Returns one result per reverted entry.
+    """
+    if entry_ids:
+        entries = [journal.get(i) for i in entry_ids]
+        missing = [i for i, e in zip(entry_ids, entries) if e is None]
+        if missing:
+            raise ValueError(f"unknown journal entries: {missing}")
+    else:
+        undone = journal.undone()
+        entries = [
+            e for e in journal.entries(table, since, until)
+            if 'undo_of' not in e and e['id'] not in undone
+        ]
+    results = []
+    for entry in sorted(entries, key=lambda e: e['id'], reverse=True):
+        result = apply_table_delta(
+            entry['table'], inverse_delta(entry), undo_of=[entry['id']]
+        )
+        result['undone'] = entry['id']
+        results.append(result)
+    return results
+
+
+def get_bolt_set_index():
+    """Return resolved SetOfBolts assemblies indexed by set key."""
+    return get_cached(
+        'bolt_sets',
+        [SETOFBOLTS_FILE, SETNUTSBOLTS_FILE],
+        lambda: build_set_index(
+            load_table_data(SETOFBOLTS_FILE),
+            load_table_data(SETNUTSBOLTS_FILE),
+        ),
+    )
+
+
+def make_change_watcher():
+    """Return a watcher for changes made outside the app, or ``None`` if disabled."""
+    if not WATCH_INTERVAL:
+        return None
+    from backup_db import get_data_dir
+
+    return ChangeWatcher(
+        lambda: connect_sql_server(DEFAULT_DATABASE),
+        DEFAULT_DATABASE,
+        get_data_dir() / "AstorBase.mdf",
+        WATCH_INTERVAL,
+    )
+
+
+@app.before_request
+def sync_table_versions():
+    """Pick up writes made by other worker processes."""
+    sync_versions()
+
+
+@app.url_value_preprocessor
+def check_table_name(endpoint, values):
+    """Answer 404 for routes naming a table the database does not have.
+
+    Tables are checked against the cached schema; when it cannot be read
+    (SQL Server unreachable, catalog preloaded from a dump) every name is
+    let through.
+    """
+    if not values or endpoint == 'static':
+        return
+    if 'filename' in values:
+        if '__' not in values['filename']:
+            abort(404)
+        db, table = parse_sql_path(values['filename'])
+    elif 'table_name' in values:
+        db, table = DEFAULT_DATABASE, values['table_name']
+    else:
+        return
+    tables = database_schema(db)
+    if tables is not None and table not in tables:
+        abort(404)
+
+
+def table_listing(tables):
+    """Return name and approximate row count of each table, sorted by name."""
+    return [
+        {'name': name, 'rows': info['rows'], 'large': info['rows'] >= LARGE_TABLE_ROWS}
+        for name, info in sorted(tables.items())
+    ]
 
 
 @app.route('/')
 def index():
-    files = []
-    try:
-        conn, cur = connect_sql_server()
-        cur.execute(
-            "SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES "
-            "WHERE TABLE_TYPE='BASE TABLE'"
-        )
-        files = [
-            f"{DEFAULT_DATABASE}__{row[0]}.json" for row in cur.fetchall()
-        ]
-        conn.close()
-    except Exception:
-        files = []
+    tables = database_schema(DEFAULT_DATABASE) or {}
+    files = [
+        dict(t, file=f"{DEFAULT_DATABASE}__{t['name']}.json")
+        for t in table_listing(tables)
+    ]
     return render_template('index.html', files=files, read_only=READ_ONLY)
 
 
+def table_response(filename: str, render, mimetype: str, headers=None) -> Response:
+    """Return a cacheable response for a body derived only from ``filename``.
+
+    The ETag follows the table's write counter, so ``If-None-Match`` is
+    answered with 304 before any rows are loaded. ``render`` returns the
+    body as a string; it is rendered and compressed once per table version,
+    query string and content encoding.
+    """
+    encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+    etag = table_etag(filename, f"{request.full_path}|{encoding}")
+    if request.if_none_match.contains(etag):
+        response = Response(status=304, headers=headers)
+    else:
+        body, used = response_bodies.get(
+            etag, encoding, lambda: render().encode('utf-8'), COMPRESS_MIN_SIZE
+        )
+        response = Response(body, mimetype=mimetype, headers=headers)
+        if used != 'identity':
+            response.headers['Content-Encoding'] = used
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+@app.route('/events')
+def table_events():
+    """Stream table version bumps as Server-Sent Events.
+
+    ``tables`` is a comma-separated list of filenames to follow; without it
+    every table is reported. Each event is ``table`` with a JSON body of
+    ``{"table", "version"}``.
+    """
+    wanted = set(filter(None, request.args.get('tables', '').split(',')))
+
+    def stream():
+        events = subscribe()
+        try:
+            yield 'retry: 5000\n\n'
+            idle = 0
+            while True:
+                # Writes made by other worker processes reach this one here.
+                sync_versions()
+                try:
+                    table, version = events.get(timeout=1)
+                except queue.Empty:
+                    idle += 1
+                    if idle >= HEARTBEAT_SECONDS:
+                        idle = 0
+                        yield ': keep-alive\n\n'
+                    continue
+                if not wanted or table in wanted:
+                    data = json.dumps({'table': table, 'version': version})
+                    yield f'event: table\ndata: {data}\n\n'
+        finally:
+            unsubscribe(events)
+
+    return Response(
+        stream(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
 @app.route('/view/<filename>')
 def view_table(filename):
-    rows = load_table_data(filename)
-    return render_template(
-        'edit_table.html',
-        filename=filename,
-        table=rows,
-        read_only=READ_ONLY,
-        save_url=url_for('save_table', filename=filename) if not READ_ONLY else ''
-    )
+    def render():
+        rows = load_table_data(filename)
+        return render_template(
+            'edit_table.html',
+            filename=filename,
+            table=rows,
+            row_versions=[row_version(r) for r in rows],
+            read_only=READ_ONLY,
+            save_url=url_for('save_table', filename=filename) if not READ_ONLY else '',
+            delta_url=url_for('save_table_delta', filename=filename) if not READ_ONLY else '',
+            key_columns=table_key_columns(filename, rows),
+        )
+
+    return table_response(filename, render, 'text/html')
 
 
 @app.route('/search/<filename>')
 def search_table(filename):
     """Return filtered or searched data for the given table."""
-    table_data = load_table_data(filename)
+    def render():
+        table_data = load_table_data(filename)
 
-    # Extract search term and filter parameters from the query string
-    search_term = request.args.get('q')
+        # Extract search term and filter parameters from the query string
+        search_term = request.args.get('q')
+        filters = {k: v for k, v in request.args.items() if k != 'q'}
+
+        if search_term:
+            table_data = query_data(table_data, search_term)
+        if filters:
+            table_data = filter_data(table_data, **filters)
+        return app.json.dumps(table_data)
+
+    return table_response(filename, render, 'application/json')
+
+
+def get_value_index(filename, column):
+    """Return the distinct values of ``column`` indexed for fuzzy matching."""
+    def build():
+        rows = load_table_data(filename)
+        return TrigramIndex(
+            str(row[column]) for row in rows if row.get(column) is not None
+        )
+
+    return get_cached(f'values:{filename}:{column}', [filename], build)
+
+
+@app.route('/suggest/<filename>')
+def suggest_values(filename):
+    """Suggest existing values of a column close to a mistyped one.
+
+    Used for "did you mean" hints when a ``/search`` filter matches nothing.
+    """
+    column = request.args.get('column')
+    value = request.args.get('value', '')
+    if not column:
+        return jsonify({'error': 'column missing'}), 400
+    try:
+        limit = int(request.args.get('n', 3))
+    except ValueError:
+        return jsonify({'error': 'n must be an integer'}), 400
+    index = get_value_index(filename, column)
+    return jsonify({
+        'column': column,
+        'value': value,
+        'exists': value in index,
+        'suggestions': index.closest(value, n=limit),
+    })
+
+
+def get_federated_catalog():
+    """Return the Advance Steel databases and the columns of their tables.
+
+    Databases are keyed by label (``ASTORBASE``, ``ASTORPROFILES``, ...).
+    The databases are discovered once per process and their columns come
+    from the schema catalog; databases that could not be read are listed
+    with their errors.
+    """
+    def discover():
+        from sql_dump import get_databases, sanitize_name
+
+        conn, cur = connect_sql_server()
+        try:
+            names = get_databases(cur)
+        finally:
+            conn.close()
+        databases = {sanitize_name(n): n for n in names}
+        return databases or {DEFAULT_DATABASE: DEFAULT_DATABASE}
+
+    databases = get_cached('federated_databases', [], discover)
+    columns = {}
+    errors = {}
+    for label, name in databases.items():
+        try:
+            tables = schema_catalog.get(name)
+        except Exception as e:
+            errors[label] = str(e)
+            continue
+        columns[label] = {
+            table: {c: col['type'] for c, col in info['columns'].items()}
+            for table, info in tables.items()
+        }
+    return databases, columns, errors
+
+
+@app.route('/federated')
+def federated_search():
+    """Search every Advance Steel database, streaming rows as they are found.
+
+    Takes the same ``q`` and filter parameters as ``/search``. The response
+    is newline-delimited JSON: a summary line, then one line per row tagged
+    with its ``database`` and ``table``, plus ``error`` lines for queries or
+    databases that failed or timed out.
+    """
+    term = request.args.get('q')
     filters = {k: v for k, v in request.args.items() if k != 'q'}
+    if not term and not filters:
+        return jsonify({'error': 'q or a filter is required'}), 400
+    try:
+        databases, columns, errors = get_federated_catalog()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    plan = plan_queries(columns, term, filters)
 
-    if search_term:
-        table_data = query_data(table_data, search_term)
-    if filters:
-        table_data = filter_data(table_data, **filters)
+    def stream():
+        yield json.dumps({
+            'databases': sorted(columns),
+            'tables': len(plan),
+            'skipped': sum(len(t) for t in columns.values()) - len(plan),
+        }) + '\n'
+        for database, error in errors.items():
+            yield json.dumps({'database': database, 'table': None, 'error': error}) + '\n'
+        for result in run_queries(connect_sql_server, databases, plan):
+            if 'error' in result:
+                yield json.dumps(result) + '\n'
+                continue
+            for row in result['rows']:
+                yield app.json.dumps({
+                    'database': result['database'],
+                    'table': result['table'],
+                    'row': row,
+                }) + '\n'
 
-    return jsonify(table_data)
+    return Response(stream(), mimetype='application/x-ndjson')
 
 
 @app.route('/csv/<filename>')
 def export_csv_route(filename):
-    """Download the table as a CSV file."""
-    rows = load_table_data(filename)
-    if not rows:
-        return Response('', mimetype='text/csv')
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=rows[0].keys())
-    writer.writeheader()
-    writer.writerows(rows)
-    return Response(
-        output.getvalue(),
-        mimetype='text/csv',
+    """Download the table as a CSV file.
+
+    ``format=parquet``, ``arrow`` or ``xlsx`` exports the table with the
+    column types of its schema instead, streamed from SQL batch by batch.
+    """
+    fmt = request.args.get('format', 'csv')
+    if fmt != 'csv':
+        return export_typed(filename, fmt)
+
+    def render():
+        rows = load_table_data(filename)
+        if not rows:
+            return ''
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+        return output.getvalue()
+
+    return table_response(
+        filename,
+        render,
+        'text/csv',
         headers={'Content-Disposition': f'attachment; filename={filename[:-5]}.csv'},
     )
 
 
+def export_typed(filename: str, fmt: str) -> Response:
+    """Stream the table in a typed export format, with an ETag for 304s."""
+    try:
+        check_format(fmt)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    _, extension, mimetype, _ = EXPORT_FORMATS[fmt]
+    headers = {'Content-Disposition': f'attachment; filename={filename[:-5]}.{extension}'}
+    etag = table_etag(filename, request.full_path)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304, headers=headers)
+        response.set_etag(etag)
+        return response
+    info = table_schema(filename)
+    sql_types = {name: c['type'] for name, c in info['columns'].items()} if info else None
+    db, table = parse_sql_path(filename)
+
+    def stream():
+        conn, cur = connect_sql_server(db)
+        try:
+            cur.execute(f"SELECT * FROM [{table}]")
+            columns = column_kinds(cur.description, sql_types)
+            yield from iter_export(fmt, columns, iter_batches(cur))
+        finally:
+            conn.close()
+
+    response = Response(stream(), mimetype=mimetype, headers=headers)
+    response.set_etag(etag)
+    return response
+
+
 @app.route('/setbolts')
 def browse_setbolts():
     """Browse and filter the ASTORBASE SetBolts table."""
-    raw_rows = load_table_data('ASTORBASE__SetBolts.json')
+    raw_rows = load_table_data(SETBOLTS_FILE)
 
     # Build filters from query parameters
     search_term = request.args.get('q')
@@ -182,22 +778,292 @@ def browse_setbolts():
                 r[col] = mm_to_inch(r[col])
         display_rows.append(r)
 
-    return render_template('setbolts.html', rows=display_rows, read_only=READ_ONLY)
+    return render_template(
+        'setbolts.html', rows=display_rows, read_only=READ_ONLY, filename=SETBOLTS_FILE
+    )
+
+
+@app.route('/bolt_sets')
+def bolt_sets():
+    """Return SetOfBolts assemblies with their resolved components.
+
+    When Standard, Set, Material and Diameter are all given a single set is
+    returned; otherwise every set (or only those with unresolved components
+    when ``unresolved=1``) is listed.
+    """
+    index = get_bolt_set_index()
+    key_fields = ['Standard', 'Set', 'Material', 'Diameter']
+    if all(request.args.get(f) for f in key_fields):
+        resolved = lookup_set(index, *(request.args[f] for f in key_fields))
+        if resolved is None:
+            return jsonify({'error': 'set not found'}), 404
+        return jsonify(resolved)
+    if request.args.get('unresolved'):
+        return jsonify(unresolved_sets(index))
+    return jsonify(list(index.values()))
+
+
+def get_takeoff_index():
+    """Return the precomputed callout lookup used by ``/takeoff``."""
+    from takeoff import build_takeoff_index
+
+    return get_cached(
+        'takeoff',
+        [SETOFBOLTS_FILE, SCREWNEW_FILE, SETNUTSBOLTS_FILE],
+        lambda: build_takeoff_index(
+            load_table_data(SETOFBOLTS_FILE),
+            load_table_data(SCREWNEW_FILE),
+            load_table_data(SETNUTSBOLTS_FILE),
+        ),
+    )
+
+
+@app.route('/duplicates/<filename>')
+def duplicates(filename):
+    """Return exact and near duplicate row clusters of a table.
+
+    ``tolerance`` overrides the Diameter/Length tolerance in mm.
+    """
+    tolerances = TOLERANCES
+    if request.args.get('tolerance'):
+        try:
+            tolerance = float(request.args['tolerance'])
+        except ValueError:
+            return jsonify({'error': 'tolerance must be a number'}), 400
+        tolerances = {column: tolerance for column in TOLERANCES}
+    _, table = parse_sql_path(filename)
+    report = get_cached(
+        f'duplicates:{filename}:{sorted(tolerances.items())}',
+        [filename],
+        lambda: analyze_table(table, load_table_data(filename), tolerances),
+    )
+    return jsonify(report)
+
+
+@app.route('/takeoff', methods=['POST'])
+def takeoff_route():
+    """Build a BOM CSV from an uploaded CSV of bolt callouts."""
+    from takeoff import iter_bom_csv, takeoff
+
+    upload = request.files.get('file')
+    if upload is None:
+        return jsonify({'error': 'file missing'}), 400
+    lines = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+    totals, errors = takeoff(lines, get_takeoff_index())
+    return Response(
+        iter_bom_csv(totals),
+        mimetype='text/csv',
+        headers={
+            'Content-Disposition': 'attachment; filename=takeoff.csv',
+            'X-Unresolved-Callouts': str(len(errors)),
+        },
+    )
+
+
+def get_grip_index():
+    """Return ScrewNew grip-length ranges indexed by bolt spec."""
+    return get_cached(
+        'grip_lengths',
+        [SCREWNEW_FILE],
+        lambda: build_grip_index(load_table_data(SCREWNEW_FILE)),
+    )
+
+
+@app.route('/grip_length', methods=['POST'])
+def grip_length_batch():
+    """Resolve a JSON list of grip/spec pairs to bolt lengths."""
+    pairs = request.get_json(silent=True)
+    if not isinstance(pairs, list):
+        return jsonify({'error': 'expected a JSON list'}), 400
+    return jsonify(select_lengths(get_grip_index(), pairs))
+
+
+@app.route('/setbolts/grip')
+def grip_length_form():
+    """Small form selecting a bolt length for a given grip."""
+    fields = ['Standard', 'Set', 'Material', 'Diameter', 'grip']
+    values = {f: request.args.get(f, '') for f in fields}
+    result = None
+    error = None
+    if all(values.values()):
+        try:
+            result = select_length(
+                get_grip_index(),
+                float(values['grip']),
+                values['Standard'],
+                values['Set'],
+                values['Material'],
+                values['Diameter'],
+            )
+        except ValueError:
+            error = 'Grip must be a number'
+        else:
+            if result is None:
+                error = 'No length found for this grip and specification'
+    return render_template(
+        'grip_length.html', values=values, result=result, error=error
+    )
+
+
+def get_availability_cube():
+    """Return the Standard/Set/Material/Diameter/Length availability index."""
+    return get_cached(
+        'availability',
+        AVAILABILITY_FILES,
+        lambda: AvailabilityCube(
+            load_table_data(SETOFBOLTS_FILE),
+            load_table_data(SCREWNEW_FILE),
+        ),
+    )
+
+
+@app.route('/availability')
+def availability():
+    """Return the options of the next level for dependent dropdowns.
+
+    ``Standard``, ``Set``, ``Material`` and ``Diameter`` select the leading
+    levels, in that order; the response lists the values available for the
+    next one, down to the lengths of a full specification.
+    """
+    selection = parse_selection(request.args)
+    options = get_availability_cube().options(selection)
+    if options is None:
+        return jsonify({'error': 'not available', 'selection': selection}), 404
+    return jsonify({'level': AVAILABILITY_LEVELS[len(selection)], 'options': options})
+
+
+def get_distance_table(kind: str):
+    """Return the sorted lookup arrays for ``bolts`` or ``connectors``."""
+    table, diameter_field = DISTANCE_TABLES[kind]
+    filename = f"{DEFAULT_DATABASE}__{table}.json"
+    return get_cached(
+        f'distances:{table}',
+        [filename],
+        lambda: build_distance_table(load_table_data(filename), diameter_field),
+    )
+
+
+@app.route('/distances/<kind>')
+def distances(kind):
+    """Look up minimum along/across distances.
+
+    ``diameter`` and ``tolerance`` accept comma-separated lists for batch
+    queries; ``rule`` is ``exact`` (default) or ``nearest``.
+    """
+    if kind not in DISTANCE_TABLES:
+        return jsonify({'error': f'unknown distances table: {kind}'}), 404
+    try:
+        diameters = [float(v) for v in request.args.get('diameter', '').split(',')]
+        tolerances = [
+            float(v) for v in request.args.get('tolerance', '0').split(',')
+        ]
+        results = lookup_distances(
+            get_distance_table(kind),
+            diameters,
+            tolerances,
+            request.args.get('rule', 'exact'),
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if len(results) == 1:
+        if results[0] is None:
+            return jsonify({'error': 'no matching distance'}), 404
+        return jsonify(results[0])
+    return jsonify(results)
+
+
+def get_connector_catalog():
+    """Return the ConnectorRelations specs joined with their lookup tables."""
+    return get_cached(
+        'connectors',
+        CONNECTOR_FILES,
+        lambda: build_connector_catalog(*(load_table_data(f) for f in CONNECTOR_FILES)),
+    )
+
+
+@app.route('/connectors', methods=['GET', 'POST'])
+def connectors():
+    """Return shear connector specs with their spacing rows.
+
+    ``Standard``, ``Material`` and ``Diameter`` select a single connector;
+    otherwise every connector is listed, or only the relations pointing at
+    missing entries when ``verify=1``. A POST takes a JSON list of
+    ``{"Standard", "Material", "Diameter"}`` objects and answers each in
+    turn, with ``null`` for unknown connectors.
+    """
+    catalog = get_connector_catalog()
+    if request.method == 'POST':
+        lookups = request.get_json(silent=True)
+        if not isinstance(lookups, list):
+            return jsonify({'error': 'expected a JSON list'}), 400
+        return jsonify(lookup_connectors(catalog, lookups))
+    key_fields = ['Standard', 'Material', 'Diameter']
+    if all(request.args.get(f) for f in key_fields):
+        spec = lookup_connector(catalog, *(request.args[f] for f in key_fields))
+        if spec is None:
+            return jsonify({'error': 'connector not found'}), 404
+        return jsonify(spec)
+    if request.args.get('verify'):
+        return jsonify(verify_connectors(catalog))
+    return jsonify(list(catalog['specs'].values()))
+
+
+def get_anchor_catalog():
+    """Return the AnchorsName facet bitmaps and AnchorsDefinition join."""
+    return get_cached(
+        'anchor_catalog',
+        [ANCHORSNAME_FILE, ANCHORSDEFINITION_FILE],
+        lambda: build_anchor_catalog(
+            load_table_data(ANCHORSNAME_FILE),
+            load_table_data(ANCHORSDEFINITION_FILE),
+        ),
+    )
+
+
+def browse_anchor_args():
+    """Run an anchor catalog selection from the query string."""
+    selections = {f: request.args.getlist(f) for f in FACETS}
+    try:
+        limit = int(request.args.get('limit', 100))
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        limit, offset = 100, 0
+    return selections, browse(get_anchor_catalog(), selections, limit, offset)
+
+
+@app.route('/anchors')
+def browse_anchors():
+    """Faceted anchor browser."""
+    selections, result = browse_anchor_args()
+    return render_template(
+        'anchors.html', selections=selections, result=result, facets=FACETS
+    )
+
+
+@app.route('/anchors/search')
+def search_anchors():
+    """Return matching anchors, their definitions and facet counts."""
+    _, result = browse_anchor_args()
+    return jsonify(result)
 
 
 @app.route('/setbolts/edit')
 def edit_setbolts():
-    rows = load_table_data('ASTORBASE__SetBolts.json')
+    rows = [r.copy() for r in load_table_data(SETBOLTS_FILE)]
+    versions = [row_version(r) for r in rows]
     for row in rows:
         for col in ['Diameter', 'Length', 'HeadHeight']:
             if row.get(col) is not None:
                 row[col] = mm_to_inch(row[col])
     return render_template(
         'edit_table.html',
-        filename='ASTORBASE__SetBolts.json',
+        filename=SETBOLTS_FILE,
         table=rows,
+        row_versions=versions,
         read_only=READ_ONLY,
-        save_url=url_for('save_setbolts') if not READ_ONLY else ''
+        save_url=url_for('save_setbolts') if not READ_ONLY else '',
+        delta_url=url_for('save_setbolts_delta') if not READ_ONLY else '',
+        key_columns=table_key_columns(SETBOLTS_FILE, rows),
     )
 
 
@@ -209,9 +1075,24 @@ if not READ_ONLY:
             for col in ['Diameter', 'Length', 'HeadHeight']:
                 if row.get(col) is not None:
                     row[col] = inch_to_mm(float(row[col]))
-        save_table_data('ASTORBASE__SetBolts.json', json.dumps(updated))
+        save_table_data(SETBOLTS_FILE, json.dumps(updated))
         return redirect(url_for('edit_setbolts'))
 
+    @app.route('/setbolts/save/delta', methods=['POST'])
+    def save_setbolts_delta():
+        """Apply an editor delta to SetBolts, converting inches back to mm."""
+        delta = request.get_json(silent=True)
+        try:
+            validate_delta(delta)
+            for op in delta['ops']:
+                for values in (op.get('key'), op.get('value')):
+                    for col in ['Diameter', 'Length', 'HeadHeight']:
+                        if values and values.get(col) is not None:
+                            values[col] = inch_to_mm(float(values[col]))
+            return jsonify(apply_table_delta(SETBOLTS_FILE, delta))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
 
 if not READ_ONLY:
     @app.route('/save/<filename>', methods=['POST'])
@@ -220,6 +1101,14 @@ if not READ_ONLY:
         save_table_data(filename, updated_data)
         return redirect(url_for('view_table', filename=filename))
 
+    @app.route('/save/<filename>/delta', methods=['POST'])
+    def save_table_delta(filename):
+        """Apply only the changed, added and deleted rows sent by the editor."""
+        try:
+            return jsonify(apply_table_delta(filename, request.get_json(silent=True)))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
     @app.route('/add_row/<filename>', methods=['POST'])
     def add_row_route(filename):
         """Add a single row to the given table."""
@@ -236,26 +1125,83 @@ if not READ_ONLY:
         delete_row(filename, row_id)
         return jsonify({'status': 'ok'})
 
+    @app.route('/import/<filename>', methods=['POST'])
+    def import_csv_route(filename):
+        """Import an uploaded CSV into the given table."""
+        from import_csv import MODES as IMPORT_MODES, import_rows
+
+        upload = request.files.get('file')
+        if upload is None:
+            return jsonify({'error': 'file missing'}), 400
+        mode = request.form.get('mode', 'upsert')
+        if mode not in IMPORT_MODES:
+            return jsonify({'error': f'unknown mode: {mode}'}), 400
+        db, table = parse_sql_path(filename)
+        info = table_schema(filename)
+        lines = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+        conn, cur = connect_sql_server(db)
+        try:
+            result = import_rows(
+                conn, cur, table, lines, mode, request.form.getlist('key') or None,
+                schema=column_types(info) if info else None,
+                primary_key=info['primary_key'] if info else None,
+                identity=identity_column(info) if info else None,
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        finally:
+            conn.close()
+        bump_version(filename)
+        return jsonify(result)
+
+    @app.route('/undo', methods=['POST'])
+    def undo_route():
+        """Undo journal entries given by ``entry`` ids or a time range.
+
+        The JSON body holds either ``entry`` (an id or a list of ids) or
+        ``since``/``until`` (epoch seconds or ISO timestamps) and an optional
+        ``table`` filename.
+        """
+        body = request.get_json(silent=True) or {}
+        entry_ids = body.get('entry')
+        if isinstance(entry_ids, int):
+            entry_ids = [entry_ids]
+        try:
+            if not entry_ids and 'since' not in body:
+                raise ValueError('entry or since required')
+            since = parse_time(body['since']) if 'since' in body else None
+            until = parse_time(body['until']) if 'until' in body else None
+            return jsonify(undo_changes(entry_ids, since, until, body.get('table')))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
     @app.route('/backup')
     def backup():
         """Trigger a database backup and return the backup path."""
+        from backup_db import backup_database
+
         path = backup_database()
         return jsonify({"backup": str(path)})
 
 
+@app.route('/journal')
+def journal_entries():
+    """List journal entries, optionally for one ``table`` and time range."""
+    try:
+        since = parse_time(request.args['since']) if 'since' in request.args else None
+        until = parse_time(request.args['until']) if 'until' in request.args else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(journal.entries(request.args.get('table'), since, until))
+
+
 @app.route('/sql')
 def list_sql_tables():
     """List available tables in the default database."""
     tables = []
     error = None
     try:
-        conn, cur = connect_sql_server()
-        cur.execute(
-            "SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES "
-            "WHERE TABLE_TYPE='BASE TABLE'"
-        )
-        tables = [row[0] for row in cur.fetchall()]
-        conn.close()
+        tables = table_listing(schema_catalog.get(DEFAULT_DATABASE))
     except Exception as e:
         error = str(e)
     return render_template('sql_tables.html', tables=tables, error=error)
@@ -275,24 +1221,25 @@ def query_sql_table(table_name):
         try:
             conn, cur = connect_sql_server()
             cur.execute(query)
-            if cur.description:
-                columns = [c[0] for c in cur.description]
-                rows = [dict(zip(columns, r)) for r in cur.fetchall()]
-                results = rows
-            else:
-                results = []
+            results = fetch_rows(cur)
             conn.close()
         except Exception as e:
             error = str(e)
+    info = table_schema(f"{DEFAULT_DATABASE}__{table_name}.json")
     return render_template(
         'sql_query.html',
         table_name=table_name,
         query=query,
         results=results,
         error=error,
-
+        row_count=info['rows'] if info else None,
+        large=bool(info) and info['rows'] >= LARGE_TABLE_ROWS,
     )
 
 
 if __name__ == '__main__':
+    # With the reloader, only the serving child process watches for changes.
+    watcher = make_change_watcher()
+    if watcher and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        watcher.start()
     app.run(debug=True)
@@ -3,7 +3,7 @@ from pathlib import Path
 import shutil
 import datetime
 
-from config import ADVANCE_STEEL_VERSION
+from config import ADVANCE_STEEL_VERSION, validate_config
 
 DEFAULT_DATA_DIR = Path(
     f"C:/ProgramData/Autodesk/Advance Steel {ADVANCE_STEEL_VERSION}/USA/Steel/Data"
@@ -31,6 +31,7 @@ def backup_database(data_dir: Path | None = None, out_dir: str | Path = "backups
     Path
         Path to the created backup directory.
     """
+    validate_config()
     data_dir = Path(data_dir) if data_dir else get_data_dir()
     if not data_dir.exists():
         raise FileNotFoundError(f"Data directory not found: {data_dir}")
@@ -0,0 +1,119 @@
+"""Measure import time of the app and command line tools.
+
+Each module is imported in a fresh interpreter with ``-X importtime`` and
+its cumulative import time is compared with a budget. Modules that must not
+load at import (the ODBC driver, worker pools) are reported as well; the
+test suite runs the same check.
+
+Example::
+
+    python bench_startup.py --repeat 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# module -> cumulative import budget in milliseconds
+BUDGETS_MS = {
+    "app": 1500,
+    "sql_query": 300,
+    "export_csv": 300,
+    "integrity_check": 300,
+    "import_csv": 300,
+    "version_diff": 300,
+    "takeoff": 300,
+}
+
+# Modules that should only load when the feature using them runs.
+DEFERRED = {
+    "app": ["pyodbc", "backup_db", "import_csv", "takeoff", "concurrent.futures"],
+    "sql_query": ["pyodbc"],
+    "export_csv": ["pyodbc"],
+    "integrity_check": ["pyodbc"],
+    "import_csv": ["pyodbc"],
+    "version_diff": ["pyodbc"],
+    "takeoff": ["pyodbc", "concurrent.futures"],
+}
+
+ROOT = Path(__file__).resolve().parent
+
+
+def measure(module: str) -> Tuple[float, List[str]]:
+    """Import ``module`` in a new interpreter.
+
+    Returns its cumulative import time in milliseconds and the names of all
+    modules imported along the way.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (str(ROOT), env.get("PYTHONPATH")) if p
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0.0
+    imported = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        if not cumulative.strip().isdigit():
+            continue
+        imported.append(name)
+        if name == module:
+            total = int(cumulative) / 1000
+    return total, imported
+
+
+def check(module: str, repeat: int = 3) -> Dict[str, object]:
+    """Return the best import time of ``module`` and any budget violations."""
+    times = []
+    imported: List[str] = []
+    for _ in range(repeat):
+        elapsed, imported = measure(module)
+        times.append(elapsed)
+    best = min(times)
+    early = [m for m in DEFERRED.get(module, []) if m in imported]
+    return {
+        "module": module,
+        "ms": best,
+        "budget_ms": BUDGETS_MS[module],
+        "over_budget": best > BUDGETS_MS[module],
+        "loaded_early": early,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure module import times")
+    parser.add_argument("module", nargs="*", help="Modules to measure (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per module; best is kept")
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.module or list(BUDGETS_MS):
+        result = check(module, args.repeat)
+        status = "ok"
+        if result["over_budget"]:
+            status = "OVER BUDGET"
+        if result["loaded_early"]:
+            status = f"loads {', '.join(result['loaded_early'])}"
+        failed = failed or status != "ok"
+        print(
+            f"{module:<16} {result['ms']:8.1f} ms  "
+            f"(budget {result['budget_ms']} ms)  {status}"
+        )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,19 @@ ADVANCE_STEEL_VERSION = 2025  # choose from 2026, 2025, 2024, or 2023
 
 SUPPORTED_VERSIONS = {2026, 2025, 2024, 2023}
 
-if ADVANCE_STEEL_VERSION not in SUPPORTED_VERSIONS:
-    raise ValueError(
-        f"Unsupported Advance Steel version: {ADVANCE_STEEL_VERSION}. "
-        f"Supported versions are: {sorted(SUPPORTED_VERSIONS)}"
-    )
+
+def validate_config() -> None:
+    """Raise ``ValueError`` if the configured version is unsupported.
+
+    Called on first connection rather than at import so tools that never
+    touch SQL Server start without it.
+    """
+    if ADVANCE_STEEL_VERSION not in SUPPORTED_VERSIONS:
+        raise ValueError(
+            f"Unsupported Advance Steel version: {ADVANCE_STEEL_VERSION}. "
+            f"Supported versions are: {sorted(SUPPORTED_VERSIONS)}"
+        )
+
 
 DB_CONFIG = {
     'server': rf'(LocalDB)\ADVANCESTEEL{ADVANCE_STEEL_VERSION}',
@@ -25,3 +33,31 @@ DEFAULT_DATABASE = 'ASTORBASE'
 # and the UI will not allow saving changes.
 READ_ONLY = True
 
+
+# Folder holding the append-only journal of writes made through the app,
+# used to undo individual edits without restoring a backup.
+JOURNAL_DIR = 'journal'
+
+# Table responses at least this many bytes long are compressed (gzip, or
+# brotli when the package is installed) for clients that accept it.
+COMPRESS_MIN_SIZE = 1024
+
+# File through which the worker processes started by serve.py share table
+# write counters, so every worker sees writes made by the others.
+VERSION_FILE = 'table_versions.txt'
+
+# Seconds between polls for table changes made outside the app (for example
+# in Advance Steel's Management Tools). Set to 0 to disable the watcher.
+WATCH_INTERVAL = 2.0
+
+# Catalog of the .mdf files found by interactive_sql_cli.py, so later runs
+# only re-list folders that changed instead of walking ProgramData again.
+MDF_CATALOG_FILE = 'mdf_catalog.json'
+
+# Folder where interactive_sql_cli.py keeps the distinct values of filtered
+# columns for its "did you mean" suggestions.
+VALUE_CACHE_DIR = 'value_cache'
+
+# Tables with at least this many rows (approximate, from the schema catalog)
+# are flagged as large in the table listings and the SQL console.
+LARGE_TABLE_ROWS = 50000
@@ -32,5 +32,5 @@ else
     fi
 fi
 
-# Start the Flask application
-exec python app.py
+# Start the application with preforked workers
+exec python serve.py
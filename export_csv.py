@@ -1,26 +1,59 @@
 import argparse
-import csv
+import os
+from typing import Optional
+
 from utils.db import connect_sql_server
+from utils.export import FORMATS, check_format, export_cursor
+from utils.schema import read_schema
 
 
-def export_table_to_csv(database: str, table: str, out_path: str) -> None:
+def export_table(database: str, table: str, out_path: str, fmt: str = "csv") -> int:
+    """Export a table as ``fmt`` (see :data:`utils.export.FORMATS`).
+
+    Column types are taken from the table schema, so typed formats keep
+    numbers, booleans and dates. Returns the number of rows written.
+    """
+    check_format(fmt)
     conn, cur = connect_sql_server(database)
-    cur.execute(f"SELECT * FROM [{table}]")
-    columns = [c[0] for c in cur.description]
-    rows = cur.fetchall()
-    conn.close()
+    try:
+        sql_types = None
+        if fmt != "csv":
+            _, tables = read_schema(cur)
+            info = tables.get(table)
+            if info is not None:
+                sql_types = {name: c["type"] for name, c in info["columns"].items()}
+        cur.execute(f"SELECT * FROM [{table}]")
+        return export_cursor(cur, fmt, out_path, sql_types)
+    finally:
+        conn.close()
+
+
+def export_table_to_csv(database: str, table: str, out_path: str) -> None:
+    export_table(database, table, out_path, "csv")
 
-    with open(out_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(columns)
-        writer.writerows(rows)
+
+def format_for(out_path: str, fmt: Optional[str] = None) -> str:
+    """Return ``fmt``, or the format matching the extension of ``out_path``."""
+    if fmt:
+        return fmt
+    extension = os.path.splitext(str(out_path))[1].lstrip(".").lower()
+    for name, (_, ext, _, _) in FORMATS.items():
+        if ext == extension:
+            return name
+    return "csv"
 
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Export table to CSV")
+    parser = argparse.ArgumentParser(description="Export table to CSV, Parquet, Arrow or XLSX")
     parser.add_argument("database", help="Database name")
     parser.add_argument("table", help="Table name")
-    parser.add_argument("output", help="Output CSV file")
+    parser.add_argument("output", help="Output file")
+    parser.add_argument(
+        "--format",
+        choices=sorted(FORMATS),
+        help="Output format (default: from the output extension, else csv)",
+    )
     args = parser.parse_args()
-    export_table_to_csv(args.database, args.table, args.output)
-
+    fmt = format_for(args.output, args.format)
+    count = export_table(args.database, args.table, args.output, fmt)
+    print(f"Wrote {count} rows to {args.output}")
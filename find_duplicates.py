@@ -0,0 +1,81 @@
+"""Report duplicated rows in the bolt and screw libraries.
+
+Reads SetOfBolts, ScrewNew and SetNutsBolts (or the tables given) from the
+LocalDB instance of an Advance Steel version or a ``sql_dump.py`` folder and
+lists exact and near duplicate clusters with their OwnerText, so custom rows
+shadowing stock ones stand out. See :mod:`utils.duplicates`.
+
+Examples::
+
+    python find_duplicates.py
+    python find_duplicates.py data --tolerance 0.1 -o duplicates.json
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List
+
+from config import ADVANCE_STEEL_VERSION
+from utils.duplicates import LIBRARY_TABLES, TOLERANCES, analyze_table
+from version_diff import open_source
+
+
+def print_report(report: Dict[str, Any], limit: int = 20) -> None:
+    print(f"\n{report['table']}: {report['rows']} rows, "
+          f"{len(report['exact'])} exact and {len(report['near'])} near duplicate clusters")
+    for kind in ("exact", "near"):
+        clusters: List[Dict[str, Any]] = report[kind]
+        for cluster in clusters[:limit]:
+            flag = "  custom+stock" if cluster["mixed"] else ""
+            print(f"  [{kind}] {cluster['size']} rows, owners {', '.join(cluster['owners'])}{flag}")
+            for row in cluster["rows"]:
+                values = ", ".join(
+                    f"{k}={v}" for k, v in row.items() if k not in ("index", "Source")
+                )
+                print(f"      #{row['index']}: {values}")
+        if len(clusters) > limit:
+            print(f"  ... {len(clusters) - limit} more {kind} clusters")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Find duplicated fastener rows")
+    parser.add_argument(
+        "source", nargs="?", default=str(ADVANCE_STEEL_VERSION),
+        help="Version number or sql_dump folder (default: configured version)",
+    )
+    parser.add_argument("-d", "--database", default="ASTORBASE", help="Database name")
+    parser.add_argument(
+        "-t", "--table", action="append",
+        help=f"Table to check (repeatable; default: {', '.join(LIBRARY_TABLES)})",
+    )
+    parser.add_argument(
+        "--tolerance", type=float,
+        help="Tolerance for Diameter and Length in mm "
+             f"(default: {TOLERANCES['Diameter']})",
+    )
+    parser.add_argument("-o", "--output", help="Write the full report as JSON")
+    args = parser.parse_args()
+
+    tolerances = TOLERANCES
+    if args.tolerance is not None:
+        tolerances = {column: args.tolerance for column in TOLERANCES}
+    source = open_source(args.source, args.database)
+    reports = []
+    try:
+        for table in args.table or LIBRARY_TABLES:
+            rows = [dict(r) for r in source.rows(table)]
+            reports.append(analyze_table(table, rows, tolerances))
+    finally:
+        source.close()
+
+    for report in reports:
+        print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2, ensure_ascii=False, default=str)
+        print(f"\nReport written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
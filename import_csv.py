@@ -0,0 +1,342 @@
+"""Import a CSV file into a SQL table; the counterpart of ``export_csv.py``.
+
+Rows are streamed from the CSV, coerced to the column types reported by
+``INFORMATION_SCHEMA.COLUMNS`` and written in batches with
+``fast_executemany`` inside a single transaction. Rows that fail coercion or
+insertion are reported and skipped without aborting the import. Upserts
+merge each batch as soon as it is staged, so constraint violations that
+only the target table enforces are isolated to their rows as well.
+"""
+
+import argparse
+import csv
+import sys
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from takeoff import iter_records
+from utils.db import connect_sql_server
+from utils.row_keys import natural_key
+
+CHUNK_SIZE = 5000
+MODES = ("upsert", "replace")
+
+INT_TYPES = {"int", "bigint", "smallint", "tinyint"}
+FLOAT_TYPES = {"float", "real", "decimal", "numeric", "money", "smallmoney"}
+TRUE_VALUES = {"1", "true", "yes", "y"}
+FALSE_VALUES = {"0", "false", "no", "n"}
+
+# column -> (data type, nullable)
+Schema = Dict[str, Tuple[str, bool]]
+RowError = Tuple[int, str]
+
+
+def load_schema(cur, table: str) -> Schema:
+    """Return the column types and nullability of ``table``."""
+    cur.execute(
+        "SELECT COLUMN_NAME, DATA_TYPE, IS_NULLABLE "
+        "FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME = ? "
+        "ORDER BY ORDINAL_POSITION",
+        (table,),
+    )
+    return {
+        name: (data_type.lower(), nullable == "YES")
+        for name, data_type, nullable in cur.fetchall()
+    }
+
+
+def load_primary_key(cur, table: str) -> List[str]:
+    """Return the primary key columns of ``table`` (may be empty)."""
+    cur.execute(
+        "SELECT k.COLUMN_NAME "
+        "FROM INFORMATION_SCHEMA.TABLE_CONSTRAINTS c "
+        "JOIN INFORMATION_SCHEMA.KEY_COLUMN_USAGE k "
+        "ON c.CONSTRAINT_NAME = k.CONSTRAINT_NAME "
+        "WHERE c.TABLE_NAME = ? AND c.CONSTRAINT_TYPE = 'PRIMARY KEY' "
+        "ORDER BY k.ORDINAL_POSITION",
+        (table,),
+    )
+    return [row[0] for row in cur.fetchall()]
+
+
+def load_identity(cur, table: str) -> Optional[str]:
+    """Return the IDENTITY column of ``table``, if it has one."""
+    cur.execute(
+        "SELECT name FROM sys.identity_columns WHERE object_id = OBJECT_ID(?)",
+        (f"[{table}]",),
+    )
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def coerce_value(value: Optional[str], data_type: str, nullable: bool) -> Any:
+    """Convert a CSV cell to the Python type expected for ``data_type``.
+
+    Raises
+    ------
+    ValueError
+        If the value cannot be converted or is empty for a NOT NULL column.
+    """
+    if value is None or value == "":
+        if not nullable:
+            raise ValueError("value required")
+        return None
+    if data_type in INT_TYPES:
+        number = float(value)
+        if not number.is_integer():
+            raise ValueError(f"not an integer: {value!r}")
+        return int(number)
+    if data_type in FLOAT_TYPES:
+        return float(value)
+    if data_type == "bit":
+        text = value.strip().lower()
+        if text in TRUE_VALUES:
+            return True
+        if text in FALSE_VALUES:
+            return False
+        raise ValueError(f"not a boolean: {value!r}")
+    return value
+
+
+def coerce_rows(
+    rows: Iterable[Tuple[int, Dict[str, str]]],
+    columns: Sequence[str],
+    schema: Schema,
+    errors: List[RowError],
+) -> List[Tuple[int, List[Any]]]:
+    """Coerce a chunk of ``(line_number, row)`` pairs into parameter lists."""
+    coerced = []
+    for line_no, row in rows:
+        values = []
+        try:
+            for column in columns:
+                data_type, nullable = schema[column]
+                try:
+                    values.append(coerce_value(row.get(column), data_type, nullable))
+                except ValueError as e:
+                    raise ValueError(f"{column}: {e}")
+        except ValueError as e:
+            errors.append((line_no, str(e)))
+            continue
+        coerced.append((line_no, values))
+    return coerced
+
+
+def _write_batch(
+    cur,
+    sql: str,
+    batch: List[Tuple[int, List[Any]]],
+    errors: List[RowError],
+    after: Sequence[str] = (),
+) -> int:
+    """Insert a batch, retrying row by row to isolate failing rows.
+
+    ``after`` lists statements run once the rows are inserted, such as the
+    MERGE from the staging table; their failures are isolated the same way.
+    A savepoint undoes any partial write from the failed batch, and one per
+    row undoes the failed row, before the rows are retried one at a time.
+    """
+    cur.execute("SAVE TRANSACTION import_batch")
+    try:
+        cur.executemany(sql, [values for _, values in batch])
+        for statement in after:
+            cur.execute(statement)
+        return len(batch)
+    except Exception:
+        cur.execute("ROLLBACK TRANSACTION import_batch")
+        written = 0
+        for line_no, values in batch:
+            cur.execute("SAVE TRANSACTION import_row")
+            try:
+                cur.execute(sql, values)
+                for statement in after:
+                    cur.execute(statement)
+                written += 1
+            except Exception as e:
+                cur.execute("ROLLBACK TRANSACTION import_row")
+                errors.append((line_no, str(e)))
+        return written
+
+
+def drop_duplicate_keys(
+    batch: List[Tuple[int, List[Any]]],
+    key_positions: Sequence[int],
+    seen: set,
+    errors: List[RowError],
+) -> List[Tuple[int, List[Any]]]:
+    """Drop rows whose key already appeared earlier in the import."""
+    unique = []
+    for line_no, values in batch:
+        key = tuple(values[i] for i in key_positions)
+        if key in seen:
+            errors.append((line_no, f"duplicate key {key}"))
+            continue
+        seen.add(key)
+        unique.append((line_no, values))
+    return unique
+
+
+def import_rows(
+    conn,
+    cur,
+    table: str,
+    lines: Iterable[str],
+    mode: str = "upsert",
+    key: Optional[Sequence[str]] = None,
+    chunk_size: int = CHUNK_SIZE,
+    progress: Optional[Callable[[int, int], None]] = None,
+    schema: Optional[Schema] = None,
+    primary_key: Optional[Sequence[str]] = None,
+    identity: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Stream CSV ``lines`` into ``table`` in one transaction.
+
+    Parameters
+    ----------
+    mode:
+        ``"replace"`` deletes every existing row first. ``"upsert"`` stages
+        each batch in a temporary table and merges it on ``key`` (defaults
+        to the primary key, then the table's natural key).
+    progress:
+        Called with ``(rows_read, rows_written)`` after each chunk.
+    schema, primary_key, identity:
+        Column types, primary key and IDENTITY column of ``table`` when the
+        caller already knows them (e.g. from :mod:`utils.schema`); read from
+        the database otherwise. A CSV holding the IDENTITY column (as written
+        by ``export_csv.py``) keeps its values.
+
+    Returns
+    -------
+    dict
+        ``rows``, ``written`` and ``errors`` (``(line_number, message)`` pairs).
+
+    Raises
+    ------
+    ValueError
+        If the mode is unknown or the CSV header names unknown columns.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode: {mode}. Expected one of {MODES}")
+    if schema is None:
+        schema = load_schema(cur, table)
+        identity = load_identity(cur, table)
+    reader = csv.reader(lines)
+    columns = next(reader, [])
+    unknown = [c for c in columns if c not in schema]
+    if unknown:
+        raise ValueError(f"unknown columns for {table}: {unknown}")
+
+    col_names = ",".join(f"[{c}]" for c in columns)
+    placeholders = ",".join("?" for _ in columns)
+    target = f"[{table}]"
+    if mode == "upsert":
+        if not key and primary_key is None:
+            primary_key = load_primary_key(cur, table)
+        key = list(key or primary_key or natural_key(table, columns))
+        missing = [c for c in key if c not in columns]
+        if missing:
+            raise ValueError(f"key columns missing from CSV: {missing}")
+        target = "#import_stage"
+        key_positions = [columns.index(c) for c in key]
+
+    after: List[str] = []
+    if mode == "upsert":
+        on = " AND ".join(f"t.[{c}] = s.[{c}]" for c in key)
+        # The IDENTITY column can be inserted but never updated.
+        updates = ",".join(
+            f"t.[{c}] = s.[{c}]" for c in columns if c not in key and c != identity
+        )
+        matched = f"WHEN MATCHED THEN UPDATE SET {updates} " if updates else ""
+        after = [
+            f"MERGE [{table}] AS t USING #import_stage AS s ON {on} "
+            f"{matched}"
+            f"WHEN NOT MATCHED THEN INSERT ({col_names}) "
+            f"VALUES ({','.join(f's.[{c}]' for c in columns)});",
+            "DELETE FROM #import_stage",
+        ]
+
+    errors: List[RowError] = []
+    seen: set = set()
+    read = written = 0
+    explicit_identity = identity is not None and identity in columns
+    conn.autocommit = False
+    try:
+        if explicit_identity:
+            cur.execute(f"SET IDENTITY_INSERT [{table}] ON")
+        if mode == "replace":
+            cur.execute(f"DELETE FROM [{table}]")
+        else:
+            # UNION ALL keeps the IDENTITY property off the staging copy.
+            cur.execute(
+                f"SELECT TOP 0 {col_names} INTO #import_stage FROM [{table}] "
+                f"UNION ALL SELECT TOP 0 {col_names} FROM [{table}]"
+            )
+        cur.fast_executemany = True
+        sql = f"INSERT INTO {target} ({col_names}) VALUES ({placeholders})"
+        # Errors name the physical line a record starts on, as an editor shows it.
+        numbered = (
+            (line_no, dict(zip(columns, values))) for line_no, values in iter_records(reader)
+        )
+        while True:
+            chunk = list(islice(numbered, chunk_size))
+            if not chunk:
+                break
+            read += len(chunk)
+            batch = coerce_rows(chunk, columns, schema, errors)
+            if mode == "upsert":
+                batch = drop_duplicate_keys(batch, key_positions, seen, errors)
+            if batch:
+                written += _write_batch(cur, sql, batch, errors, after)
+            if progress:
+                progress(read, written)
+
+        if mode == "upsert":
+            cur.execute("DROP TABLE #import_stage")
+        if explicit_identity:
+            cur.execute(f"SET IDENTITY_INSERT [{table}] OFF")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.autocommit = True
+    return {"rows": read, "written": written, "errors": errors}
+
+
+def import_csv_to_table(
+    database: str,
+    table: str,
+    in_path: str,
+    mode: str = "upsert",
+    key: Optional[Sequence[str]] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Any]:
+    """Import the CSV file at ``in_path`` into ``database.table``."""
+    conn, cur = connect_sql_server(database)
+    try:
+        # utf-8-sig drops the byte order mark Excel writes in front of the header.
+        with open(in_path, newline="", encoding="utf-8-sig") as f:
+            return import_rows(conn, cur, table, f, mode, key, progress=progress)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import CSV into a table")
+    parser.add_argument("database", help="Database name")
+    parser.add_argument("table", help="Table name")
+    parser.add_argument("input", help="Input CSV file")
+    parser.add_argument("--mode", choices=MODES, default="upsert", help="Write mode")
+    parser.add_argument("--key", action="append", help="Key column for upsert (repeatable)")
+    args = parser.parse_args()
+
+    def report(read: int, written: int) -> None:
+        print(f"\r{read} rows read, {written} written", end="", file=sys.stderr)
+
+    result = import_csv_to_table(
+        args.database, args.table, args.input, args.mode, args.key, report
+    )
+    print(file=sys.stderr)
+    for line_no, message in result["errors"]:
+        print(f"Line {line_no}: {message}", file=sys.stderr)
+    print(f"Imported {result['written']} of {result['rows']} rows")
@@ -1,4 +1,7 @@
+from utils.connectors import TABLES as CONNECTOR_TABLES
+from utils.connectors import build_connector_catalog, verify_connectors
 from utils.db import connect_sql_server
+from utils.rows import fetch_rows
 
 
 def check_bolt_integrity(database: str = "ASTORBASE"):
@@ -12,10 +15,29 @@ def check_bolt_integrity(database: str = "ASTORBASE"):
     return missing
 
 
+def check_connector_integrity(database: str = "ASTORBASE"):
+    """Return ConnectorRelations rows pointing at missing connector entries.
+
+    See :func:`utils.connectors.verify_connectors` for the problem format.
+    """
+    conn, cur = connect_sql_server(database)
+    tables = []
+    for table in CONNECTOR_TABLES:
+        cur.execute(f"SELECT * FROM [{table}]")
+        tables.append(fetch_rows(cur))
+    conn.close()
+    return verify_connectors(build_connector_catalog(*tables))
+
+
 if __name__ == "__main__":
     missing = check_bolt_integrity()
     if missing:
         print("Missing BoltDefinition IDs:", missing)
     else:
         print("Integrity check passed")
+    problems = check_connector_integrity()
+    for problem in problems:
+        print("ConnectorRelations", problem["Key"], "missing:", ", ".join(problem["missing"]))
+    if not problems:
+        print("Connector check passed")
 
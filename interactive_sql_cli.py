@@ -1,27 +1,27 @@
 # interactive_sql_cli.py
 import os
 import pyodbc
-import difflib
 import json
 
-# Predefined search paths
-SEARCH_PATHS = [
-    r'C:\PROGRAMDATA\AUTODESK\ADVANCE STEEL 2025\USA'
-]
+from config import DB_CONFIG, MDF_CATALOG_FILE, VALUE_CACHE_DIR
+from utils import mdf_catalog
+from utils.fuzzy_index import ValueCache, probe_column
+from utils.rows import Header, make_rows, json_default
+
+# Predefined search paths for the configured Advance Steel version
+SEARCH_PATHS = mdf_catalog.search_roots()
+
+# Distinct column values kept between runs for "did you mean" suggestions
+VALUE_CACHE = ValueCache(VALUE_CACHE_DIR)
 
 def find_mdf_files():
-    mdf_files = []
-    for base in SEARCH_PATHS:
-        for root, _, files in os.walk(base):
-            for file in files:
-                if file.lower().endswith('.mdf'):
-                    mdf_files.append(os.path.join(root, file))
-    return sorted(mdf_files)
+    files = mdf_catalog.find_mdf_files(SEARCH_PATHS, MDF_CATALOG_FILE)
+    return [f["path"] for f in files]
 
 def connect_to_mdf(mdf_path):
     conn_str = (
         f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-        f"SERVER=(LocalDB)\\ADVANCESTEEL2025;"
+        f"SERVER={DB_CONFIG['server']};"
         f"Integrated Security=true;"
         f"AttachDbFilename={mdf_path};"
     )
@@ -45,11 +45,19 @@ def get_distinct_values(cursor, table_name, column_name):
     cursor.execute(f"SELECT DISTINCT [{column_name}] FROM [{table_name}]")
     return [str(row[0]) for row in cursor.fetchall() if row[0] is not None]
 
+def get_value_index(cursor, mdf_path, table_name, column_name):
+    probe = probe_column(cursor, table_name, column_name)
+    return VALUE_CACHE.get(
+        (mdf_path, table_name, column_name),
+        probe,
+        lambda: get_distinct_values(cursor, table_name, column_name),
+    )
+
 def export_to_json(columns, rows, table_name):
-    records = [dict(zip(columns, row)) for row in rows]
+    records = make_rows(Header(columns), rows)
     filename = f"results_{table_name}.json"
     with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(records, f, indent=4)
+        json.dump(records, f, indent=4, default=json_default)
     print(f"\n💾 Saved {len(rows)} result(s) to '{filename}'")
 
 def main():
@@ -111,8 +119,8 @@ def main():
         return
 
     value = input("🔍 Enter value to match: ").strip()
-    all_values = get_distinct_values(cursor, table_name, filter_col)
-    matches = difflib.get_close_matches(value, all_values, n=3, cutoff=0.6)
+    all_values = get_value_index(cursor, mdf_path, table_name, filter_col)
+    matches = all_values.closest(value, n=3, cutoff=0.6)
 
     if matches and value not in all_values:
         print(f"\n🤖 Did you mean one of these?")
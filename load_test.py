@@ -0,0 +1,339 @@
+"""Load-test the app against a local stand-in for SQL Server.
+
+The app is started in-process on a threaded server with
+:func:`utils.db.connect_sql_server` replaced by a SQLite backend seeded from
+``data/`` (:mod:`utils.fake_sql`), which waits ``--latency-ms`` per statement
+to mimic LocalDB. Clients then replay a weighted mix of ``/view``,
+``/search``, ``/setbolts``, ``/csv`` and editor saves at each concurrency
+level for ``--duration`` seconds. Throughput, p50/p95/p99 latency and the
+error rate are reported per route as JSON, and ``--baseline`` compares them
+with an earlier report.
+
+Example::
+
+    python load_test.py --concurrency 1 4 16 --duration 10 -o run.json
+    python load_test.py --latency-ms 5 --baseline run.json
+"""
+
+import argparse
+import http.client
+import importlib
+import json
+import logging
+import math
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+import config
+from utils.fake_sql import SqliteBackend
+
+DB = config.DEFAULT_DATABASE
+# route -> relative weight
+DEFAULT_MIX = {"view": 20, "search": 35, "setbolts": 15, "csv": 10, "write": 20}
+BROWSE_TABLES = ["SetOfBolts", "ScrewNew", "SetNutsBolts", "AnchorsDefinition", "BoltsDistances"]
+SEARCH_COLUMNS = ["Diameter", "Standard", "Material", "Length"]
+WRITE_TABLE = "AnchorsDefinition"
+WRITE_COLUMN = "Length"
+REQUEST_TIMEOUT = 60
+
+# (method, path, JSON body or None)
+Request = Tuple[str, str, Optional[Dict[str, Any]]]
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Return the nearest-rank ``q`` percentile (0-100) of sorted ``values``."""
+    if not values:
+        return 0.0
+    rank = math.ceil(q / 100 * len(values))
+    return values[min(max(rank, 1), len(values)) - 1]
+
+
+class Workload:
+    """Requests for each route of the mix, drawn from the seeded tables."""
+
+    def __init__(self, backend: SqliteBackend):
+        conn, cur = backend.connect(DB)
+        try:
+            tables = backend.databases.get(DB, [])
+            self.browse = [t for t in BROWSE_TABLES if t in tables]
+            self.samples: Dict[str, List[Dict[str, Any]]] = {}
+            for table in self.browse:
+                cur.execute(f"SELECT * FROM [{table}] ORDER BY RANDOM() LIMIT 200")
+                columns = [c[0] for c in cur.description]
+                self.samples[table] = [dict(zip(columns, r)) for r in cur.fetchall()]
+            self.write_ids: List[Any] = []
+            if WRITE_TABLE in tables:
+                cur.execute(f"SELECT [ID] FROM [{WRITE_TABLE}]")
+                self.write_ids = [r[0] for r in cur.fetchall()]
+            self.standards: List[Any] = []
+            if "SetBolts" in tables:
+                cur.execute("SELECT DISTINCT [Standard] FROM [SetBolts] WHERE [Standard] IS NOT NULL")
+                self.standards = [r[0] for r in cur.fetchall()]
+        finally:
+            conn.close()
+
+    def unavailable(self) -> Dict[str, str]:
+        """Return the routes that cannot run on this data and why."""
+        missing = {}
+        if not self.browse:
+            for route in ("view", "search", "csv"):
+                missing[route] = f"none of {BROWSE_TABLES} in the data"
+        if not self.standards:
+            missing["setbolts"] = "SetBolts is not in the data"
+        if not self.write_ids:
+            missing["write"] = f"{WRITE_TABLE} is not in the data"
+        return missing
+
+    def request(self, route: str, rng: random.Random) -> Request:
+        if route == "write":
+            delta = {
+                "key": ["ID"],
+                "ops": [{
+                    "op": "replace",
+                    "key": {"ID": rng.choice(self.write_ids)},
+                    "value": {WRITE_COLUMN: rng.randint(50, 500)},
+                }],
+            }
+            return "POST", f"/save/{DB}__{WRITE_TABLE}.json/delta", delta
+        if route == "setbolts":
+            standard = quote(str(rng.choice(self.standards)))
+            return "GET", f"/setbolts?Standard={standard}", None
+        table = rng.choice(self.browse)
+        filename = f"{DB}__{table}.json"
+        if route == "view":
+            return "GET", f"/view/{filename}", None
+        if route == "csv":
+            return "GET", f"/csv/{filename}", None
+        row = rng.choice(self.samples[table]) if self.samples[table] else {}
+        columns = [c for c in SEARCH_COLUMNS if row.get(c) is not None]
+        if not columns:
+            return "GET", f"/search/{filename}", None
+        column = rng.choice(columns)
+        value = quote(str(row[column]))
+        return "GET", f"/search/{filename}?{column}={value}", None
+
+
+def start_app(backend: SqliteBackend, workdir: Path, preload: bool = False):
+    """Serve the app on a free local port; return ``(server, port)``."""
+    config.READ_ONLY = False
+    config.WATCH_INTERVAL = 0
+    config.JOURNAL_DIR = str(workdir / "journal")
+    import app as app_module
+
+    app_module = importlib.reload(app_module)
+    app_module.connect_sql_server = backend.connect
+    if preload:
+        from utils import catalog
+
+        tables = set(backend.databases.get(DB, []))
+        catalog.clear()
+        catalog.preload(
+            [f for f in catalog.CATALOG_TABLES if f.split("__", 1)[1][:-5] in tables],
+            app_module.load_table_data,
+        )
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="load-test-app", daemon=True).start()
+    return server, server.server_port
+
+
+def send(port: int, request: Request) -> int:
+    """Send one request and return its status, reading the whole body."""
+    method, path, body = request
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=REQUEST_TIMEOUT)
+    try:
+        headers = {"Accept-Encoding": "gzip"}
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        conn.request(method, path, body=data, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    finally:
+        conn.close()
+
+
+def run_level(
+    port: int,
+    workload: Workload,
+    mix: Dict[str, int],
+    concurrency: int,
+    duration: float,
+    seed: int,
+) -> Dict[str, Any]:
+    """Run ``concurrency`` clients for ``duration`` seconds and summarize."""
+    routes = list(mix)
+    weights = [mix[r] for r in routes]
+    # route -> list of (seconds, status or None for a failed request)
+    results: Dict[str, List[Tuple[float, Optional[int]]]] = {r: [] for r in routes}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(i: int) -> None:
+        rng = random.Random(seed * 1000 + i)
+        local: List[Tuple[str, float, Optional[int]]] = []
+        while time.perf_counter() < deadline:
+            route = rng.choices(routes, weights)[0]
+            request = workload.request(route, rng)
+            start = time.perf_counter()
+            try:
+                status: Optional[int] = send(port, request)
+            except Exception:
+                status = None
+            local.append((route, time.perf_counter() - start, status))
+        with lock:
+            for route, elapsed, status in local:
+                results[route].append((elapsed, status))
+
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=client, args=(i,), name=f"load-client-{i}")
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    def summarize(samples: List[Tuple[float, Optional[int]]]) -> Dict[str, Any]:
+        times = sorted(s[0] * 1000 for s in samples)
+        errors = sum(1 for _, status in samples if status is None or status >= 400)
+        statuses: Dict[str, int] = {}
+        for _, status in samples:
+            key = str(status) if status is not None else "failed"
+            statuses[key] = statuses.get(key, 0) + 1
+        return {
+            "requests": len(samples),
+            "errors": errors,
+            "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+            "throughput_rps": round(len(samples) / elapsed, 2),
+            "p50_ms": round(percentile(times, 50), 2),
+            "p95_ms": round(percentile(times, 95), 2),
+            "p99_ms": round(percentile(times, 99), 2),
+            "statuses": statuses,
+        }
+
+    return {
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 2),
+        "overall": summarize([s for samples in results.values() for s in samples]),
+        "routes": {route: summarize(samples) for route, samples in results.items()},
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Return lines comparing throughput and p95 with ``baseline`` per route."""
+    lines = []
+    before = {level["concurrency"]: level for level in baseline.get("levels", [])}
+    for level in report["levels"]:
+        old_level = before.get(level["concurrency"])
+        if old_level is None:
+            continue
+        for route, now in dict(level["routes"], overall=level["overall"]).items():
+            old = old_level["overall"] if route == "overall" else old_level["routes"].get(route)
+            if not old or not old["requests"] or not now["requests"]:
+                continue
+            rps = (now["throughput_rps"] / old["throughput_rps"] - 1) * 100 if old["throughput_rps"] else 0
+            p95 = (now["p95_ms"] / old["p95_ms"] - 1) * 100 if old["p95_ms"] else 0
+            lines.append(
+                f"c={level['concurrency']:<3} {route:<9} throughput {rps:+6.1f}%  p95 {p95:+6.1f}%"
+            )
+    return lines
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    """Parse ``route=weight,...`` into a mix."""
+    mix = {}
+    for part in text.split(","):
+        route, _, weight = part.partition("=")
+        if route.strip() not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown route {route!r}")
+        mix[route.strip()] = int(weight)
+    return mix
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the app against a SQLite stand-in")
+    parser.add_argument("--data-dir", default="data", help="Folder of <DB>__<Table>.json files")
+    parser.add_argument(
+        "--latency-ms", type=float, default=2.0, help="Delay added to every SQL statement"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 4, 16], help="Client counts to run"
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per level")
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=DEFAULT_MIX,
+        help="Route weights, e.g. view=20,search=35,setbolts=15,csv=10,write=20",
+    )
+    parser.add_argument(
+        "--preload", action="store_true", help="Preload the catalog tables as serve.py does"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("-o", "--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare with")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="load_test_") as workdir:
+        backend = SqliteBackend(args.data_dir, args.latency_ms / 1000, Path(workdir) / "sql")
+        workload = Workload(backend)
+        skipped = workload.unavailable()
+        mix = {r: w for r, w in args.mix.items() if w > 0 and r not in skipped}
+        if not mix:
+            sys.exit("No route of the mix can run on this data")
+        server, port = start_app(backend, Path(workdir), args.preload)
+        report: Dict[str, Any] = {
+            "settings": {
+                "latency_ms": args.latency_ms,
+                "duration_s": args.duration,
+                "mix": mix,
+                "preload": args.preload,
+                "seed": args.seed,
+            },
+            "skipped": skipped,
+            "levels": [],
+        }
+        try:
+            for concurrency in args.concurrency:
+                level = run_level(port, workload, mix, concurrency, args.duration, args.seed)
+                report["levels"].append(level)
+                overall = level["overall"]
+                print(
+                    f"c={concurrency:<3} {overall['throughput_rps']:8.1f} req/s  "
+                    f"p50 {overall['p50_ms']:7.1f} ms  p95 {overall['p95_ms']:7.1f} ms  "
+                    f"p99 {overall['p99_ms']:7.1f} ms  errors {overall['error_rate']:.2%}",
+                    file=sys.stderr,
+                )
+        finally:
+            server.shutdown()
+            server.server_close()
+        for route, reason in skipped.items():
+            print(f"skipped {route}: {reason}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            for line in compare(report, json.load(f)):
+                print(line, file=sys.stderr)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
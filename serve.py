@@ -0,0 +1,271 @@
+"""Production entry point serving the app from several worker processes.
+
+The catalog tables and the lookup indexes built from them are loaded once in
+the parent process, frozen out of the garbage collector and then shared by
+forked workers copy-on-write. Workers agree on table versions through a
+shared version file (see :func:`utils.table_cache.share_versions`); after a
+write, the parent reloads the catalog from SQL and replaces the workers so
+they share the fresh copy again. A separate process polls for changes made
+outside the app (see :mod:`utils.change_watch`) and records them in the same
+file.
+
+On platforms without ``fork`` (Windows) the preloaded app is served by a
+single multi-threaded process.
+
+Examples::
+
+    python serve.py --workers 4
+    python serve.py --data-dir sql_dump_2025 --report-memory
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from werkzeug.serving import make_server
+
+import app as app_module
+from config import VERSION_FILE
+from utils import catalog, table_cache
+from utils.distances import DISTANCE_TABLES
+from utils.json_handler import load_json
+
+RELOAD_DELAY = 5.0
+POLL_INTERVAL = 0.5
+
+
+def preload(data_dir: Optional[str] = None) -> float:
+    """Load the catalog tables and warm the lookup indexes.
+
+    ``data_dir`` loads the tables from a ``sql_dump.py`` folder instead of
+    SQL. Returns the time taken in seconds.
+    """
+    start = time.perf_counter()
+    catalog.clear()
+    if data_dir:
+        tables = [f for f in catalog.CATALOG_TABLES if (Path(data_dir) / f).exists()]
+        catalog.preload(tables, lambda f: load_json(Path(data_dir) / f)["data"])
+    else:
+        catalog.preload(catalog.CATALOG_TABLES, app_module.load_table_data)
+    warmers = [
+        app_module.get_bolt_set_index,
+        app_module.get_takeoff_index,
+        app_module.get_grip_index,
+        app_module.get_availability_cube,
+        app_module.get_anchor_catalog,
+        app_module.get_connector_catalog,
+    ] + [lambda kind=kind: app_module.get_distance_table(kind) for kind in DISTANCE_TABLES]
+    for warm in warmers:
+        try:
+            warm()
+        except Exception as e:
+            print(f"Warning: could not prebuild index: {e}", file=sys.stderr)
+    # Keep the collector from touching (and so copying) the shared objects.
+    gc.collect()
+    gc.freeze()
+    return time.perf_counter() - start
+
+
+def memory_usage(pid: int) -> Optional[Dict[str, int]]:
+    """Return resident, proportional and private memory of ``pid`` in kB.
+
+    Read from ``/proc/<pid>/smaps_rollup``; returns ``None`` where that is
+    unavailable.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            fields = {}
+            for line in f:
+                name, _, rest = line.partition(":")
+                parts = rest.split()
+                if len(parts) == 2 and parts[1] == "kB":
+                    fields[name] = int(parts[0])
+    except OSError:
+        return None
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def run_worker(sock: socket.socket, host: str, port: int) -> None:
+    """Serve requests on the inherited listening socket until SIGTERM."""
+    # Threaded so open /events streams do not tie up the worker.
+    server = make_server(host, port, app_module.app, threaded=True, fd=sock.fileno())
+
+    def stop(signum, frame):
+        # shutdown() waits for the serve loop, so it cannot run in the handler.
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    server.serve_forever()
+
+
+def spawn_watcher() -> Optional[int]:
+    """Fork a process polling for changes made outside the app."""
+    watcher = app_module.make_change_watcher()
+    if watcher is None:
+        return None
+    pid = os.fork()
+    if pid == 0:
+        try:
+            signal.signal(signal.SIGTERM, lambda signum, frame: watcher.stop())
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            watcher.run()
+        finally:
+            os._exit(0)
+    return pid
+
+
+def spawn(sock: socket.socket, host: str, port: int) -> int:
+    pid = os.fork()
+    if pid == 0:
+        try:
+            run_worker(sock, host, port)
+        finally:
+            os._exit(0)
+    return pid
+
+
+def terminate(pid: int) -> None:
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+
+
+def report_memory(pids: List[int]) -> None:
+    for label, pid in [("parent", os.getpid())] + [("worker", p) for p in pids]:
+        usage = memory_usage(pid)
+        if usage is None:
+            print(f"{label} {pid}: memory usage unavailable")
+        else:
+            print(
+                f"{label} {pid}: rss {usage['rss'] / 1024:.1f} MB, "
+                f"pss {usage['pss'] / 1024:.1f} MB, "
+                f"private {usage['private'] / 1024:.1f} MB"
+            )
+
+
+def serve_forked(args) -> None:
+    version_file = Path(args.version_file)
+    if version_file.exists():
+        version_file.unlink()
+    table_cache.share_versions(version_file)
+    elapsed = preload(args.data_dir)
+    preloaded = len(catalog.loaded_tables())
+    print(f"Preloaded {preloaded} tables in {elapsed:.2f}s")
+
+    sock = socket.create_server((args.host, args.port), backlog=128)
+    workers = [spawn(sock, args.host, args.port) for _ in range(args.workers)]
+    print(f"Serving on http://{args.host}:{args.port} with {args.workers} workers")
+    if args.report_memory:
+        time.sleep(1)
+        report_memory(workers)
+    # The parent stays single-threaded so forking new workers is safe.
+    watcher = spawn_watcher()
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    changed_at = None
+    while not stopping:
+        time.sleep(POLL_INTERVAL)
+        while True:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                pid = 0
+            if not pid:
+                break
+            if stopping:
+                continue
+            if pid in workers:
+                workers[workers.index(pid)] = spawn(sock, args.host, args.port)
+            elif pid == watcher:
+                watcher = spawn_watcher()
+        table_cache.sync_versions()
+        if changed_at is None and len(catalog.loaded_tables()) < preloaded:
+            changed_at = time.monotonic()
+        if changed_at is not None and time.monotonic() - changed_at >= RELOAD_DELAY:
+            # Reload shortly after the first write so bursts are batched,
+            # then roll the workers onto the fresh copy.
+            changed_at = None
+            # Writes land in SQL, so reload from there even when started
+            # from --data-dir; the dump still holds the rows as they were.
+            try:
+                elapsed = preload()
+            except Exception as e:
+                # Keep the current workers and try again after the delay.
+                print(f"Warning: could not reload catalog: {e}", file=sys.stderr)
+                changed_at = time.monotonic()
+                continue
+            preloaded = len(catalog.loaded_tables())
+            print(f"Reloaded catalog in {elapsed:.2f}s")
+            old = workers
+            workers = [spawn(sock, args.host, args.port) for _ in range(args.workers)]
+            for pid in old:
+                terminate(pid)
+
+    if watcher:
+        workers.append(watcher)
+    for pid in workers:
+        terminate(pid)
+    for pid in workers:
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the app with preforked workers")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=5000, help="Port to bind")
+    parser.add_argument(
+        "-w", "--workers", type=int, default=os.cpu_count() or 1,
+        help="Number of worker processes",
+    )
+    parser.add_argument(
+        "--data-dir",
+        help="Preload catalog tables from a sql_dump.py folder instead of SQL",
+    )
+    parser.add_argument(
+        "--version-file", default=VERSION_FILE,
+        help="File shared by workers to track table writes",
+    )
+    parser.add_argument(
+        "--report-memory", action="store_true",
+        help="Print memory use of the parent and each worker after startup",
+    )
+    args = parser.parse_args()
+
+    if hasattr(os, "fork"):
+        serve_forked(args)
+        return
+    elapsed = preload(args.data_dir)
+    print(f"Preloaded {len(catalog.loaded_tables())} tables in {elapsed:.2f}s")
+    print(f"Serving on http://{args.host}:{args.port} (single process)")
+    watcher = app_module.make_change_watcher()
+    if watcher:
+        watcher.start()
+    make_server(args.host, args.port, app_module.app, threaded=True).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
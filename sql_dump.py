@@ -3,6 +3,7 @@
 import os
 import json
 from utils.db import connect_sql_server
+from utils.rows import fetch_rows, json_default
 
 OUTPUT_DIR = "sql_dump"
 
@@ -37,8 +38,7 @@ def get_tables(cursor):
 def dump_table(cursor, db_name, table_name):
     try:
         cursor.execute(f"SELECT * FROM [{table_name}]")
-        columns = [column[0] for column in cursor.description]
-        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        rows = fetch_rows(cursor)
 
         os.makedirs(OUTPUT_DIR, exist_ok=True)
         file_name = f"{db_name}__{table_name}.json"
@@ -49,7 +49,7 @@ def dump_table(cursor, db_name, table_name):
                 "_source_database": db_name,
                 "_table_name": table_name,
                 "data": rows
-            }, f, indent=2, ensure_ascii=False)
+            }, f, indent=2, ensure_ascii=False, default=json_default)
 
         print(f"✅ Dumped {file_name} ({len(rows)} rows)")
     except Exception as e:
@@ -57,8 +57,7 @@ def dump_table(cursor, db_name, table_name):
 
 
 def main():
-    conn = connect_sql_server()
-    cursor = conn.cursor()
+    conn, cursor = connect_sql_server()
 
     databases = get_databases(cursor)
     print(f"\n📦 Found {len(databases)} core Advance Steel databases")
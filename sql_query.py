@@ -1,44 +1,184 @@
 # sql_query.py
-"""Run arbitrary SQL queries against the configured server."""
+"""Run arbitrary SQL queries against the configured server.
+
+``table`` and ``json`` output wait for the whole result. ``--stream``,
+``ndjson`` and ``csv`` print rows as each ``fetchmany`` batch arrives; a
+streamed table takes its column widths from the first ``--sample`` rows.
+"""
 
 import argparse
+import csv
+import io
 import json
-from typing import List, Dict, Optional, Any
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
 from utils.db import connect_sql_server
+from utils.rows import FETCH_SIZE, Header, Row, json_default, make_rows
+
+# Rows a streamed table reads before fixing its column widths.
+SAMPLE_ROWS = 100
+
+
+def execute(cursor, query: str, database: Optional[str] = None) -> None:
+    """Execute ``query``, switching to ``database`` first if given."""
+    if database:
+        cursor.execute(f"USE [{database}]")
+    cursor.execute(query)
+
+
+def iter_batches(
+    cursor,
+    limit: Optional[int] = None,
+    size: int = FETCH_SIZE,
+) -> Iterator[List[Sequence[Any]]]:
+    """Yield the current result set ``size`` rows at a time, up to ``limit`` rows."""
+    if cursor.description is None:
+        return
+    remaining = limit
+    while remaining is None or remaining > 0:
+        batch = cursor.fetchmany(size if remaining is None else min(size, remaining))
+        if not batch:
+            return
+        if remaining is not None:
+            remaining -= len(batch)
+        yield batch
 
 
 def run_query(
     cursor,
     query: str,
     database: Optional[str] = None,
-) -> List[Dict[str, Any]]:
-    """Execute a SQL query and return results as a list of dicts."""
-    if database:
-        cursor.execute(f"USE [{database}]")
-    cursor.execute(query)
+    limit: Optional[int] = None,
+) -> List[Row]:
+    """Execute a SQL query and return the result rows (at most ``limit``)."""
+    execute(cursor, query, database)
     if cursor.description is None:
         return []
-    columns = [col[0] for col in cursor.description]
-    rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
-    return rows
+    header = Header.from_cursor(cursor)
+    return [row for batch in iter_batches(cursor, limit) for row in make_rows(header, batch)]
+
+
+def _fit(text: str, width: int) -> str:
+    if len(text) > width:
+        return text[:max(width - 1, 0)] + "…"
+    return text.ljust(width)
 
 
 def format_table(rows: List[Dict[str, Any]]) -> str:
     if not rows:
         return "No results."
     columns = list(rows[0].keys())
-    widths = {c: len(c) for c in columns}
-    for row in rows:
-        for c in columns:
-            widths[c] = max(widths[c], len(str(row[c])))
-    header = " | ".join(c.ljust(widths[c]) for c in columns)
-    sep = "-+-".join("-" * widths[c] for c in columns)
+    cells = [[str(row[c]) for c in columns] for row in rows]
+    widths = [len(c) for c in columns]
+    for values in cells:
+        widths = [max(w, len(v)) for w, v in zip(widths, values)]
+    header = " | ".join(c.ljust(w) for c, w in zip(columns, widths))
+    sep = "-+-".join("-" * w for w in widths)
     lines = [header, sep]
-    for row in rows:
-        lines.append(" | ".join(str(row[c]).ljust(widths[c]) for c in columns))
+    for values in cells:
+        lines.append(" | ".join(v.ljust(w) for v, w in zip(values, widths)))
     return "\n".join(lines)
 
 
+def stream_table(
+    columns: Sequence[str],
+    batches: Iterable[Sequence[Sequence[Any]]],
+    sample: int = SAMPLE_ROWS,
+    max_width: Optional[int] = None,
+) -> Iterator[str]:
+    """Yield table lines as batches arrive.
+
+    Column widths are fixed after the first ``sample`` rows, so a later
+    value that is wider than its column is printed in full and shifts the
+    rest of its line. ``max_width`` caps every column, cutting longer values
+    with an ellipsis.
+    """
+    widths = [len(c) for c in columns]
+    pending: List[List[str]] = []
+    started = False
+
+    def line(values):
+        if max_width is None:
+            return " | ".join(v.ljust(w) for v, w in zip(values, widths))
+        return " | ".join(_fit(v, w) for v, w in zip(values, widths))
+
+    def start():
+        nonlocal widths
+        if max_width is not None:
+            widths = [min(w, max_width) for w in widths]
+        yield line(list(columns))
+        yield "-+-".join("-" * w for w in widths)
+        for values in pending:
+            yield line(values)
+        pending.clear()
+
+    for batch in batches:
+        for record in batch:
+            values = [str(v) for v in record]
+            if started:
+                yield line(values)
+                continue
+            pending.append(values)
+            widths = [max(w, len(v)) for w, v in zip(widths, values)]
+            if len(pending) >= sample:
+                started = True
+                yield from start()
+    if not started:
+        if not pending:
+            yield "No results."
+            return
+        yield from start()
+
+
+def stream_ndjson(
+    columns: Sequence[str],
+    batches: Iterable[Sequence[Sequence[Any]]],
+) -> Iterator[str]:
+    """Yield one JSON object per row."""
+    for batch in batches:
+        for record in batch:
+            yield json.dumps(dict(zip(columns, record)), ensure_ascii=False, default=json_default)
+
+
+def stream_csv(
+    columns: Sequence[str],
+    batches: Iterable[Sequence[Sequence[Any]]],
+) -> Iterator[str]:
+    """Yield the CSV header, then the CSV text of each batch."""
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows(batch)
+        yield output.getvalue().rstrip("\n")
+        output.seek(0)
+        output.truncate()
+    if output.getvalue():
+        yield output.getvalue().rstrip("\n")
+
+
+class Timer:
+    """Wrap batches to record the time to the first row and the row count."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first_row: Optional[float] = None
+        self.rows = 0
+
+    def track(self, batches: Iterable[Sequence[Any]]) -> Iterator[Sequence[Any]]:
+        for batch in batches:
+            if self.first_row is None and batch:
+                self.first_row = time.perf_counter() - self.start
+            self.rows += len(batch)
+            yield batch
+
+    def report(self) -> str:
+        total = time.perf_counter() - self.start
+        first = "no rows" if self.first_row is None else f"first row after {self.first_row:.3f} s"
+        return f"{self.rows} rows in {total:.3f} s ({first})"
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run a direct SQL query.")
     parser.add_argument("query", help="SQL statement to execute")
@@ -50,21 +190,60 @@ def main() -> None:
     parser.add_argument(
         "-o",
         "--output",
-        choices=["table", "json"],
+        choices=["table", "json", "ndjson", "csv"],
         default="table",
-        help="Output format",
+        help="Output format (ndjson and csv are always streamed)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print table rows as they arrive instead of after the query ends",
+    )
+    parser.add_argument("--limit", type=int, help="Stop after this many rows")
+    parser.add_argument(
+        "--sample",
+        type=int,
+        default=SAMPLE_ROWS,
+        help="Rows a streamed table reads to size its columns",
+    )
+    parser.add_argument("--width", type=int, help="Maximum width of a streamed table column")
+    parser.add_argument(
+        "--timing",
+        action="store_true",
+        help="Report the time to the first row and the total time on stderr",
     )
     args = parser.parse_args()
 
-    conn = connect_sql_server()
-    cur = conn.cursor()
-    results = run_query(cur, args.query, args.database)
-    conn.close()
-
-    if args.output == "json":
-        print(json.dumps(results, indent=2, ensure_ascii=False))
-    else:
-        print(format_table(results))
+    conn, cur = connect_sql_server()
+    timer = Timer()
+    try:
+        execute(cur, args.query, args.database)
+        if args.output == "json" or (args.output == "table" and not args.stream):
+            header = Header.from_cursor(cur) if cur.description is not None else None
+            results = [
+                row
+                for batch in timer.track(iter_batches(cur, args.limit))
+                for row in make_rows(header, batch)
+            ]
+            if args.output == "json":
+                print(json.dumps(results, indent=2, ensure_ascii=False, default=json_default))
+            else:
+                print(format_table(results))
+        else:
+            columns = [c[0] for c in cur.description or []]
+            batches = timer.track(iter_batches(cur, args.limit))
+            if args.output == "ndjson":
+                lines = stream_ndjson(columns, batches)
+            elif args.output == "csv":
+                lines = stream_csv(columns, batches)
+            else:
+                lines = stream_table(columns, batches, args.sample, args.width)
+            for text in lines:
+                print(text, flush=True)
+    finally:
+        conn.close()
+    if args.timing:
+        print(timer.report(), file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,25 @@
+// Follow table version bumps pushed by the server over /events.
+function watchTables(tables, onChange) {
+  if (!window.EventSource) {
+    return;
+  }
+  const source = new EventSource('/events?tables=' + encodeURIComponent(tables.join(',')));
+  source.addEventListener('table', e => onChange(JSON.parse(e.data)));
+}
+
+// Show a notice with a reload link instead of reloading over unsaved edits.
+function showStaleNotice(message) {
+  if (document.getElementById('stale-notice')) {
+    return;
+  }
+  const notice = document.createElement('div');
+  notice.id = 'stale-notice';
+  notice.className = 'alert alert-warning';
+  notice.textContent = message + ' ';
+  const link = document.createElement('a');
+  link.href = '#';
+  link.textContent = 'Reload';
+  link.onclick = () => { location.reload(); return false; };
+  notice.appendChild(link);
+  document.querySelector('.container').prepend(notice);
+}
@@ -0,0 +1,249 @@
+"""Turn a CSV list of bolt callouts into an aggregated bill of materials.
+
+Each callout names a bolt by Standard, Set, Material (grade), Diameter and
+Length with an optional Quantity. Callouts are resolved against ScrewNew and
+the resolved SetOfBolts/SetNutsBolts assemblies, then quantities and weights
+are totalled per component.
+"""
+
+import argparse
+import csv
+import os
+import sys
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils.bolt_sets import build_set_index, set_key
+from utils.db import connect_sql_server
+from utils.rows import fetch_rows
+
+BOM_FIELDS = [
+    "Standard",
+    "Material",
+    "Diameter",
+    "Length",
+    "Name",
+    "Quantity",
+    "UnitWeight",
+    "Weight",
+]
+CHUNK_SIZE = 20000
+
+# Component key -> [name, quantity, unit weight]
+Totals = Dict[Tuple[Any, ...], List[Any]]
+Callout = Tuple[int, Tuple[Any, ...], Any, int]
+
+_worker_index: Optional[Dict[str, Any]] = None
+
+
+def build_takeoff_index(
+    set_rows: Iterable[Dict[str, Any]],
+    screw_rows: Iterable[Dict[str, Any]],
+    component_rows: Iterable[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Precompute the lookups needed to resolve callouts."""
+    screws = {
+        set_key(r.get("Standard"), r.get("Set"), r.get("Material"), r.get("Diameter"))
+        for r in screw_rows
+    }
+    return {"sets": build_set_index(set_rows, component_rows), "screws": screws}
+
+
+def load_takeoff_index(database: str = "ASTORBASE") -> Dict[str, Any]:
+    """Read SetOfBolts, ScrewNew and SetNutsBolts and build the index."""
+    conn, cur = connect_sql_server(database)
+    tables = {}
+    for table in ["SetOfBolts", "ScrewNew", "SetNutsBolts"]:
+        cur.execute(f"SELECT * FROM [{table}]")
+        tables[table] = fetch_rows(cur)
+    conn.close()
+    return build_takeoff_index(
+        tables["SetOfBolts"], tables["ScrewNew"], tables["SetNutsBolts"]
+    )
+
+
+def iter_records(reader) -> Iterator[Tuple[int, List[str]]]:
+    """Yield ``(line_number, values)`` of the non-blank records of a ``csv.reader``.
+
+    The line number is the physical line a record starts on, which differs
+    from the record count once quoted fields span several lines.
+    """
+    line_no = reader.line_num
+    for values in reader:
+        if values:
+            yield line_no + 1, values
+        line_no = reader.line_num
+
+
+def callouts_from_records(
+    fieldnames: List[str],
+    records: Iterable[Tuple[int, List[str]]],
+) -> Iterator[Callout]:
+    """Yield callouts from ``(line_number, values)`` records."""
+    for line_no, values in records:
+        row = dict(zip(fieldnames, values))
+        key = set_key(row.get("Standard"), row.get("Set"), row.get("Material"), row.get("Diameter"))
+        try:
+            quantity = int(row.get("Quantity") or 1)
+        except ValueError:
+            quantity = 0
+        yield line_no, key, row.get("Length"), quantity
+
+
+def resolve_callouts(
+    callouts: Iterable[Callout],
+    index: Dict[str, Any],
+) -> Tuple[Totals, List[Tuple[int, str]]]:
+    """Aggregate callouts into component totals.
+
+    Returns
+    -------
+    tuple
+        ``(totals, errors)`` where ``errors`` lists ``(line_number, reason)``
+        for callouts that could not be resolved.
+    """
+    sets = index["sets"]
+    screws = index["screws"]
+    totals: Totals = {}
+    errors = []
+    for line_no, key, length, quantity in callouts:
+        if quantity <= 0:
+            errors.append((line_no, "invalid quantity"))
+            continue
+        if key not in screws:
+            errors.append((line_no, "no ScrewNew entry"))
+            continue
+        resolved = sets.get(key)
+        if resolved is None:
+            errors.append((line_no, "no SetOfBolts entry"))
+            continue
+        try:
+            length = float(length)
+        except (TypeError, ValueError):
+            errors.append((line_no, "invalid length"))
+            continue
+
+        bolt_key = (key[0], key[2], key[3], length)
+        entry = totals.setdefault(bolt_key, [f"Bolt {key[1]}", 0, None])
+        entry[1] += quantity
+        for part in resolved["components"]:
+            part_key = (part["Standard"], part["Material"], part["Diameter"], None)
+            entry = totals.setdefault(part_key, [part["Name"], 0, part["Weight"]])
+            entry[1] += quantity
+    return totals, errors
+
+
+def merge_totals(target: Totals, other: Totals) -> Totals:
+    """Add the quantities from ``other`` into ``target``."""
+    for key, (name, quantity, unit_weight) in other.items():
+        entry = target.setdefault(key, [name, 0, unit_weight])
+        entry[1] += quantity
+    return target
+
+
+def _init_worker(index: Dict[str, Any]) -> None:
+    global _worker_index
+    _worker_index = index
+
+
+def _resolve_chunk(fieldnames: List[str], records: List[Tuple[int, List[str]]]):
+    return resolve_callouts(callouts_from_records(fieldnames, records), _worker_index)
+
+
+def takeoff(
+    lines: Iterable[str],
+    index: Dict[str, Any],
+    workers: int = 1,
+    chunk_size: int = CHUNK_SIZE,
+) -> Tuple[Totals, List[Tuple[int, str]]]:
+    """Stream callouts from CSV ``lines`` and return aggregated totals.
+
+    Inputs longer than one ``chunk_size`` records are resolved across
+    ``workers`` processes. The CSV is parsed here, so quoted fields spanning
+    lines stay intact, and chunks of parsed records are shipped to the
+    workers. The index is shipped to each worker once and at most two chunks
+    per worker are in flight, so memory stays bounded.
+    """
+    reader = csv.reader(lines)
+    fieldnames = next(reader, None)
+    if fieldnames is None:
+        return {}, []
+    records = iter_records(reader)
+    first = list(islice(records, chunk_size))
+    if workers <= 1 or len(first) < chunk_size:
+        return resolve_callouts(callouts_from_records(fieldnames, chain(first, records)), index)
+
+    # Only large inputs need the pool, so load it on demand.
+    from concurrent.futures import ProcessPoolExecutor
+
+    totals: Totals = {}
+    errors: List[Tuple[int, str]] = []
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(index,)
+    ) as pool:
+        pending = []
+        chunk = first
+        while chunk:
+            pending.append(pool.submit(_resolve_chunk, fieldnames, chunk))
+            if len(pending) >= workers * 2:
+                part_totals, part_errors = pending.pop(0).result()
+                merge_totals(totals, part_totals)
+                errors.extend(part_errors)
+            chunk = list(islice(records, chunk_size))
+        for future in pending:
+            part_totals, part_errors = future.result()
+            merge_totals(totals, part_totals)
+            errors.extend(part_errors)
+    return totals, errors
+
+
+def iter_bom_rows(totals: Totals) -> Iterator[List[Any]]:
+    """Yield BOM rows (without header) sorted by component."""
+    for key in sorted(totals, key=lambda k: tuple("" if v is None else str(v) for v in k)):
+        standard, material, diameter, length = key
+        name, quantity, unit_weight = totals[key]
+        weight = None if unit_weight is None else round(unit_weight * quantity, 6)
+        yield [standard, material, diameter, length, name, quantity, unit_weight, weight]
+
+
+def iter_bom_csv(totals: Totals) -> Iterator[str]:
+    """Yield the BOM as CSV text one line at a time."""
+    class _Line:
+        def write(self, text):
+            return text
+
+    writer = csv.writer(_Line())
+    yield writer.writerow(BOM_FIELDS)
+    for row in iter_bom_rows(totals):
+        yield writer.writerow(row)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build a BOM from bolt callouts")
+    parser.add_argument("input", help="CSV file with bolt callouts")
+    parser.add_argument("output", help="Output BOM CSV file")
+    parser.add_argument("-d", "--database", default="ASTORBASE", help="Database name")
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for large inputs",
+    )
+    args = parser.parse_args()
+
+    index = load_takeoff_index(args.database)
+    # utf-8-sig drops the byte order mark Excel writes in front of the header.
+    with open(args.input, newline="", encoding="utf-8-sig") as f:
+        totals, errors = takeoff(f, index, workers=args.workers)
+    with open(args.output, "w", newline="", encoding="utf-8") as f:
+        for line in iter_bom_csv(totals):
+            f.write(line)
+
+    for line_no, reason in errors:
+        print(f"Line {line_no}: {reason}", file=sys.stderr)
+    print(f"Wrote {len(totals)} BOM lines ({len(errors)} unresolved callouts)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+from utils.anchor_catalog import browse, build_anchor_catalog, facet_value, select
+
+NAMES = [
+    {"ID": 1, "Standard": "L", "ClassID": 3, "MaterialKey": "4.6", "Diameter": 10.0, "SetName": "MuS"},
+    {"ID": 2, "Standard": "L", "ClassID": 3, "MaterialKey": "8.8", "Diameter": 12.0, "SetName": "MuS"},
+    {"ID": 3, "Standard": "J", "ClassID": 1, "MaterialKey": "4.6", "Diameter": 12.0, "SetName": None},
+]
+DEFINITIONS = [
+    {"ID": 10, "AnchorID": 2, "Length": 300.0},
+    {"ID": 11, "AnchorID": 2, "Length": 400.0},
+]
+
+
+def test_facet_value_normalizes_numbers():
+    assert facet_value(12.0) == "12"
+    assert facet_value("12.0") == "12"
+    assert facet_value(4.6) == "4.6"
+    assert facet_value(None) == ""
+
+
+def test_select_intersects_facets_and_unions_values():
+    catalog = build_anchor_catalog(NAMES, DEFINITIONS)
+    assert select(catalog, {"Diameter": ["12"]}) == 0b110
+    assert select(catalog, {"Diameter": ["12"], "Standard": ["L"]}) == 0b010
+    assert select(catalog, {"Diameter": ["10", "12"], "MaterialKey": ["4.6"]}) == 0b101
+
+
+def test_browse_counts_and_joins_definitions():
+    catalog = build_anchor_catalog(NAMES, DEFINITIONS)
+    result = browse(catalog, {"Standard": ["L"], "Diameter": ["12"]})
+    assert result["count"] == 1
+    assert [d["Length"] for d in result["anchors"][0]["definitions"]] == [300.0, 400.0]
+    # Counts for a facet ignore that facet's own selection.
+    assert result["facets"]["Standard"] == {"J": 1, "L": 1}
+    assert result["facets"]["Diameter"] == {"10": 1, "12": 1}
+    assert result["facets"]["SetName"] == {"MuS": 1}
+
+
+def test_selected_values_stay_listed_at_zero():
+    catalog = build_anchor_catalog(NAMES, DEFINITIONS)
+    result = browse(catalog, {"Standard": ["J"], "SetName": ["MuS"], "Diameter": ["99"]})
+    assert result["count"] == 0
+    assert result["facets"]["SetName"]["MuS"] == 0
+    assert result["facets"]["Diameter"]["99"] == 0
+
+
+def test_browse_paginates():
+    catalog = build_anchor_catalog(NAMES, DEFINITIONS)
+    result = browse(catalog, {}, limit=1, offset=1)
+    assert result["count"] == 3
+    assert [a["ID"] for a in result["anchors"]] == [2]
@@ -1,10 +1,14 @@
+import io
 import json
 import importlib
+import zipfile
 from pathlib import Path
 import pytest
 
 import config
 import app as app_module
+from utils import table_cache
+from utils.row_keys import row_version
 
 TABLE_ROWS = [(1, "Alice"), (2, "Bob")]
 
@@ -14,11 +18,27 @@ def fake_connect_sql_server(database=config.DEFAULT_DATABASE):
         def __init__(self):
             self.description = []
             self.results = []
+            self.sets = []
 
         def execute(self, query, params=None):
-            if "INFORMATION_SCHEMA.TABLES" in query:
-                self.description = [("TABLE_NAME",)]
-                self.results = [("MockTable",)]
+            if query.startswith("SET NOCOUNT ON"):
+                # The schema batch: probe, row counts, columns, keys, foreign keys.
+                self.results = [("2025-01-01", 1)]
+                self.sets = [
+                    [("MockTable", len(TABLE_ROWS))],
+                    [("MockTable", "id", "int", False, False),
+                     ("MockTable", "name", "nvarchar", True, False)],
+                    [],
+                    [],
+                ]
+            elif "FROM sys.tables" in query:
+                self.results = [("2025-01-01", 1)]
+            elif query.startswith("SELECT TOP") and "LIKE" in query:
+                self.description = [("id",), ("name",)]
+                self.results = [r for r in TABLE_ROWS if params[0].strip("%") in r[1]]
+            elif query.startswith("SELECT *") and "WHERE" in query:
+                self.description = [("id",), ("name",)]
+                self.results = [r for r in TABLE_ROWS if r[0] == params[0]]
             elif query.startswith("SELECT *"):
                 self.description = [("id",), ("name",)]
                 self.results = TABLE_ROWS
@@ -33,20 +53,50 @@ def fake_connect_sql_server(database=config.DEFAULT_DATABASE):
                 self.results = []
             elif query.startswith("INSERT"):
                 TABLE_ROWS.append(tuple(params))
+            elif query.startswith("UPDATE"):
+                name, row_id = params
+                TABLE_ROWS[:] = [
+                    (r[0], name) if r[0] == row_id else r for r in TABLE_ROWS
+                ]
 
         def fetchall(self):
             return self.results
 
+        def fetchone(self):
+            return self.results[0] if self.results else None
+
+        def fetchmany(self, size):
+            batch, self.results = self.results[:size], self.results[size:]
+            return batch
+
+        def nextset(self):
+            self.results = self.sets.pop(0)
+            return True
+
     class MockConn:
+        autocommit = True
+
+        def commit(self):
+            pass
+
+        def rollback(self):
+            pass
+
         def close(self):
             pass
 
     return MockConn(), MockCursor()
 
 
+@pytest.fixture(autouse=True)
+def journal_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "JOURNAL_DIR", tmp_path / "journal")
+
+
 def make_client(monkeypatch, read_only=True):
     monkeypatch.setattr(config, "READ_ONLY", read_only)
     importlib.reload(app_module)
+    table_cache.clear()
     monkeypatch.setattr(app_module, "connect_sql_server", fake_connect_sql_server)
 
     client = app_module.app.test_client()
@@ -69,9 +119,28 @@ def test_index_lists_files_and_read_only(client_ro):
     text = resp.get_data(as_text=True)
     assert resp.status_code == 200
     assert file_name in text
+    assert "~2 rows" in text
     assert "Read-only mode" in text
 
 
+def test_unknown_tables_are_not_found(client_ro, monkeypatch):
+    client, _ = client_ro
+    assert client.get("/view/ASTORBASE__Missing.json").status_code == 404
+    assert client.get("/sql/Missing").status_code == 404
+    assert client.get("/view/no-database.json").status_code == 404
+
+    # Without a readable schema every name is let through.
+    monkeypatch.setattr(app_module, "database_schema", lambda db: None)
+    assert client.get("/search/ASTORBASE__Missing.json").status_code == 200
+
+
+def test_sql_console_warns_about_large_tables(client_ro, monkeypatch):
+    client, _ = client_ro
+    monkeypatch.setattr(app_module, "LARGE_TABLE_ROWS", 2)
+    text = client.get("/sql/MockTable").get_data(as_text=True)
+    assert "about 2 rows" in text
+
+
 def test_view_table_displays_rows(client_ro):
     client, file_name = client_ro
     resp = client.get(f"/view/{file_name}")
@@ -89,6 +158,15 @@ def test_search_endpoint(client_ro):
     assert resp.get_json() == [{"id": 2, "name": "Bob"}]
 
 
+def test_suggest_endpoint_offers_close_values(client_ro):
+    client, file_name = client_ro
+    resp = client.get(f"/suggest/{file_name}?column=name&value=Alcie")
+    assert resp.get_json() == {
+        "column": "name", "value": "Alcie", "exists": False, "suggestions": ["Alice"],
+    }
+    assert client.get(f"/suggest/{file_name}?value=x").status_code == 400
+
+
 def test_sql_routes_use_mock_db(client_ro):
     client, _ = client_ro
     resp = client.get("/sql")
@@ -120,7 +198,7 @@ def test_save_updates_table_when_allowed(client_rw):
 
 def test_backup_route(client_rw, monkeypatch):
     client, _ = client_rw
-    monkeypatch.setattr(app_module, "backup_database", lambda: Path("/tmp/bk"))
+    monkeypatch.setattr("backup_db.backup_database", lambda: Path("/tmp/bk"))
     resp = client.get("/backup")
     assert resp.status_code == 200
     assert resp.get_json() == {"backup": "/tmp/bk"}
@@ -135,6 +213,95 @@ def test_csv_route_returns_csv(client_ro):
     assert "Alice" in resp.get_data(as_text=True)
 
 
+def test_csv_route_exports_typed_xlsx(client_ro):
+    client, file_name = client_ro
+    TABLE_ROWS[:] = [(1, "Alice"), (2, "Bob")]
+    resp = client.get(f"/csv/{file_name}?format=xlsx")
+    assert resp.status_code == 200
+    assert "spreadsheetml" in resp.content_type
+    assert "MockTable.xlsx" in resp.headers["Content-Disposition"]
+    with zipfile.ZipFile(io.BytesIO(resp.data)) as book:
+        sheet = book.read("xl/worksheets/sheet1.xml").decode("utf-8")
+    assert '<c r="A2"><v>1</v></c>' in sheet
+    assert "Alice" in sheet
+
+    cached = client.get(f"/csv/{file_name}?format=xlsx", headers={"If-None-Match": resp.headers["ETag"]})
+    assert cached.status_code == 304
+
+
+def test_csv_route_rejects_unknown_format(client_ro):
+    client, file_name = client_ro
+    resp = client.get(f"/csv/{file_name}?format=pdf")
+    assert resp.status_code == 400
+    assert "Unknown format" in resp.get_json()["error"]
+
+
+def test_availability_cascades_and_follows_writes(client_ro, monkeypatch):
+    client, _ = client_ro
+    tables = {
+        app_module.SETOFBOLTS_FILE: [
+            {"Standard": "4014", "Set": "MuS", "Material": "8.8", "Diameter": 12.0},
+        ],
+        app_module.SCREWNEW_FILE: [
+            {"Standard": "4014", "Set": "MuS", "Material": "8.8", "Diameter": 12.0,
+             "GripLengthMin1": 10, "GripLengthMax1": 20,
+             "ScrewLengthBase1": 30, "ScrewLengthDelta1": 5},
+        ],
+    }
+    loads = []
+    monkeypatch.setattr(app_module, "load_table_data", lambda f: loads.append(f) or tables[f])
+
+    assert client.get("/availability").get_json() == {"level": "Standard", "options": ["4014"]}
+    resp = client.get("/availability?Standard=4014&Set=MuS&Material=8.8&Diameter=12")
+    assert resp.get_json() == {"level": "Length", "options": [30.0, 35.0]}
+    assert client.get("/availability?Standard=4014&Set=Nope").status_code == 404
+
+    # A row written through the app updates the index without a rebuild.
+    added = dict(tables[app_module.SCREWNEW_FILE][0], Diameter=16.0)
+    app_module.bump_version(app_module.SCREWNEW_FILE)
+    app_module.update_indexes(app_module.SCREWNEW_FILE, added=[added])
+    resp = client.get("/availability?Standard=4014&Set=MuS&Material=8.8")
+    assert resp.get_json()["options"] == [12.0, 16.0]
+    assert len(loads) == 2
+
+
+def test_connectors_single_batch_and_verify(client_ro, monkeypatch):
+    client, _ = client_ro
+    tables = dict.fromkeys(app_module.CONNECTOR_FILES, [])
+    files = iter(app_module.CONNECTOR_FILES)
+    tables.update({
+        next(files): [
+            {"Key": 1, "ConnectorStandard": "S", "ConnectorMaterial": "M", "ConnectorDiameter": 16.0},
+            {"Key": 2, "ConnectorStandard": "S", "ConnectorMaterial": "M", "ConnectorDiameter": 19.0},
+        ],
+        next(files): [{"Key": "S", "RunName": "S"}],
+        next(files): [{"Key": "M", "RunName": "M"}],
+        next(files): [{"Key": 16.0, "RunName": "16 mm"}, {"Key": 19.0, "RunName": "19 mm"}],
+        next(files): [{"Key": 16.0, "HoleTolerance": 0.0, "along": 80.0, "across": 60.0}],
+    })
+    loads = []
+    monkeypatch.setattr(app_module, "load_table_data", lambda f: loads.append(f) or tables[f])
+
+    spec = client.get("/connectors?Standard=S&Material=M&Diameter=16").get_json()
+    assert spec["Diameter"]["RunName"] == "16 mm"
+    assert spec["Distances"] == [{"HoleTolerance": 0.0, "along": 80.0, "across": 60.0}]
+    assert client.get("/connectors?Standard=S&Material=M&Diameter=20").status_code == 404
+
+    resp = client.post("/connectors", json=[
+        {"Standard": "S", "Material": "M", "Diameter": 19},
+        {"Standard": "S", "Material": "X", "Diameter": 16},
+    ])
+    assert [r and r["Key"] for r in resp.get_json()] == [2, None]
+    assert client.post("/connectors", json={}).status_code == 400
+
+    assert client.get("/connectors?verify=1").get_json() == [
+        {"Key": 2, "relation": ["S", "M", 19.0], "missing": ["ConnectorDistances"]},
+    ]
+    assert len(client.get("/connectors").get_json()) == 2
+    # The joins ran once for all of the requests above.
+    assert len(loads) == len(app_module.CONNECTOR_FILES)
+
+
 def test_add_and_delete_row(client_rw):
     client, file_name = client_rw
     resp = client.post(
@@ -155,3 +322,369 @@ def test_add_delete_disabled_in_read_only(client_ro):
     assert resp.status_code == 404
     resp = client.post(f"/delete_row/{file_name}/1")
     assert resp.status_code == 404
+
+
+def test_bolt_sets_route_resolves_components(client_ro, monkeypatch):
+    client, _ = client_ro
+    tables = {
+        app_module.SETOFBOLTS_FILE: [{
+            "Standard": "4014", "Set": "MuS", "Material": "8.8", "Diameter": 12.0,
+            "DIN1": "934", "Diameter1 (mm)": 12.0, "Material1": "8", "Position1": -1,
+        }],
+        app_module.SETNUTSBOLTS_FILE: [{
+            "Standard": "934", "Material": "8", "Diameter": 12.0,
+            "Name": "Nut M12", "Weight": 0.016, "Type": 1,
+        }],
+    }
+    monkeypatch.setattr(app_module, "load_table_data", lambda f: tables[f])
+    resp = client.get("/bolt_sets?Standard=4014&Set=MuS&Material=8.8&Diameter=12")
+    assert resp.status_code == 200
+    assert resp.get_json()["weight"] == 0.016
+    resp = client.get("/bolt_sets?Standard=4014&Set=MuS&Material=8.8&Diameter=16")
+    assert resp.status_code == 404
+
+
+def test_takeoff_route_returns_bom(client_ro, monkeypatch):
+    client, _ = client_ro
+    monkeypatch.setattr(app_module, "get_takeoff_index", lambda: {
+        "sets": {("4014", "MuS", "8.8", 12.0): {"components": []}},
+        "screws": {("4014", "MuS", "8.8", 12.0)},
+    })
+    data = {"file": (io.BytesIO(b"Standard,Set,Material,Diameter,Length\n"
+                                b"4014,MuS,8.8,12,40\n4014,X,8.8,12,40\n"), "c.csv")}
+    resp = client.post("/takeoff", data=data, content_type="multipart/form-data")
+    assert resp.status_code == 200
+    assert resp.headers["X-Unresolved-Callouts"] == "1"
+    assert "Bolt MuS,1" in resp.get_data(as_text=True)
+
+
+def test_grip_length_routes(client_ro, monkeypatch):
+    client, _ = client_ro
+    row = {
+        "Standard": "4014", "Set": "MuS", "Material": "8.8", "Diameter": 12.0,
+        "GripLengthMin1": 10.0, "GripLengthMax1": 50.0,
+        "ScrewLengthBase1": 40.0, "ScrewLengthDelta1": 5.0,
+    }
+    monkeypatch.setattr(app_module, "load_table_data", lambda f: [row])
+    spec = {"Standard": "4014", "Set": "MuS", "Material": "8.8", "Diameter": 12}
+    resp = client.post("/grip_length", json=[dict(spec, grip=22)])
+    assert resp.get_json()[0]["Length"] == 50.0
+    resp = client.get("/setbolts/grip", query_string=dict(spec, grip=22))
+    assert resp.status_code == 200
+    assert "Length 50.0 mm" in resp.get_data(as_text=True)
+
+
+def test_distances_route(client_ro, monkeypatch):
+    client, _ = client_ro
+    rows = [
+        {"Diameter": 12.0, "HoleTolerance": 0.0, "along": 24.0, "across": 18.0},
+        {"Diameter": 16.0, "HoleTolerance": 0.0, "along": 32.0, "across": 24.0},
+    ]
+    monkeypatch.setattr(app_module, "load_table_data", lambda f: rows)
+    resp = client.get("/distances/bolts?diameter=12")
+    assert resp.get_json()["along"] == 24.0
+    resp = client.get("/distances/bolts?diameter=13,16&rule=nearest")
+    assert [r["Diameter"] for r in resp.get_json()] == [16.0, 16.0]
+    assert client.get("/distances/bolts?diameter=14").status_code == 404
+    assert client.get("/distances/bolts?diameter=x").status_code == 400
+    assert client.get("/distances/washers?diameter=12").status_code == 404
+
+
+def test_anchor_browser_routes(client_ro, monkeypatch):
+    client, _ = client_ro
+    tables = {
+        app_module.ANCHORSNAME_FILE: [
+            {"ID": 1, "Standard": "L", "ClassID": 3, "MaterialKey": "4.6",
+             "Diameter": 10.0, "SetName": "MuS"},
+        ],
+        app_module.ANCHORSDEFINITION_FILE: [{"ID": 5, "AnchorID": 1, "Length": 250.0}],
+    }
+    monkeypatch.setattr(app_module, "load_table_data", lambda f: tables[f])
+    resp = client.get("/anchors/search?Diameter=10")
+    data = resp.get_json()
+    assert data["count"] == 1
+    assert data["anchors"][0]["definitions"][0]["Length"] == 250.0
+    resp = client.get("/anchors?Standard=L")
+    assert resp.status_code == 200
+    assert "250.0" in resp.get_data(as_text=True)
+
+
+def test_import_route_disabled_in_read_only(client_ro):
+    client, file_name = client_ro
+    resp = client.post(f"/import/{file_name}", data={})
+    assert resp.status_code == 404
+
+
+def test_import_route_reports_result(client_rw, monkeypatch):
+    client, file_name = client_rw
+    calls = {}
+
+    def fake_import(conn, cur, table, lines, mode, key, schema, primary_key, identity):
+        calls.update(table=table, mode=mode, body=lines.read(), schema=schema)
+        return {"rows": 1, "written": 1, "errors": []}
+
+    monkeypatch.setattr("import_csv.import_rows", fake_import)
+    # Excel writes a byte order mark in front of the header.
+    data = {"file": (io.BytesIO(b"\xef\xbb\xbfid,name\n4,Dora\n"), "rows.csv"), "mode": "replace"}
+    resp = client.post(f"/import/{file_name}", data=data, content_type="multipart/form-data")
+    assert resp.get_json()["written"] == 1
+    assert calls == {
+        "table": "MockTable",
+        "mode": "replace",
+        "body": "id,name\n4,Dora\n",
+        "schema": {"id": ("int", False), "name": ("nvarchar", True)},
+    }
+
+
+def test_view_passes_key_columns_for_delta_save(client_rw):
+    client, file_name = client_rw
+    TABLE_ROWS[:] = [(1, "Alice"), (2, "Bob")]
+    resp = client.get(f"/view/{file_name}")
+    text = resp.get_data(as_text=True)
+    assert "/delta" in text
+    # MockTable has no ID/Key column, so every column keys the row.
+    assert 'const KEY_COLUMNS = ["id", "name"]' in text
+
+
+def test_delta_save_applies_targeted_statements(client_rw):
+    client, file_name = client_rw
+    TABLE_ROWS[:] = [(1, "Alice"), (2, "Bob")]
+    delta = {
+        "key": ["id"],
+        "ops": [
+            {"op": "replace", "key": {"id": 1}, "value": {"name": "Alicia"}},
+            {"op": "remove", "key": {"id": 2}},
+            {"op": "add", "value": {"id": 3, "name": "Carl"}},
+        ],
+    }
+    resp = client.post(f"/save/{file_name}/delta", json=delta)
+    result = resp.get_json()
+    assert (result["added"], result["updated"], result["removed"]) == (1, 1, 1)
+    assert TABLE_ROWS == [(1, "Alicia"), (3, "Carl")]
+
+    resp = client.post(f"/save/{file_name}/delta", json={"key": ["id"], "ops": [{"op": "move"}]})
+    assert resp.status_code == 400
+
+
+def test_delta_save_disabled_in_read_only(client_ro):
+    client, file_name = client_ro
+    resp = client.post(f"/save/{file_name}/delta", json={"key": ["id"], "ops": []})
+    assert resp.status_code == 404
+
+
+def test_delta_save_reports_version_conflicts(client_rw):
+    client, file_name = client_rw
+    TABLE_ROWS[:] = [(1, "Alice"), (2, "Bob")]
+    stale = row_version({"id": 1, "name": "Alice"})
+    fresh = row_version({"id": 2, "name": "Bob"})
+    TABLE_ROWS[0] = (1, "Alice (edited elsewhere)")
+    delta = {
+        "key": ["id"],
+        "ops": [
+            {"op": "replace", "key": {"id": 1}, "value": {"name": "Mine"}, "version": stale},
+            {"op": "replace", "key": {"id": 2}, "value": {"name": "Robert"}, "version": fresh},
+            {"op": "remove", "key": {"id": 9}, "version": stale},
+        ],
+    }
+    result = client.post(f"/save/{file_name}/delta", json=delta).get_json()
+    assert result["updated"] == 1
+    assert [(c["key"]["id"], c["reason"]) for c in result["conflicts"]] == [
+        (1, "modified"), (9, "deleted"),
+    ]
+    assert result["versions"] == [
+        {"key": {"id": 2}, "version": row_version({"id": 2, "name": "Robert"})}
+    ]
+    assert TABLE_ROWS == [(1, "Alice (edited elsewhere)"), (2, "Robert")]
+
+
+def test_delta_save_reports_unversioned_ops_on_missing_rows(client_rw):
+    client, file_name = client_rw
+    TABLE_ROWS[:] = [(1, "Alice"), (2, "Bob")]
+    delta = {
+        "key": ["id"],
+        "ops": [
+            {"op": "replace", "key": {"id": 8}, "value": {"name": "Ghost"}},
+            {"op": "remove", "key": {"id": 9}},
+            {"op": "remove", "key": {"id": 2}},
+        ],
+    }
+    result = client.post(f"/save/{file_name}/delta", json=delta).get_json()
+    assert (result["updated"], result["removed"]) == (0, 1)
+    assert [(c["key"]["id"], c["reason"]) for c in result["conflicts"]] == [
+        (8, "not found"), (9, "not found"),
+    ]
+    assert TABLE_ROWS == [(1, "Alice")]
+
+
+def test_full_save_only_writes_changed_rows(client_rw, monkeypatch):
+    client, file_name = client_rw
+    TABLE_ROWS[:] = [(1, "Alice"), (2, "Bob")]
+    monkeypatch.setattr(app_module, "table_key_columns", lambda f, rows: ["id"])
+    statements = []
+    real_connect = app_module.connect_sql_server
+
+    def recording_connect(database=config.DEFAULT_DATABASE):
+        conn, cur = real_connect(database)
+        execute = cur.execute
+
+        def record(query, params=None):
+            statements.append(query.split()[0])
+            return execute(query, params)
+
+        cur.execute = record
+        return conn, cur
+
+    monkeypatch.setattr(app_module, "connect_sql_server", recording_connect)
+    rows = [{"id": 1, "name": "Alice"}, {"id": 2, "name": "Bobby"}]
+    client.post(f"/save/{file_name}", data={"json_data": json.dumps(rows)})
+    assert TABLE_ROWS == [(1, "Alice"), (2, "Bobby")]
+    assert "DELETE" not in statements
+    assert statements.count("UPDATE") == 1
+
+
+def test_undo_reverts_journaled_edits(client_rw):
+    client, file_name = client_rw
+    TABLE_ROWS[:] = [(1, "Alice"), (2, "Bob")]
+    delta = {
+        "key": ["id"],
+        "ops": [
+            {"op": "replace", "key": {"id": 1}, "value": {"name": "Alicia"}},
+            {"op": "remove", "key": {"id": 2}},
+        ],
+    }
+    entry = client.post(f"/save/{file_name}/delta", json=delta).get_json()["entry"]
+    client.post(f"/add_row/{file_name}", data={"row": json.dumps({"id": 3, "name": "Carl"})})
+    assert TABLE_ROWS == [(1, "Alicia"), (3, "Carl")]
+
+    entries = client.get("/journal", query_string={"table": file_name}).get_json()
+    assert [e["id"] for e in entries] == [entry, entry + 1]
+    assert entries[0]["ops"][0]["before"] == {"name": "Alice"}
+
+    result = client.post("/undo", json={"entry": entry}).get_json()
+    assert result[0]["undone"] == entry
+    assert sorted(TABLE_ROWS) == [(1, "Alice"), (2, "Bob"), (3, "Carl")]
+
+    # A range undo skips the entry already undone and the undo itself.
+    result = client.post("/undo", json={"since": 0}).get_json()
+    assert [r["undone"] for r in result] == [entry + 1]
+    assert sorted(TABLE_ROWS) == [(1, "Alice"), (2, "Bob")]
+
+
+def test_undo_skips_rows_edited_since(client_rw):
+    client, file_name = client_rw
+    TABLE_ROWS[:] = [(1, "Alice")]
+    delta = {"key": ["id"], "ops": [
+        {"op": "replace", "key": {"id": 1}, "value": {"name": "Alicia"}},
+    ]}
+    entry = client.post(f"/save/{file_name}/delta", json=delta).get_json()["entry"]
+    TABLE_ROWS[0] = (1, "Changed elsewhere")
+    result = client.post("/undo", json={"entry": [entry]}).get_json()
+    assert result[0]["conflicts"][0]["reason"] == "modified"
+    assert TABLE_ROWS == [(1, "Changed elsewhere")]
+
+    assert client.post("/undo", json={"entry": 99}).status_code == 400
+    assert client.post("/undo", json={}).status_code == 400
+
+
+def test_undo_disabled_in_read_only(client_ro):
+    client, _ = client_ro
+    assert client.post("/undo", json={"entry": 1}).status_code == 404
+
+
+def test_table_routes_answer_conditional_get(client_rw, monkeypatch):
+    client, file_name = client_rw
+    TABLE_ROWS[:] = [(i, "Name %d" % i) for i in range(200)]
+    loads = []
+    real_load = app_module.load_table_data
+    monkeypatch.setattr(
+        app_module, "load_table_data", lambda f: loads.append(f) or real_load(f)
+    )
+    resp = client.get(f"/search/{file_name}", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["Vary"]
+    etag = resp.headers["ETag"]
+
+    resp = client.get(
+        f"/search/{file_name}",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": etag},
+    )
+    assert resp.status_code == 304
+    assert client.get(f"/csv/{file_name}").status_code == 200
+    assert len(loads) == 2
+
+    client.post(f"/delete_row/{file_name}/1")
+    resp = client.get(
+        f"/search/{file_name}",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": etag},
+    )
+    assert resp.status_code == 200 and resp.headers["ETag"] != etag
+
+
+def test_duplicates_route_reports_clusters(client_ro):
+    client, file_name = client_ro
+    TABLE_ROWS[:] = [(1, "Alice"), (1, "alice "), (2, "Bob")]
+    report = client.get(f"/duplicates/{file_name}").get_json()
+    assert report["rows"] == 3
+    assert report["exact"] == []
+    assert [[r["index"] for r in c["rows"]] for c in report["near"]] == [[0, 1]]
+    assert client.get(f"/duplicates/{file_name}?tolerance=x").status_code == 400
+
+
+def test_federated_search_streams_tagged_rows(client_ro, monkeypatch):
+    client, _ = client_ro
+    TABLE_ROWS[:] = [(1, "Alice"), (2, "Bob")]
+    catalog = {
+        "ASTORBASE": {"MockTable": {"id": "int", "name": "nvarchar"}},
+        "ASTORPROFILES": {"Numbers": {"id": "int"}},
+    }
+    monkeypatch.setattr(
+        app_module,
+        "get_federated_catalog",
+        lambda: ({"ASTORBASE": "ASTORBASE", "ASTORPROFILES": "ASTORPROFILES"}, catalog, {}),
+    )
+    resp = client.get("/federated?q=Ali")
+    assert resp.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert lines[0] == {"databases": ["ASTORBASE", "ASTORPROFILES"], "tables": 1, "skipped": 1}
+    assert lines[1:] == [
+        {"database": "ASTORBASE", "table": "MockTable", "row": {"id": 1, "name": "Alice"}}
+    ]
+    assert client.get("/federated").status_code == 400
+
+
+def test_events_stream_pushes_matching_table_bumps(client_ro):
+    client, file_name = client_ro
+    resp = client.get("/events", query_string={"tables": file_name})
+    assert resp.mimetype == "text/event-stream"
+    chunks = (chunk.decode() for chunk in resp.response)
+    assert next(chunks).startswith("retry:")
+    table_cache.bump_version("ASTORBASE__Other.json")
+    table_cache.bump_version(file_name)
+    event = next(chunks)
+    assert event.startswith("event: table\n")
+    assert json.loads(event.split("data: ", 1)[1]) == {"table": file_name, "version": 1}
+    resp.close()
+
+
+def test_rows_without_identity_key_are_read_back(client_rw, monkeypatch, tmp_path):
+    from utils.fake_sql import SqliteBackend
+
+    client, _ = client_rw
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "ASTORBASE__Parts.json").write_text(json.dumps({"data": [{"ID": 1, "Length": 2.0}]}))
+    backend = SqliteBackend(data, directory=tmp_path / "sql")
+    monkeypatch.setattr(app_module, "connect_sql_server", backend.connect)
+    filename = "ASTORBASE__Parts.json"
+    try:
+        resp = client.post(f"/add_row/{filename}", data={"row": json.dumps({"Length": 5})})
+        assert resp.status_code == 200
+        entry = app_module.journal.entries(filename)[-1]
+        assert entry["ops"][0]["value"] == {"Length": 5, "ID": 2}
+        assert entry["ops"][0]["version"] == row_version({"ID": 2, "Length": 5.0})
+
+        # The journaled key lets the insert be undone.
+        client.post("/undo", json={"entry": entry["id"]})
+        assert [r["ID"] for r in app_module.load_table_data(filename)] == [1]
+    finally:
+        backend.close()
@@ -0,0 +1,69 @@
+import random
+
+from utils.availability import AvailabilityCube, parse_selection, sort_key
+
+SETS = [
+    {"Standard": "4014", "Set": "MuS", "Material": "8.8", "Diameter": 12.0},
+    {"Standard": "4014", "Set": "MuS", "Material": "10.9", "Diameter": 16.0},
+    {"Standard": "4017", "Set": "Mu2S", "Material": "8.8", "Diameter": 12.0},
+]
+SCREWS = [
+    {"Standard": "4014", "Set": "MuS", "Material": "8.8", "Diameter": 12,
+     "GripLengthMin1": 10, "GripLengthMax1": 25, "ScrewLengthBase1": 30, "ScrewLengthDelta1": 5},
+    {"Standard": "4014", "Set": "MuS", "Material": "8.8", "Diameter": 12,
+     "GripLengthMin1": 20, "GripLengthMax1": 30, "ScrewLengthBase1": 40, "ScrewLengthDelta1": 10},
+]
+
+
+def snapshot(cube, selection=()):
+    options = cube.options(selection)
+    if len(selection) == 4:
+        return options
+    return {value: snapshot(cube, [*selection, value]) for value in options}
+
+
+def test_options_cascade_to_sorted_lengths():
+    cube = AvailabilityCube(SETS, SCREWS)
+    assert cube.options() == ["4014", "4017"]
+    assert cube.options(["4014"]) == ["MuS"]
+    assert cube.options(["4014", "MuS"]) == ["8.8", "10.9"]
+    assert cube.options(["4014", "MuS", "8.8"]) == [12.0]
+    assert cube.options(["4014", "MuS", "8.8", 12.0]) == [30.0, 35.0, 40.0]
+    assert cube.options(["4017", "Mu2S", "8.8", 12.0]) == []
+    assert cube.options(["4014", "Nope"]) is None
+
+
+def test_add_and_remove_match_a_rebuild():
+    random.seed(5)
+    rows = [("SetOfBolts", r) for r in SETS] + [("ScrewNew", r) for r in SCREWS]
+    cube = AvailabilityCube(SETS, SCREWS)
+    for _ in range(50):
+        table, row = random.choice(rows)
+        if random.random() < 0.5:
+            cube.add(table, row)
+            rows.append((table, row))
+        elif (table, row) in rows:
+            cube.remove(table, row)
+            rows.remove((table, row))
+        rebuilt = AvailabilityCube(
+            [r for t, r in rows if t == "SetOfBolts"],
+            [r for t, r in rows if t == "ScrewNew"],
+        )
+        assert snapshot(cube) == snapshot(rebuilt)
+
+
+def test_removing_last_row_drops_empty_levels():
+    cube = AvailabilityCube(SETS[2:])
+    cube.remove("SetOfBolts", SETS[2])
+    assert cube.options() == []
+    # Rows that were never counted are ignored.
+    cube.remove("SetOfBolts", SETS[0])
+    assert cube.options() == []
+
+
+def test_parse_selection_normalizes_leading_levels():
+    assert parse_selection({"Standard": " 4014 ", "Set": "MuS"}) == ["4014", "MuS"]
+    assert parse_selection({"Standard": "4014", "Set": "MuS", "Material": "8.8",
+                            "Diameter": "12"}) == ["4014", "MuS", "8.8", 12.0]
+    assert parse_selection({"Standard": "4014", "Material": "8.8"}) == ["4014"]
+    assert sorted(["10.9", "8.8", "4.6"], key=sort_key) == ["4.6", "8.8", "10.9"]
@@ -0,0 +1,46 @@
+from utils.bolt_sets import (
+    build_component_index,
+    build_set_index,
+    lookup_set,
+    resolve_set,
+    unresolved_sets,
+)
+
+NUTS = [
+    {"Standard": "14399-6", "Material": "300 HV", "Diameter": 12.0,
+     "Name": "Washer", "Weight": 0.01, "Type": 2},
+    {"Standard": "14399-3", "Material": "10", "Diameter": 12.0,
+     "Name": "Nut", "Weight": 0.02, "Type": 1},
+]
+
+SET_ROW = {
+    "Standard": "14399-3", "Set": "Mu2S", "Material": "10.9", "Diameter": 12.0,
+    "OwnerText": "DSC",
+    "DIN1": "14399-6", "Diameter1 (mm)": 12.0, "Material1": "300 HV", "Position1": 1,
+    "DIN2": "14399-3", "Diameter2 (mm)": 12.0, "Material2": "10", "Position2": -2,
+    "DIN3": "929", "Diameter3 (mm)": 12.0, "Material3": "Steel", "Position3": -3,
+    "DIN4": "-", "Diameter4 (mm)": 0.0, "Material4": "-", "Position4": 0,
+    "DIN5": " ", "Diameter5 (mm)": None, "Material5": " ", "Position5": None,
+}
+
+
+def test_resolve_set_sums_weights_and_reports_missing():
+    resolved = resolve_set(SET_ROW, build_component_index(NUTS))
+    assert [c["Name"] for c in resolved["components"]] == ["Washer", "Nut"]
+    assert resolved["weight"] == 0.03
+    assert resolved["unresolved"] == [
+        {"Position": -3, "Standard": "929", "Material": "Steel", "Diameter": 12.0}
+    ]
+
+
+def test_lookup_set_normalizes_key():
+    index = build_set_index([SET_ROW], NUTS)
+    assert lookup_set(index, "14399-3", "Mu2S", "10.9", "12") is not None
+    assert lookup_set(index, "14399-3", "Mu2S", "10.9", "16") is None
+    assert unresolved_sets(index) == list(index.values())
+
+
+def test_anchor_diameter_columns_are_accepted():
+    row = {"DIN1": "14399-6", "Diameter1": 12.0, "Material1": "300 HV", "Position1": 1}
+    resolved = resolve_set(row, build_component_index(NUTS))
+    assert resolved["components"][0]["Weight"] == 0.01
@@ -0,0 +1,29 @@
+from utils import catalog, table_cache
+
+
+def test_preloaded_rows_are_frozen_until_written():
+    table_cache.clear()
+    catalog.clear()
+    loads = []
+
+    def loader(filename):
+        loads.append(filename)
+        return [{"ID": 1, "Name": "A"}, {"ID": 2, "Name": "B"}]
+
+    catalog.preload(["A.json"], loader)
+    assert catalog.get_rows("A.json") == [{"ID": 1, "Name": "A"}, {"ID": 2, "Name": "B"}]
+    assert catalog.get_rows("B.json") is None
+    assert catalog.loaded_tables() == ["A.json"]
+    assert loads == ["A.json"]
+
+    table_cache.bump_version("A.json")
+    assert catalog.get_rows("A.json") is None
+    assert catalog.loaded_tables() == []
+    catalog.clear()
+
+
+def test_freeze_rows_shares_one_column_tuple():
+    header, rows = catalog.freeze_rows([{"a": 1, "b": 2}, {"b": 4, "a": 3}])
+    assert header.columns == ("a", "b")
+    assert rows == ((1, 2), (3, 4))
+    assert catalog.freeze_rows([])[1] == ()
@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from utils import change_watch, table_cache
+from utils.change_watch import ChangeWatcher, changed_tables
+
+
+class FakeCursor:
+    def __init__(self, signals, tables=()):
+        self.signals = signals
+        self.tables = tables
+        self.results = []
+
+    def execute(self, query):
+        if "dm_db_index_usage_stats" in query:
+            if isinstance(self.signals, Exception):
+                raise self.signals
+            self.results = list(self.signals.items())
+        else:
+            self.results = [(t,) for t in self.tables]
+
+    def fetchall(self):
+        return self.results
+
+
+class FakeConn:
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def fresh_versions():
+    table_cache.clear()
+    yield
+    table_cache.clear()
+
+
+def test_changed_tables_ignores_reset_statistics():
+    assert changed_tables({"A": 1, "B": 1}, {"A": 2, "B": 1, "C": 5}) == ["A", "C"]
+    assert changed_tables({"A": 1}, {"A": None}) == []
+
+
+def test_poll_bumps_tables_changed_outside_the_app():
+    cur = FakeCursor({"SetBolts": 1, "ScrewNew": 1})
+    watcher = ChangeWatcher(lambda: (FakeConn(), cur), "ASTORBASE")
+    assert watcher.poll() == []
+    cur.signals = {"SetBolts": 2, "ScrewNew": 1}
+    assert watcher.poll() == ["ASTORBASE__SetBolts.json"]
+    assert table_cache.table_version("ASTORBASE__SetBolts.json") == 1
+    assert table_cache.table_version("ASTORBASE__ScrewNew.json") == 0
+
+
+def test_poll_falls_back_to_mdf_mtime(tmp_path):
+    mdf = tmp_path / "AstorBase.mdf"
+    mdf.write_bytes(b"")
+    cur = FakeCursor(Exception("VIEW SERVER STATE permission was denied"), ["A", "B"])
+    watcher = ChangeWatcher(lambda: (FakeConn(), cur), "DB", mdf_path=mdf)
+    assert watcher.poll() == []
+    stat = mdf.stat()
+    os.utime(mdf, (stat.st_atime, stat.st_mtime + 10))
+    assert watcher.poll() == ["DB__A.json", "DB__B.json"]
+
+
+def test_version_bumps_reach_subscribers():
+    events = change_watch.subscribe()
+    try:
+        table_cache.bump_version("A.json")
+        assert events.get_nowait() == ("A.json", 1)
+    finally:
+        change_watch.unsubscribe(events)
+    table_cache.bump_version("A.json")
+    assert events.empty()
+
+
+def test_poll_skips_tables_written_through_the_app():
+    cur = FakeCursor({"SetBolts": 1, "ScrewNew": 1})
+    watcher = ChangeWatcher(lambda: (FakeConn(), cur), "ASTORBASE")
+    watcher.poll()
+    # The app's own write moves both its version and the signal.
+    table_cache.bump_version("ASTORBASE__SetBolts.json")
+    cur.signals = {"SetBolts": 2, "ScrewNew": 2}
+    assert watcher.poll() == ["ASTORBASE__ScrewNew.json"]
+    assert table_cache.table_version("ASTORBASE__SetBolts.json") == 1
+
+    # A later outside edit is still seen.
+    cur.signals = {"SetBolts": 3, "ScrewNew": 2}
+    assert watcher.poll() == ["ASTORBASE__SetBolts.json"]
+    assert table_cache.table_version("ASTORBASE__SetBolts.json") == 2
@@ -0,0 +1,62 @@
+from utils.connectors import (
+    build_connector_catalog,
+    lookup_connector,
+    lookup_connectors,
+    verify_connectors,
+)
+
+RELATIONS = [
+    {"Key": 1, "ConnectorStandard": "Nelson H4L", "ConnectorMaterial": "Mild Steel", "ConnectorDiameter": 16.0},
+    {"Key": 2, "ConnectorStandard": "Nelson H4L", "ConnectorMaterial": "Mild Steel", "ConnectorDiameter": 12.7},
+    {"Key": 3, "ConnectorStandard": "Köco", "ConnectorMaterial": "Stainless", "ConnectorDiameter": 16.0},
+    {"Key": 4, "ConnectorStandard": "Nelson H4L", "ConnectorMaterial": "Mild Steel", "ConnectorDiameter": 16},
+]
+STANDARDS = [{"Key": "Nelson H4L", "RunName": "Nelson H4L", "OwnerText": "DSC"}]
+MATERIALS = [{"Key": "Mild Steel", "RunName": "Mild Steel", "weight": 0.0}]
+DIAMETERS = [
+    {"Key": 16.0, "RunName": "16.00 mm", "Description": None},
+    {"Key": 12.7, "RunName": "1/2 in", "Description": None},
+]
+DISTANCES = [
+    {"Key": 16.0, "HoleTolerance": 2.0, "along": 90.0, "across": 70.0},
+    {"Key": 16.0, "HoleTolerance": 0.0, "along": 80.0, "across": 60.0},
+]
+
+
+def catalog():
+    return build_connector_catalog(RELATIONS, STANDARDS, MATERIALS, DIAMETERS, DISTANCES)
+
+
+def test_lookup_attaches_joined_rows_and_sorted_distances():
+    spec = lookup_connector(catalog(), " Nelson H4L", "Mild Steel", "16")
+    assert spec["Key"] == 1
+    assert spec["Standard"]["OwnerText"] == "DSC"
+    assert spec["Material"]["weight"] == 0.0
+    assert spec["Diameter"]["RunName"] == "16.00 mm"
+    assert spec["Distances"] == [
+        {"HoleTolerance": 0.0, "along": 80.0, "across": 60.0},
+        {"HoleTolerance": 2.0, "along": 90.0, "across": 70.0},
+    ]
+    assert lookup_connector(catalog(), "Nelson H4L", "Mild Steel", 20) is None
+    assert lookup_connector(catalog(), "Nelson H4L", "Mild Steel", "x") is None
+
+
+def test_batch_lookup_keeps_request_order():
+    results = lookup_connectors(catalog(), [
+        {"Standard": "Köco", "Material": "Stainless", "Diameter": 16},
+        {"Standard": "Nelson H4L", "Material": "Mild Steel", "Diameter": 99},
+        "not an object",
+    ])
+    assert results[0]["Key"] == 3
+    assert results[0]["Standard"] is None
+    assert results[1:] == [None, None]
+
+
+def test_verify_lists_missing_entries_and_duplicates():
+    problems = verify_connectors(catalog())
+    assert problems == [
+        {"Key": 2, "relation": ["Nelson H4L", "Mild Steel", 12.7], "missing": ["ConnectorDistances"]},
+        {"Key": 3, "relation": ["Köco", "Stainless", 16.0],
+         "missing": ["ConnectorStandard", "ConnectorMaterial"]},
+        {"Key": 4, "relation": ["Nelson H4L", "Mild Steel", 16.0], "missing": ["duplicate"]},
+    ]
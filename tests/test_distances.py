@@ -0,0 +1,40 @@
+import pytest
+
+from utils.distances import build_distance_table, lookup_distance, lookup_distances
+
+ROWS = [
+    {"Diameter": 12.0, "HoleTolerance": 2.0, "along": 28.0, "across": 21.0},
+    {"Diameter": 12.0, "HoleTolerance": 0.0, "along": 24.0, "across": 18.0},
+    {"Diameter": 16.0, "HoleTolerance": 0.0, "along": 32.0, "across": 24.0},
+    {"Diameter": 20.0, "HoleTolerance": 2.0, "along": 44.0, "across": 33.0},
+]
+
+
+def test_exact_lookup():
+    table = build_distance_table(ROWS)
+    assert lookup_distance(table, 12, 2)["along"] == 28.0
+    assert lookup_distance(table, 12, 1) is None
+    assert lookup_distance(table, 14, 0) is None
+
+
+def test_nearest_larger_lookup():
+    table = build_distance_table(ROWS)
+    assert lookup_distance(table, 12, 1, "nearest")["HoleTolerance"] == 2.0
+    assert lookup_distance(table, 13, 0, "nearest")["Diameter"] == 16.0
+    assert lookup_distance(table, 13, 1, "nearest")["Diameter"] == 20.0
+    assert lookup_distance(table, 24, 0, "nearest") is None
+
+
+def test_batch_lookup_broadcasts_tolerance():
+    table = build_distance_table(ROWS)
+    results = lookup_distances(table, [12, 16, 18], [0])
+    assert [r and r["along"] for r in results] == [24.0, 32.0, None]
+    with pytest.raises(ValueError):
+        lookup_distances(table, [12, 16], [0, 1, 2])
+    with pytest.raises(ValueError):
+        lookup_distance(table, 12, 0, "closest")
+
+
+def test_connector_key_column():
+    table = build_distance_table([{"Key": 19.0, "HoleTolerance": 0.0, "along": 38.0, "across": 28.5}], "Key")
+    assert lookup_distance(table, 19)["across"] == 28.5
@@ -0,0 +1,87 @@
+import random
+from itertools import combinations
+
+from utils.duplicates import analyze_table, find_duplicates, row_hash
+
+COLUMNS = ["Standard", "Set", "Diameter", "Length"]
+
+
+def loose_match(a, b, tol=0.05):
+    for c in COLUMNS:
+        x, y = a[c], b[c]
+        if isinstance(x, str):
+            if "".join(x.split()).casefold() != "".join(y.split()).casefold():
+                return False
+        elif abs(x - y) > tol + 1e-9:
+            return False
+    return True
+
+
+def test_exact_duplicates_ignore_bookkeeping_columns_and_number_types():
+    a = {"ID": 1, "Standard": "ISO 4017", "Diameter": 12, "OwnerText": "DSC"}
+    b = {"ID": 2, "Standard": "ISO 4017", "Diameter": 12.0, "OwnerText": "ACME"}
+    c = {"ID": 3, "Standard": "iso 4017", "Diameter": 12.0, "OwnerText": "ACME"}
+    assert row_hash(a, ["Standard", "Diameter"]) == row_hash(b, ["Standard", "Diameter"])
+    found = find_duplicates([a, b, c])
+    assert found == {"exact": [[0, 1]], "near": [[0, 1, 2]]}
+
+
+def test_near_duplicates_match_pairwise_comparison():
+    random.seed(3)
+    rows = []
+    for _ in range(300):
+        rows.append({
+            "Standard": random.choice(["ISO 4017", "iso4017", "DIN 931", "DIN931 "]),
+            "Set": random.choice(["Mu2S", "MU 2S", "Mu"]),
+            "Diameter": random.choice([12, 16, 16.04, 20, 20.1]),
+            "Length": random.choice([40, 40.05, 45, 50]),
+            "OwnerText": random.choice(["DSC", "ACME"]),
+        })
+    found = find_duplicates(rows)
+
+    # Brute force: connected components of the pairwise near relation.
+    parent = list(range(len(rows)))
+
+    def find(i):
+        while parent[i] != i:
+            i = parent[i]
+        return i
+
+    for i, j in combinations(range(len(rows)), 2):
+        if loose_match(rows[i], rows[j]):
+            parent[find(i)] = find(j)
+    expected = {}
+    for i in range(len(rows)):
+        expected.setdefault(find(i), []).append(i)
+    expected = sorted(c for c in expected.values() if len(c) > 1)
+
+    # Clusters made of a single exact group are reported as exact only.
+    exact = {tuple(g) for g in found["exact"]}
+    expected = [c for c in expected if tuple(c) not in exact]
+    assert sorted(found["near"]) == expected
+
+
+def test_analyze_table_reports_owners_and_flags_custom_copies():
+    rows = [
+        {"Standard": "ISO 4017", "Set": "Mu", "Material": "8.8", "Diameter": 12.0,
+         "OwnerText": "DSC", "Source": "ISO"},
+        {"Standard": "ISO 4017", "Set": "Mu", "Material": "8.8", "Diameter": 12.0,
+         "OwnerText": "ACME", "Source": "copy"},
+        {"Standard": "ISO 4017", "Set": "MuS", "Material": "8.8", "Diameter": 12.0,
+         "OwnerText": "ACME", "Source": "x"},
+        {"Standard": "ISO 4017", "Set": "MuS", "Material": "8.8", "Diameter": 12.0,
+         "OwnerText": "BETA", "Source": "x"},
+    ]
+    report = analyze_table("SetOfBolts", rows)
+    assert report["rows"] == 4
+    first, second = report["exact"]
+    assert first["mixed"] and first["owners"] == ["ACME", "DSC"]
+    assert not second["mixed"]
+    assert first["rows"][1] == {
+        "Standard": "ISO 4017", "Set": "Mu", "Material": "8.8", "Diameter": 12.0,
+        "index": 1, "OwnerText": "ACME", "Source": "copy",
+    }
+    assert report["near"] == []
+    assert analyze_table("SetOfBolts", []) == {
+        "table": "SetOfBolts", "rows": 0, "exact": [], "near": [],
+    }
@@ -0,0 +1,77 @@
+import datetime
+import decimal
+import io
+import zipfile
+
+import pytest
+
+from utils.export import column_kinds, iter_batches, iter_export
+
+COLUMNS = [("ID", "int"), ("Name", "text"), ("Length", "float"),
+           ("Stock", "bool"), ("Changed", "datetime")]
+ROWS = [
+    (1, "M12 <8.8>", decimal.Decimal("40.5"), True, datetime.datetime(2024, 1, 2, 12, 0)),
+    (2, None, None, False, None),
+]
+
+
+class Cursor:
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+
+def test_column_kinds_prefer_schema_types():
+    description = [("ID", int), ("Name", str), ("Length", float), ("Flag", bool), ("Extra", None)]
+    kinds = column_kinds(description, {"ID": "bigint", "Name": "nvarchar", "Flag": "bit"})
+    assert kinds == [("ID", "int"), ("Name", "text"), ("Length", "float"),
+                     ("Flag", "bool"), ("Extra", "text")]
+
+
+def test_iter_export_yields_output_per_batch():
+    batches = list(iter_batches(Cursor([(i, "x") for i in range(5)]), size=2))
+    assert [len(b) for b in batches] == [2, 2, 1]
+    chunks = list(iter_export("csv", [("ID", "int"), ("Name", "text")], batches))
+    assert len(chunks) == 3
+    assert b"".join(chunks).decode().splitlines() == ["ID,Name", "0,x", "1,x", "2,x", "3,x", "4,x"]
+
+
+def test_iter_export_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        list(iter_export("pdf", COLUMNS, [ROWS]))
+
+
+def test_xlsx_keeps_types():
+    data = b"".join(iter_export("xlsx", COLUMNS, [ROWS[:1], ROWS[1:]]))
+    with zipfile.ZipFile(io.BytesIO(data)) as book:
+        assert book.testzip() is None
+        sheet = book.read("xl/worksheets/sheet1.xml").decode("utf-8")
+    assert '<c r="A2"><v>1</v></c>' in sheet
+    assert "M12 &lt;8.8&gt;" in sheet
+    assert '<c r="C2"><v>40.5</v></c>' in sheet
+    assert '<c r="D2" t="b"><v>1</v></c>' in sheet
+    assert '<c r="E2" s="2"><v>45293.5</v></c>' in sheet
+    assert '<row r="3"><c r="A3"><v>2</v></c><c r="D3" t="b"><v>0</v></c></row>' in sheet
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_arrow_formats_keep_types(fmt):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+    data = b"".join(iter_export(fmt, COLUMNS, [ROWS[:1], ROWS[1:]]))
+    if fmt == "parquet":
+        table = pyarrow.parquet.read_table(pa.BufferReader(data))
+    else:
+        table = pyarrow.ipc.open_file(pa.BufferReader(data)).read_all()
+    assert [str(t) for t in table.schema.types] == [
+        "int64", "string", "double", "bool", "timestamp[ms]",
+    ]
+    assert table.to_pylist()[0]["Length"] == 40.5
+    assert table.to_pylist()[1] == {
+        "ID": 2, "Name": None, "Length": None, "Stock": False, "Changed": None,
+    }
@@ -1,16 +1,21 @@
 import csv
 from pathlib import Path
-from export_csv import export_table_to_csv
+
+import pytest
+
+from export_csv import export_table, export_table_to_csv, format_for
 
 
 def fake_connect_sql_server(database):
     class Cur:
         def __init__(self):
-            self.description = [("id",), ("name",)]
+            self.description = [("id", int), ("name", str)]
+            self.rows = []
         def execute(self, query):
-            pass
-        def fetchall(self):
-            return [(1, "A"), (2, "B")]
+            self.rows = [(1, "A"), (2, "B")]
+        def fetchmany(self, size):
+            batch, self.rows = self.rows[:size], self.rows[size:]
+            return batch
     class Conn:
         def close(self):
             pass
@@ -25,3 +30,14 @@ def test_export_table_to_csv(tmp_path, monkeypatch):
     assert content[0] == "id,name"
     assert content[1] == "1,A"
 
+
+def test_export_table_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        export_table("DB", "Table", tmp_path / "rows.pdf", "pdf")
+
+
+def test_format_for_uses_extension():
+    assert format_for("rows.xlsx") == "xlsx"
+    assert format_for("rows.parquet") == "parquet"
+    assert format_for("rows.txt") == "csv"
+    assert format_for("rows.xlsx", "arrow") == "arrow"
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from utils.fake_sql import SqliteBackend, translate
+from utils.schema import read_schema
+
+
+@pytest.fixture
+def backend(tmp_path):
+    data = tmp_path / "data"
+    data.mkdir()
+    tables = {
+        "Anchors": [{"ID": 1, "Name": "A", "Length": 10.5, "Stock": True},
+                    {"ID": 2, "Name": "B", "Length": 12, "Stock": False}],
+        "Sets": [{"Set": "Mu", "Diameter": 12}, {"Set": "Mu", "Diameter": 12}],
+    }
+    for table, rows in tables.items():
+        (data / f"DB__{table}.json").write_text(json.dumps({"data": rows}))
+    backend = SqliteBackend(data, directory=tmp_path / "sql")
+    yield backend
+    backend.close()
+
+
+def test_translate_rewrites_tsql():
+    assert translate("SELECT TOP 5 * FROM [T] WITH (UPDLOCK, ROWLOCK) WHERE [ID]=?") == (
+        "SELECT * FROM [T] WHERE [ID]=? LIMIT 5"
+    )
+    assert translate("SELECT COUNT_BIG(*) FROM [T]") == "SELECT COUNT(*) FROM [T]"
+
+
+def test_schema_batch_describes_seeded_tables(backend):
+    conn, cur = backend.connect("DB")
+    probed, tables = read_schema(cur)
+    conn.close()
+    assert probed[1] == 2
+    anchors = tables["Anchors"]
+    assert anchors["primary_key"] == ["ID"]
+    assert anchors["rows"] == 2
+    assert {c: info["type"] for c, info in anchors["columns"].items()} == {
+        "ID": "int", "Name": "nvarchar", "Length": "float", "Stock": "bit",
+    }
+    # Duplicate rows: no primary key.
+    assert tables["Sets"]["primary_key"] == []
+
+
+def test_transactions_commit_and_roll_back(backend):
+    conn, cur = backend.connect("DB")
+    conn.autocommit = False
+    cur.execute("UPDATE [Anchors] SET [Name]=? WHERE [ID]=?", ["X", 1])
+    conn.rollback()
+    cur.execute("UPDATE [Anchors] SET [Name]=? WHERE [ID]=?", ["Y", 2])
+    conn.commit()
+    conn.close()
+
+    conn, cur = backend.connect("DB")
+    cur.execute("SELECT TOP 10 [Name] FROM [Anchors] ORDER BY [ID]")
+    assert cur.fetchall() == [("A",), ("Y",)]
+    conn.close()
+
+
+def test_unknown_database_fails(backend):
+    with pytest.raises(Exception):
+        backend.connect("Missing")
+
+
+def test_setbolts_is_derived_from_setofbolts(tmp_path):
+    data = tmp_path / "data"
+    data.mkdir()
+    tables = {
+        "SetOfBolts": [{"Standard": "4014", "Set": "MuS", "Material": "8.8", "Diameter": 12.0}],
+        "ScrewNew": [{"Standard": "4014", "Set": "MuS", "Material": "8.8", "Diameter": 12.0,
+                      "GripLengthMin1": 10, "GripLengthMax1": 20,
+                      "ScrewLengthBase1": 30, "ScrewLengthDelta1": 5}],
+    }
+    for table, rows in tables.items():
+        (data / f"DB__{table}.json").write_text(json.dumps({"data": rows}))
+    backend = SqliteBackend(data, directory=tmp_path / "sql")
+    try:
+        assert "SetBolts" in backend.databases["DB"]
+        conn, cur = backend.connect("DB")
+        cur.execute("SELECT [ID], [Name], [Diameter], [Length] FROM [SetBolts]")
+        assert cur.fetchall() == [(1, "4014 MuS M12", 12.0, 30.0)]
+        conn.close()
+    finally:
+        backend.close()
@@ -0,0 +1,86 @@
+import threading
+
+from utils.federated import plan_queries, plan_table, run_queries
+
+CATALOG = {
+    "ASTORBASE": {
+        "SetBolts": {"ID": "int", "Name": "nvarchar", "Diameter": "float"},
+        "Flags": {"ID": "int", "Active": "bit"},
+    },
+    "ASTORPROFILES": {
+        "Profiles": {"ID": "int", "Name": "nvarchar", "Weight": "float"},
+    },
+}
+
+
+class FakeCursor:
+    def __init__(self, tables, fail=()):
+        self.tables = tables
+        self.fail = fail
+        self.description = None
+        self.records = []
+
+    def execute(self, sql, params=None):
+        table = sql.split("FROM [")[1].split("]")[0]
+        if table in self.fail:
+            raise RuntimeError(f"{table} failed")
+        self.description = [("ID",)]
+        self.records = self.tables.get(table, [])
+
+    def fetchall(self):
+        return self.records
+
+
+class FakeConn:
+    timeout = 0
+
+    def close(self):
+        pass
+
+
+def test_plan_skips_tables_that_cannot_match():
+    plan = plan_queries(CATALOG, filters={"Diameter__gt": "10"})
+    assert [(db, table) for db, table, _, _ in plan] == [("ASTORBASE", "SetBolts")]
+    assert plan[0][2] == "SELECT TOP 200 * FROM [SetBolts] WHERE [Diameter] > ?"
+    assert plan[0][3] == [10.0]
+
+    # A text term only reaches tables with text columns.
+    assert {t for _, t, _, _ in plan_queries(CATALOG, term="M12")} == {"SetBolts", "Profiles"}
+    # A numeric term also compares numeric columns.
+    assert {t for _, t, _, _ in plan_queries(CATALOG, term="12")} == {"SetBolts", "Flags", "Profiles"}
+
+    columns = CATALOG["ASTORBASE"]["SetBolts"]
+    assert plan_table("SetBolts", columns, None, {"Diameter": "abc"}) is None
+    assert plan_table("SetBolts", columns, None, {"Name__gt": "1"}) is None
+    assert plan_table("SetBolts", columns, None, {"Diameter__eq": "1"}) is None
+    assert plan_table("SetBolts", columns, None, {}) is None
+
+
+def test_run_queries_tags_results_with_their_source():
+    tables = {"SetBolts": [(1,), (2,)], "Profiles": [(7,)]}
+
+    def connect(name):
+        if name == "ASTORGRATINGS":
+            raise RuntimeError("offline")
+        return FakeConn(), FakeCursor(tables, fail={"Flags"})
+
+    plan = plan_queries(CATALOG, term="12") + [("ASTORGRATINGS", "Gratings", "", [])]
+    databases = {d: d for d in ["ASTORBASE", "ASTORPROFILES", "ASTORGRATINGS"]}
+    results = list(run_queries(connect, databases, plan))
+    rows = {(r["database"], r["table"]): [row["ID"] for row in r["rows"]] for r in results if "rows" in r}
+    assert rows == {("ASTORBASE", "SetBolts"): [1, 2], ("ASTORPROFILES", "Profiles"): [7]}
+    errors = {(r["database"], r["table"]): r["error"] for r in results if "error" in r}
+    assert errors == {("ASTORBASE", "Flags"): "Flags failed", ("ASTORGRATINGS", None): "offline"}
+
+
+def test_run_queries_gives_up_on_slow_databases():
+    release = threading.Event()
+
+    def connect(name):
+        release.wait(5)
+        return FakeConn(), FakeCursor({})
+
+    plan = [("ASTORBASE", "SetBolts", "SELECT * FROM [SetBolts]", [])]
+    results = list(run_queries(connect, {"ASTORBASE": "ASTORBASE"}, plan, timeout=0.05))
+    release.set()
+    assert results == [{"database": "ASTORBASE", "table": None, "error": "timed out"}]
@@ -0,0 +1,40 @@
+import difflib
+
+from utils.fuzzy_index import TrigramIndex, ValueCache, trigrams
+from utils.json_handler import load_json
+
+
+def test_trigrams_are_padded_and_lower_cased():
+    assert trigrams("Ab") == {"  a", " ab", "ab "}
+
+
+def test_closest_ranks_like_difflib_on_bundled_names():
+    rows = load_json("data/ASTORBASE__AnchorsDefinition.json")["data"]
+    names = [str(r["PartName"]) for r in rows if r.get("PartName") is not None]
+    index = TrigramIndex(names)
+    assert len(index) == len(set(names))
+    typos = [names[0][:-1], names[len(names) // 2].replace(" ", "", 1), names[-1] + "x"]
+    for term in typos:
+        assert index.closest(term) == difflib.get_close_matches(term, list(set(names)))
+    assert names[0] in index
+    assert index.closest("zzzzzz") == []
+
+
+def test_value_cache_reloads_only_when_probe_changes(tmp_path):
+    loads = []
+
+    def load():
+        loads.append(1)
+        return ["M12", "M16"]
+
+    cache = ValueCache(tmp_path)
+    key = ("db.mdf", "Bolts", "Name")
+    assert cache.get(key, [2, 99], load).closest("M1G", n=1) == ["M16"]
+    assert "M12" in cache.get(key, [2, 99], load)
+    assert len(loads) == 1
+
+    # A new process reads the stored values back.
+    assert ValueCache(tmp_path).get(key, [2, 99], load).values == ["M12", "M16"]
+    assert len(loads) == 1
+    ValueCache(tmp_path).get(key, [3, 7], load)
+    assert len(loads) == 2
@@ -0,0 +1,55 @@
+from utils.grip_length import build_grip_index, covered_lengths, select_length, select_lengths
+
+ROW = {
+    "Standard": "14399-3", "Set": "Mu2S", "Material": "10.9", "Diameter": 12.0,
+    "GripLengthMin1": 8.4, "GripLengthMax1": 48.4,
+    "ScrewLengthBase1": 35.0, "ScrewLengthDelta1": 5.0,
+    "GripLengthMin2": 48.4, "GripLengthMax2": 88.4,
+    "ScrewLengthBase2": 80.0, "ScrewLengthDelta2": 10.0,
+    "GripLengthMin3": 0.0, "GripLengthMax3": 0.0,
+    "ScrewLengthBase3": 0.0, "ScrewLengthDelta3": 0.0,
+}
+
+
+def test_select_length_steps_within_range():
+    index = build_grip_index([ROW])
+    assert select_length(index, 8.4, "14399-3", "Mu2S", "10.9", 12)["Length"] == 35.0
+    assert select_length(index, 13.3, "14399-3", "Mu2S", "10.9", 12)["Length"] == 35.0
+    assert select_length(index, 13.4, "14399-3", "Mu2S", "10.9", 12)["Length"] == 40.0
+
+
+def test_select_length_uses_second_range_and_bounds():
+    index = build_grip_index([ROW])
+    result = select_length(index, 60.0, "14399-3", "Mu2S", "10.9", 12)
+    assert result == {"Length": 90.0, "GripLengthMin": 58.4, "GripLengthMax": 68.4, "Range": 2}
+    assert select_length(index, 5.0, "14399-3", "Mu2S", "10.9", 12) is None
+    assert select_length(index, 100.0, "14399-3", "Mu2S", "10.9", 12) is None
+
+
+def test_select_length_rounds_away_float_noise():
+    row = dict(ROW, GripLengthMin1=0.1, GripLengthMax1=1.0, ScrewLengthDelta1=0.1)
+    index = build_grip_index([row])
+    result = select_length(index, 0.35, "14399-3", "Mu2S", "10.9", 12)
+    assert result == {"Length": 35.2, "GripLengthMin": 0.3, "GripLengthMax": 0.4, "Range": 1}
+
+
+def test_select_lengths_batch():
+    index = build_grip_index([ROW])
+    results = select_lengths(index, [
+        {"grip": 20, "Standard": "14399-3", "Set": "Mu2S", "Material": "10.9", "Diameter": 12},
+        {"grip": 20, "Standard": "4014", "Set": "MuS", "Material": "8.8", "Diameter": 12},
+        {"Standard": "14399-3"},
+    ])
+    assert results[0]["Length"] == 45.0
+    assert results[1:] == [None, None]
+
+
+def test_covered_lengths_match_select_length():
+    lengths = covered_lengths(ROW)
+    assert lengths[:3] == [35.0, 40.0, 45.0]
+    index = build_grip_index([ROW])
+    selected = {
+        select_length(index, grip / 10, "14399-3", "Mu2S", "10.9", 12)["Length"]
+        for grip in range(84, 884)
+    }
+    assert selected == set(lengths)
@@ -0,0 +1,37 @@
+import gzip
+
+from utils import table_cache
+from utils.http_cache import BodyCache, choose_encoding, table_etag
+
+
+def test_table_etag_follows_version_and_variant():
+    table_cache.clear()
+    tag = table_etag("A.json", "/search/A.json?q=x")
+    assert tag == table_etag("A.json", "/search/A.json?q=x")
+    assert tag != table_etag("A.json", "/search/A.json?q=y")
+    table_cache.bump_version("A.json")
+    assert tag != table_etag("A.json", "/search/A.json?q=x")
+
+
+def test_choose_encoding_honours_quality():
+    assert choose_encoding("") == "identity"
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0, deflate") == "identity"
+
+
+def test_body_cache_renders_and_compresses_once():
+    cache = BodyCache(max_entries=4)
+    calls = []
+
+    def render():
+        calls.append(1)
+        return b"x" * 2000
+
+    body, used = cache.get("t1", "gzip", render, min_size=1024)
+    assert used == "gzip" and gzip.decompress(body) == b"x" * 2000
+    assert cache.get("t1", "gzip", render, 1024) == (body, used)
+    assert cache.get("t1", "identity", render, 1024) == (b"x" * 2000, "identity")
+    assert len(calls) == 1
+
+    small, used = cache.get("t2", "gzip", lambda: b"tiny", min_size=1024)
+    assert (small, used) == (b"tiny", "identity")
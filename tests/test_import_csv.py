@@ -0,0 +1,139 @@
+import io
+
+import pytest
+
+from import_csv import coerce_value, import_rows
+
+SCHEMA = [("ID", "int", "NO"), ("Name", "nvarchar", "YES"), ("Weight", "float", "YES"), ("Active", "bit", "YES")]
+
+
+class FakeConn:
+    def __init__(self):
+        self.autocommit = True
+        self.committed = False
+        self.rolled_back = False
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+class FakeCursor:
+    def __init__(self, fail_on=None, merge_fails_on=None, identity=None):
+        self.statements = []
+        self.inserted = []
+        self.fail_on = fail_on
+        self.merge_fails_on = merge_fails_on
+        self.identity = identity
+        self.staged = []
+        self.results = []
+
+    def execute(self, query, params=None):
+        self.statements.append(query)
+        if "INFORMATION_SCHEMA.COLUMNS" in query:
+            self.results = SCHEMA
+        elif "PRIMARY KEY" in query:
+            self.results = [("ID",)]
+        elif "sys.identity_columns" in query:
+            self.results = [(self.identity,)] if self.identity else []
+        elif query.startswith("INSERT"):
+            if params[0] == self.fail_on:
+                raise RuntimeError("constraint violation")
+            self.inserted.append(list(params))
+            self.staged.append(params[0])
+        elif query.startswith("MERGE"):
+            # Like a FOREIGN KEY the staging table does not enforce.
+            if self.merge_fails_on in self.staged:
+                raise RuntimeError("FOREIGN KEY constraint")
+        elif query.startswith(("DELETE FROM #import_stage", "ROLLBACK")):
+            self.staged = []
+
+    def executemany(self, query, seq):
+        seq = list(seq)
+        if any(p[0] == self.fail_on for p in seq):
+            raise RuntimeError("batch failed")
+        self.statements.append(query)
+        self.inserted.extend(seq)
+        self.staged.extend(p[0] for p in seq)
+
+    def fetchone(self):
+        return self.results[0] if self.results else None
+
+    def fetchall(self):
+        return self.results
+
+
+def test_coerce_value_types():
+    assert coerce_value("3.0", "int", False) == 3
+    assert coerce_value("2.5", "float", True) == 2.5
+    assert coerce_value("", "float", True) is None
+    assert coerce_value("yes", "bit", True) is True
+    with pytest.raises(ValueError):
+        coerce_value("", "int", False)
+    with pytest.raises(ValueError):
+        coerce_value("2.5", "int", False)
+
+
+def test_import_rows_upsert_merges_and_reports_errors():
+    conn, cur = FakeConn(), FakeCursor(fail_on=4)
+    lines = [
+        "ID,Name,Weight,Active",
+        "1,Bolt,0.5,1",
+        "2,Nut,abc,0",
+        "1,Dup,0.1,1",
+        "4,Bad,0.2,0",
+        "5,Washer,,0",
+    ]
+    result = import_rows(conn, cur, "Parts", lines, chunk_size=2)
+    assert result["rows"] == 5
+    assert result["written"] == 2
+    assert [line for line, _ in result["errors"]] == [3, 4, 5]
+    assert cur.inserted == [[1, "Bolt", 0.5, True], [5, "Washer", None, False]]
+    assert any(s.startswith("MERGE [Parts]") for s in cur.statements)
+    assert conn.committed and conn.autocommit
+
+
+def test_import_rows_replace_deletes_first():
+    conn, cur = FakeConn(), FakeCursor()
+    import_rows(conn, cur, "Parts", ["ID,Name", "1,Bolt"], mode="replace")
+    assert "DELETE FROM [Parts]" in cur.statements
+    assert not any("MERGE" in s for s in cur.statements)
+
+
+def test_import_rows_rejects_unknown_columns():
+    with pytest.raises(ValueError):
+        import_rows(FakeConn(), FakeCursor(), "Parts", ["ID,Colour", "1,red"])
+
+
+def test_import_rows_upsert_isolates_rows_failing_the_merge():
+    conn, cur = FakeConn(), FakeCursor(merge_fails_on=2)
+    lines = ["ID,Name", "1,Bolt", "2,Orphan", "3,Nut"]
+    result = import_rows(conn, cur, "Parts", lines, chunk_size=10)
+    assert result["written"] == 2
+    assert [line for line, _ in result["errors"]] == [3]
+    assert "FOREIGN KEY" in result["errors"][0][1]
+    assert conn.committed and not conn.rolled_back
+
+
+def test_import_rows_keeps_exported_identity_values():
+    conn, cur = FakeConn(), FakeCursor(identity="ID")
+    result = import_rows(conn, cur, "Parts", ["ID,Name", "7,Bolt"], key=["Name"])
+    assert result["written"] == 1
+    assert "SET IDENTITY_INSERT [Parts] ON" in cur.statements
+    assert cur.statements[-1] == "SET IDENTITY_INSERT [Parts] OFF"
+    merge = next(s for s in cur.statements if s.startswith("MERGE"))
+    assert "t.[ID] =" not in merge.split("WHEN NOT MATCHED")[0]
+
+    conn, cur = FakeConn(), FakeCursor(identity="ID")
+    import_rows(conn, cur, "Parts", ["Name", "Bolt"], key=["Name"])
+    assert not any("IDENTITY_INSERT" in s for s in cur.statements)
+
+
+def test_import_rows_reports_physical_line_numbers():
+    conn, cur = FakeConn(), FakeCursor()
+    lines = io.StringIO('ID,Name\n1,"Hex\nbolt"\n\nx,Nut\n')
+    result = import_rows(conn, cur, "Parts", lines, mode="replace")
+    assert result["rows"] == 2
+    assert [line for line, _ in result["errors"]] == [5]
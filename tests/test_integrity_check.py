@@ -1,4 +1,7 @@
-from integrity_check import check_bolt_integrity
+import json
+
+from integrity_check import check_bolt_integrity, check_connector_integrity
+from utils.fake_sql import SqliteBackend
 
 
 def fake_connect_sql_server(database):
@@ -26,3 +29,26 @@ def test_check_bolt_integrity(monkeypatch):
     missing = check_bolt_integrity()
     assert missing == [3]
 
+
+def test_check_connector_integrity(monkeypatch, tmp_path):
+    tables = {
+        "ConnectorRelations": [
+            {"Key": 1, "ConnectorStandard": "S", "ConnectorMaterial": "M", "ConnectorDiameter": 16.0},
+            {"Key": 2, "ConnectorStandard": "S", "ConnectorMaterial": "X", "ConnectorDiameter": 16.0},
+        ],
+        "ConnectorStandard": [{"Key": "S", "RunName": "S"}],
+        "ConnectorMaterial": [{"Key": "M", "RunName": "M"}],
+        "ConnectorDiameters": [{"Key": 16.0, "RunName": "16 mm"}],
+        "ConnectorDistances": [{"Key": 16.0, "HoleTolerance": 0.0, "along": 80.0, "across": 60.0}],
+    }
+    for table, rows in tables.items():
+        (tmp_path / f"ASTORBASE__{table}.json").write_text(json.dumps({"data": rows}))
+    backend = SqliteBackend(tmp_path, directory=tmp_path / "db")
+    monkeypatch.setattr("integrity_check.connect_sql_server", backend.connect)
+    try:
+        problems = check_connector_integrity()
+    finally:
+        backend.close()
+    assert problems == [
+        {"Key": 2, "relation": ["S", "X", 16.0], "missing": ["ConnectorMaterial"]},
+    ]
@@ -0,0 +1,74 @@
+import threading
+
+from utils.journal import Journal, inverse_delta, parse_time
+
+
+def test_record_and_query_by_table_and_time(tmp_path, monkeypatch):
+    journal = Journal(tmp_path)
+    clock = iter([100.0, 200.0, 300.0])
+    monkeypatch.setattr("utils.journal.time.time", lambda: next(clock))
+    add = [{"op": "add", "value": {"ID": 1}}]
+    assert journal.record("A.json", ["ID"], add) == 1
+    assert journal.record("B.json", ["ID"], add) == 2
+    assert journal.record("A.json", ["ID"], add, undo_of=[1]) == 3
+    assert journal.record("A.json", ["ID"], []) is None
+
+    assert [e["id"] for e in journal.entries("A.json")] == [1, 3]
+    assert [e["id"] for e in journal.entries(since=150, until=250)] == [2]
+    assert journal.get(3)["undo_of"] == [1]
+    assert journal.get(4) is None
+
+    # A fresh instance rebuilds its index from disk.
+    reopened = Journal(tmp_path)
+    assert reopened.undone() == {1}
+    assert [e["id"] for e in reopened.entries("A.json", since=250)] == [3]
+
+
+def test_journals_sharing_a_directory_assign_unique_ids(tmp_path):
+    # Like two serve.py workers, or undo.py next to the app.
+    first, second = Journal(tmp_path), Journal(tmp_path)
+    add = [{"op": "add", "value": {"ID": 1}}]
+    ids = [
+        first.record("A.json", ["ID"], add),
+        second.record("B.json", ["ID"], add),
+        first.record("A.json", ["ID"], add, undo_of=[2]),
+    ]
+    assert ids == [1, 2, 3]
+    assert first.get(2)["table"] == second.get(2)["table"] == "B.json"
+    assert second.undone() == {2}
+    assert [e["id"] for e in second.entries("A.json")] == [1, 3]
+
+    threads = [
+        threading.Thread(target=lambda j=j: [j.record("C.json", ["ID"], add) for _ in range(20)])
+        for j in (first, second, Journal(tmp_path))
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert [e["id"] for e in Journal(tmp_path).entries()] == list(range(1, 64))
+
+
+def test_inverse_delta_reverses_ops():
+    entry = {
+        "key": ["ID"],
+        "ops": [
+            {"op": "add", "value": {"ID": 3, "Name": "C"}, "version": "v3"},
+            {"op": "replace", "key": {"ID": 1}, "before": {"Name": "A"},
+             "value": {"Name": "A2"}, "version": "v1"},
+            {"op": "remove", "key": {"ID": 2}, "before": {"ID": 2, "Name": "B"}},
+        ],
+    }
+    assert inverse_delta(entry) == {
+        "key": ["ID"],
+        "ops": [
+            {"op": "add", "value": {"ID": 2, "Name": "B"}},
+            {"op": "replace", "key": {"ID": 1}, "value": {"Name": "A"}, "version": "v1"},
+            {"op": "remove", "key": {"ID": 3}, "version": "v3"},
+        ],
+    }
+
+
+def test_parse_time_accepts_epoch_and_iso():
+    assert parse_time("12.5") == 12.5
+    assert parse_time("2025-01-01T00:00:00+00:00") == 1735689600.0
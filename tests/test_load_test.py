@@ -0,0 +1,45 @@
+import json
+
+import config
+from load_test import DEFAULT_MIX, Workload, compare, percentile, run_level, start_app
+from utils.fake_sql import SqliteBackend
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([], 50) == 0.0
+
+
+def test_run_level_reports_every_route(tmp_path, monkeypatch):
+    for name in ("READ_ONLY", "WATCH_INTERVAL", "JOURNAL_DIR"):
+        monkeypatch.setattr(config, name, getattr(config, name))
+    data = tmp_path / "data"
+    data.mkdir()
+    anchors = [{"ID": i, "AnchorID": i % 3, "Length": 100 + i} for i in range(1, 30)]
+    # SetBolts is derived from SetOfBolts, as with the bundled data.
+    sets = [{"Standard": "A325", "Set": "HS", "Material": "8.8", "Diameter": 12.7}]
+    for table, rows in (("AnchorsDefinition", anchors), ("SetOfBolts", sets)):
+        (data / f"{config.DEFAULT_DATABASE}__{table}.json").write_text(json.dumps({"data": rows}))
+    backend = SqliteBackend(data, directory=tmp_path / "sql")
+    workload = Workload(backend)
+    assert workload.unavailable() == {}
+    server, port = start_app(backend, tmp_path)
+    try:
+        level = run_level(port, workload, DEFAULT_MIX, concurrency=2, duration=1.0, seed=1)
+    finally:
+        server.shutdown()
+        server.server_close()
+        backend.close()
+
+    assert level["concurrency"] == 2
+    assert set(level["routes"]) == set(DEFAULT_MIX)
+    assert level["overall"]["requests"] > 0
+    assert level["overall"]["errors"] == 0
+    assert level["overall"]["p50_ms"] <= level["overall"]["p99_ms"]
+
+    report = {"levels": [level]}
+    lines = compare(report, report)
+    assert any("overall" in line and "+0.0%" in line for line in lines)
@@ -0,0 +1,53 @@
+import os
+
+from utils import mdf_catalog
+
+
+def make_tree(root):
+    (root / "Steel" / "Data").mkdir(parents=True)
+    (root / "Steel" / "Data" / "AstorBase.mdf").write_bytes(b"x" * 10)
+    (root / "Steel" / "Data" / "AstorBase.ldf").write_bytes(b"")
+    (root / "Joints").mkdir()
+    (root / "Joints" / "AstorJoints.MDF").write_bytes(b"")
+
+
+def test_find_mdf_files_relists_only_changed_folders(tmp_path):
+    root = tmp_path / "USA"
+    make_tree(root)
+    catalog = tmp_path / "catalog.json"
+    roots = [str(root)]
+
+    found = mdf_catalog.find_mdf_files(roots, catalog)
+    assert [os.path.basename(f["path"]) for f in found] == ["AstorJoints.MDF", "AstorBase.mdf"]
+    assert found[1]["size"] == 10
+
+    cached = mdf_catalog.load_catalog(catalog, roots)
+    dirs, listed = mdf_catalog.refresh(roots, cached)
+    assert listed == 0 and dirs == cached
+
+    # Growing a file does not touch its folder but the size is refreshed.
+    (root / "Steel" / "Data" / "AstorBase.mdf").write_bytes(b"x" * 20)
+    new = root / "Steel" / "Data" / "AstorRules.mdf"
+    new.write_bytes(b"")
+    os.utime(root / "Steel" / "Data", ns=(0, 12345))
+    dirs, listed = mdf_catalog.refresh(roots, cached)
+    assert listed == 1
+    by_name = {os.path.basename(f["path"]): f for f in mdf_catalog.mdf_files(dirs)}
+    assert by_name["AstorBase.mdf"]["size"] == 20
+    assert "AstorRules.mdf" in by_name
+
+
+def test_load_catalog_ignores_other_roots_and_bad_files(tmp_path):
+    catalog = tmp_path / "catalog.json"
+    mdf_catalog.save_catalog(catalog, ["A"], {"A": {"mtime": 1, "files": {}, "dirs": []}})
+    assert mdf_catalog.load_catalog(catalog, ["A"])
+    assert mdf_catalog.load_catalog(catalog, ["B"]) == {}
+    catalog.write_text("{", encoding="utf-8")
+    assert mdf_catalog.load_catalog(catalog, ["A"]) == {}
+    assert mdf_catalog.load_catalog(tmp_path / "missing.json", ["A"]) == {}
+
+
+def test_search_roots_follow_the_configured_version():
+    assert mdf_catalog.search_roots(2024) == [
+        r"C:\ProgramData\Autodesk\Advance Steel 2024\USA"
+    ]
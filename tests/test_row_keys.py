@@ -0,0 +1,27 @@
+from utils.row_keys import build_delta, natural_key, row_version
+
+
+def test_natural_key_prefers_known_keys():
+    assert natural_key("SetNutsBolts", ["Standard", "Material", "Diameter", "Weight"]) == [
+        "Standard", "Material", "Diameter",
+    ]
+    assert natural_key("AnchorsName", ["ID", "Standard"]) == ["ID"]
+    assert natural_key("Odd", ["a", "b"]) == ["a", "b"]
+
+
+def test_row_version_tracks_content():
+    assert row_version({"ID": 1, "Name": "A"}) == row_version({"ID": 1, "Name": "A"})
+    assert row_version({"ID": 1, "Name": "A"}) != row_version({"ID": 1, "Name": "B"})
+
+
+def test_build_delta_emits_only_changes():
+    before = [{"ID": 1, "Name": "A"}, {"ID": 2, "Name": "B"}, {"ID": 3, "Name": "C"}]
+    after = [{"ID": 1, "Name": "A"}, {"ID": 2, "Name": "B2"}, {"ID": 4, "Name": "D"}]
+    assert build_delta(before, after, ["ID"]) == {
+        "key": ["ID"],
+        "ops": [
+            {"op": "replace", "key": {"ID": 2}, "value": {"Name": "B2"}},
+            {"op": "add", "value": {"ID": 4, "Name": "D"}},
+            {"op": "remove", "key": {"ID": 3}},
+        ],
+    }
@@ -0,0 +1,55 @@
+import json
+import pickle
+from datetime import date
+
+from utils.rows import Header, Row, fetch_rows, iter_rows, json_default, make_rows
+
+
+class FakeCursor:
+    def __init__(self, columns, records):
+        self.description = [(c,) for c in columns] if columns else None
+        self.records = list(records)
+
+    def fetchall(self):
+        records, self.records = self.records, []
+        return records
+
+    def fetchmany(self, size):
+        batch, self.records = self.records[:size], self.records[size:]
+        return batch
+
+
+def test_row_behaves_like_a_read_only_mapping():
+    row = Row(Header(["Id", "Name"]), (1, "M12"))
+    assert row["Name"] == "M12"
+    assert row.get("Missing", 0) == 0
+    assert "Id" in row and "Missing" not in row
+    assert list(row) == ["Id", "Name"]
+    assert dict(row) == {"Id": 1, "Name": "M12"}
+    assert row == {"Id": 1, "Name": "M12"}
+    copy = row.copy()
+    copy["Name"] = "M16"
+    assert row["Name"] == "M12"
+
+
+def test_rows_share_one_header_and_survive_pickling():
+    rows = make_rows(Header(["a", "b"]), [(1, 2), (3, 4)])
+    assert rows[0]._header is rows[1]._header
+    restored = pickle.loads(pickle.dumps(rows))
+    assert restored == rows
+    assert restored[0]._header is restored[1]._header
+
+
+def test_fetch_rows_and_iter_rows_read_the_cursor():
+    assert fetch_rows(FakeCursor(None, [])) == []
+    rows = fetch_rows(FakeCursor(["x"], [(1,), (2,)]))
+    assert [r["x"] for r in rows] == [1, 2]
+    rows = list(iter_rows(FakeCursor(["x"], [(i,) for i in range(5)]), size=2))
+    assert [r["x"] for r in rows] == [0, 1, 2, 3, 4]
+
+
+def test_json_default_serializes_rows_as_objects():
+    rows = make_rows(Header(["a", "when"]), [(1, date(2025, 3, 1))])
+    assert json.loads(json.dumps(rows, default=json_default)) == [
+        {"a": 1, "when": "2025-03-01"}
+    ]
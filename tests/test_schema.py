@@ -0,0 +1,114 @@
+import pytest
+
+from utils.schema import SchemaCatalog, column_types, read_schema
+
+
+class SchemaCursor:
+    def __init__(self, state):
+        self.state = state
+        self.results = []
+        self.sets = []
+
+    def execute(self, sql, params=None):
+        self.state["queries"].append(sql.split(";")[0])
+        self.results = [self.state["probe"]]
+        if sql.startswith("SET NOCOUNT ON"):
+            self.sets = [
+                [("Bolts", 120), ("Sets", 3)],
+                [
+                    ("Bolts", "ID", "int", False, True),
+                    ("Bolts", "SetID", "int", True, False),
+                    ("Sets", "ID", "int", False, True),
+                ],
+                [("Bolts", "ID"), ("Sets", "ID")],
+                [("FK_Bolts_Sets", "Bolts", "SetID", "Sets", "ID")],
+            ]
+
+    def fetchone(self):
+        return self.results[0]
+
+    def fetchall(self):
+        return self.results
+
+    def nextset(self):
+        self.results = self.sets.pop(0)
+        return True
+
+
+class Conn:
+    def close(self):
+        pass
+
+
+def make_state():
+    return {"probe": ("2025-01-01 00:00:00", 2), "queries": []}
+
+
+def test_read_schema_describes_tables_in_one_batch():
+    state = make_state()
+    probed, tables = read_schema(SchemaCursor(state))
+    assert probed == ("2025-01-01 00:00:00", 2)
+    assert len(state["queries"]) == 1
+    bolts = tables["Bolts"]
+    assert bolts["rows"] == 120
+    assert bolts["primary_key"] == ["ID"]
+    assert bolts["columns"]["ID"] == {"type": "int", "nullable": False, "identity": True}
+    assert bolts["foreign_keys"] == [{
+        "name": "FK_Bolts_Sets", "columns": ["SetID"], "references": "Sets", "ref_columns": ["ID"],
+    }]
+    assert column_types(tables["Sets"]) == {"ID": ("int", False)}
+
+
+def test_catalog_reloads_only_when_the_probe_changes(monkeypatch):
+    state = make_state()
+    clock = [0.0]
+    monkeypatch.setattr("utils.schema.time.monotonic", lambda: clock[0])
+    catalog = SchemaCatalog(lambda db: (Conn(), SchemaCursor(state)), probe_interval=10)
+
+    assert "Bolts" in catalog.get("ASTORBASE")
+    clock[0] = 5
+    assert catalog.table("ASTORBASE", "Sets")["rows"] == 3
+    assert catalog.table("ASTORBASE", "Missing") is None
+    assert len(state["queries"]) == 1
+
+    clock[0] = 20
+    catalog.get("ASTORBASE")
+    assert state["queries"][-1].startswith("SELECT MAX(modify_date)")
+    assert len(state["queries"]) == 2
+
+    state["probe"] = ("2025-02-01 00:00:00", 3)
+    clock[0] = 40
+    catalog.get("ASTORBASE")
+    assert state["queries"][-1] == "SET NOCOUNT ON"
+
+
+def test_catalog_remembers_failed_connections(monkeypatch):
+    state = make_state()
+    clock = [0.0]
+    connects = []
+    monkeypatch.setattr("utils.schema.time.monotonic", lambda: clock[0])
+
+    def connect(db):
+        connects.append(db)
+        if state.get("down"):
+            raise ConnectionError("no driver")
+        return Conn(), SchemaCursor(state)
+
+    catalog = SchemaCatalog(connect, probe_interval=10)
+    state["down"] = True
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            catalog.get("ASTORBASE")
+    assert len(connects) == 1
+
+    state["down"] = False
+    clock[0] = 15
+    assert "Bolts" in catalog.get("ASTORBASE")
+
+    # Once read, the last known schema outlives an outage.
+    state["down"] = True
+    clock[0] = 30
+    assert "Bolts" in catalog.get("ASTORBASE")
+    clock[0] = 35
+    assert "Bolts" in catalog.get("ASTORBASE")
+    assert len(connects) == 3
@@ -0,0 +1,61 @@
+from sql_query import format_table, iter_batches, run_query, stream_csv, stream_ndjson, stream_table
+
+
+class Cursor:
+    def __init__(self, rows, columns=("ID", "Name")):
+        self.description = [(c,) for c in columns]
+        self.rows = list(rows)
+        self.queries = []
+        self.sizes = []
+
+    def execute(self, query):
+        self.queries.append(query)
+
+    def fetchmany(self, size):
+        self.sizes.append(size)
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+
+def test_run_query_fetches_in_batches_up_to_limit():
+    cur = Cursor([(i, f"n{i}") for i in range(12)])
+    rows = run_query(cur, "SELECT * FROM T", "ASTORBASE", limit=7)
+    assert cur.queries == ["USE [ASTORBASE]", "SELECT * FROM T"]
+    assert [r["ID"] for r in rows] == list(range(7))
+
+
+def test_iter_batches_stops_at_limit_without_overfetching():
+    cur = Cursor([(i, "x") for i in range(10)])
+    batches = list(iter_batches(cur, limit=5, size=3))
+    assert [len(b) for b in batches] == [3, 2]
+    assert cur.sizes == [3, 2]
+
+
+def test_stream_table_sizes_columns_from_sample():
+    batches = [[(1, "a"), (2, "bb")], [(3, "a much longer name")]]
+    lines = list(stream_table(["ID", "Name"], batches, sample=2))
+    assert lines == [
+        "ID | Name",
+        "---+-----",
+        "1  | a   ",
+        "2  | bb  ",
+        "3  | a much longer name",
+    ]
+
+
+def test_stream_table_caps_width_and_matches_format_table():
+    batches = [[(1, "abcdefgh")]]
+    assert list(stream_table(["ID", "Name"], batches, max_width=4))[2] == "1  | abc…"
+    rows = run_query(Cursor([(1, "a"), (22, None)]), "SELECT 1")
+    assert "\n".join(stream_table(["ID", "Name"], [[(1, "a"), (22, None)]])) == format_table(rows)
+    assert list(stream_table(["ID"], [])) == ["No results."]
+
+
+def test_stream_ndjson_and_csv():
+    batches = [[(1, "a,b")], [(2, None)]]
+    assert list(stream_ndjson(["ID", "Name"], batches)) == [
+        '{"ID": 1, "Name": "a,b"}',
+        '{"ID": 2, "Name": null}',
+    ]
+    assert list(stream_csv(["ID", "Name"], batches)) == ['ID,Name\n1,"a,b"', "2,"]
+    assert list(stream_csv(["ID"], [])) == ["ID"]
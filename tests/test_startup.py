@@ -0,0 +1,10 @@
+import pytest
+
+from bench_startup import BUDGETS_MS, check
+
+
+@pytest.mark.parametrize("module", sorted(BUDGETS_MS))
+def test_import_stays_within_budget(module):
+    result = check(module, repeat=1)
+    assert result["loaded_early"] == []
+    assert not result["over_budget"], f"{module} took {result['ms']:.0f} ms"
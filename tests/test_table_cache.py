@@ -0,0 +1,59 @@
+from utils import table_cache
+
+
+def test_get_cached_rebuilds_after_write():
+    table_cache.clear()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return len(builds)
+
+    assert table_cache.get_cached("x", ["A.json"], build) == 1
+    assert table_cache.get_cached("x", ["A.json"], build) == 1
+    table_cache.bump_version("A.json")
+    assert table_cache.get_cached("x", ["A.json"], build) == 2
+
+
+def test_shared_versions_replay_writes_from_other_processes(tmp_path):
+    table_cache.clear()
+    path = tmp_path / "versions.txt"
+    table_cache.share_versions(path)
+    assert table_cache.bump_version("A.json") == 1
+
+    # Another process appending to the file, including a partial line.
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("B.json\nA.json\nA.js")
+    assert table_cache.sync_versions() is True
+    assert table_cache.table_version("A.json") == 2
+    assert table_cache.table_version("B.json") == 1
+    assert table_cache.sync_versions() is False
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("on\n")
+    assert table_cache.sync_versions() is True
+    assert table_cache.table_version("A.json") == 3
+    table_cache.clear()
+
+
+def test_update_cached_applies_own_writes_in_place():
+    table_cache.clear()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return []
+
+    value = table_cache.get_cached("x", ["A.json", "B.json"], build)
+    table_cache.bump_version("A.json")
+    assert table_cache.update_cached("x", ["A.json", "B.json"], "A.json", lambda v: v.append("a"))
+    assert table_cache.get_cached("x", ["A.json", "B.json"], build) == ["a"]
+    assert len(builds) == 1
+
+    # Two writes, one applied: the value is stale and gets rebuilt.
+    table_cache.bump_version("B.json")
+    table_cache.bump_version("B.json")
+    assert not table_cache.update_cached("x", ["A.json", "B.json"], "B.json", value.append)
+    assert table_cache.get_cached("x", ["A.json", "B.json"], build) == []
+    assert len(builds) == 2
+    table_cache.clear()
@@ -0,0 +1,62 @@
+from takeoff import build_takeoff_index, iter_bom_csv, takeoff
+
+SETS = [{
+    "Standard": "4014", "Set": "MuS", "Material": "8.8", "Diameter": 12.0,
+    "DIN1": "934", "Diameter1 (mm)": 12.0, "Material1": "8", "Position1": -1,
+    "DIN2": "125", "Diameter2 (mm)": 12.0, "Material2": "St", "Position2": 1,
+}]
+SCREWS = [{"Standard": "4014", "Set": "MuS", "Material": "8.8", "Diameter": 12.0}]
+PARTS = [
+    {"Standard": "934", "Material": "8", "Diameter": 12.0, "Name": "Nut M12", "Weight": 0.016},
+    {"Standard": "125", "Material": "St", "Diameter": 12.0, "Name": "Washer M12", "Weight": 0.006},
+]
+
+CALLOUTS = [
+    "Standard,Set,Material,Diameter,Length,Quantity",
+    "4014,MuS,8.8,12,40,10",
+    "4014,MuS,8.8,12,40,5",
+    "4014,MuS,8.8,12,50,",
+    "4014,MuS,8.8,16,50,1",
+]
+
+
+def test_takeoff_aggregates_components():
+    index = build_takeoff_index(SETS, SCREWS, PARTS)
+    totals, errors = takeoff(CALLOUTS, index)
+    assert totals[("4014", "8.8", 12.0, 40.0)][1] == 15
+    assert totals[("4014", "8.8", 12.0, 50.0)][1] == 1
+    assert totals[("934", "8", 12.0, None)] == ["Nut M12", 16, 0.016]
+    assert errors == [(5, "no ScrewNew entry")]
+
+
+def test_takeoff_parallel_matches_serial():
+    index = build_takeoff_index(SETS, SCREWS, PARTS)
+    lines = CALLOUTS[:1] + CALLOUTS[1:4] * 20
+    serial, _ = takeoff(lines, index)
+    parallel, _ = takeoff(lines, index, workers=2, chunk_size=7)
+    assert parallel == serial
+
+
+def test_takeoff_parallel_keeps_multi_line_fields(tmp_path):
+    index = build_takeoff_index(SETS, SCREWS, PARTS)
+    header = "Standard,Set,Material,Diameter,Length,Quantity,Note\n"
+    record = '4014,MuS,8.8,12,40,2,"first line\nsecond line"\n'
+    path = tmp_path / "callouts.csv"
+    # Excel saves UTF-8 CSV files with a byte order mark.
+    path.write_text(header + record * 15 + "4014,MuS,8.8,16,50,1,\n", encoding="utf-8-sig")
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        serial, serial_errors = takeoff(f, index)
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        parallel, parallel_errors = takeoff(f, index, workers=2, chunk_size=4)
+    assert parallel == serial
+    assert serial[("4014", "8.8", 12.0, 40.0)][1] == 30
+    # Errors name the physical line the record starts on.
+    assert serial_errors == parallel_errors == [(32, "no ScrewNew entry")]
+
+
+def test_iter_bom_csv_writes_weights():
+    index = build_takeoff_index(SETS, SCREWS, PARTS)
+    totals, _ = takeoff(CALLOUTS, index)
+    lines = list(iter_bom_csv(totals))
+    assert lines[0].startswith("Standard,Material,Diameter,Length,Name")
+    assert "125,St,12.0,,Washer M12,16,0.006,0.096\r\n" in lines
@@ -0,0 +1,22 @@
+import sys
+
+import pytest
+
+import config
+import undo
+
+
+def test_undo_is_refused_in_read_only_mode(monkeypatch, capsys):
+    calls = []
+    monkeypatch.setattr(config, "READ_ONLY", True)
+    monkeypatch.setattr(undo, "undo_changes", lambda *args: calls.append(args) or [])
+    monkeypatch.setattr(sys, "argv", ["undo.py", "undo", "1"])
+    with pytest.raises(SystemExit) as exc:
+        undo.main()
+    assert exc.value.code == 1
+    assert "READ_ONLY" in capsys.readouterr().err
+    assert calls == []
+
+    monkeypatch.setattr(config, "READ_ONLY", False)
+    undo.main()
+    assert calls == [([1], None, None, None)]
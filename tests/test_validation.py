@@ -1,4 +1,4 @@
-from utils.validation import validate_rows
+from utils.validation import validate_delta, validate_rows
 import pytest
 
 
@@ -12,3 +12,22 @@ def test_validate_rows_raises_on_mismatch():
     with pytest.raises(ValueError):
         validate_rows(rows)
 
+
+def test_validate_delta_accepts_keyed_ops():
+    validate_delta({
+        "key": ["ID"],
+        "ops": [
+            {"op": "add", "value": {"ID": 3, "name": "C"}},
+            {"op": "replace", "key": {"ID": 1}, "value": {"name": "A2"}},
+            {"op": "remove", "key": {"ID": 2}},
+        ],
+    })
+
+
+def test_validate_delta_rejects_bad_ops():
+    with pytest.raises(ValueError):
+        validate_delta({"key": ["ID"], "ops": [{"op": "remove", "key": {"name": "A"}}]})
+    with pytest.raises(ValueError):
+        validate_delta({"key": ["ID"], "ops": [{"op": "add", "value": {"name": "A"}}]})
+    with pytest.raises(ValueError):
+        validate_delta({"key": [], "ops": []})
@@ -0,0 +1,65 @@
+import json
+
+from version_diff import DumpSource, diff_rows, diff_sources, iter_dump_rows
+
+
+def write_dump(folder, table, rows):
+    folder.mkdir(exist_ok=True)
+    path = folder / f"ASTORBASE__{table}.json"
+    path.write_text(json.dumps({"_table_name": table, "data": rows}, indent=2))
+    return path
+
+
+def test_iter_dump_rows_streams_small_blocks(tmp_path):
+    rows = [{"ID": i, "Name": f"row {i}", "Weight": i / 3} for i in range(50)]
+    path = write_dump(tmp_path, "T", rows)
+    assert list(iter_dump_rows(path, block_size=7)) == rows
+
+
+def test_diff_rows_reports_column_deltas_with_spilled_runs():
+    old = [{"ID": i, "Name": f"n{i}"} for i in range(10, 0, -1)]
+    new = [{"ID": i, "Name": f"n{i}"} for i in range(2, 12)]
+    new[0]["Name"] = "renamed"
+    changes = list(diff_rows(old, new, ["ID"], ["ID", "Name"], chunk_size=3))
+    assert [(c["change"], c["key"]["ID"]) for c in changes] == [
+        ("removed", 1), ("changed", 2), ("added", 11),
+    ]
+    assert changes[1]["delta"] == {"Name": ["n2", "renamed"]}
+
+
+def test_diff_sources_uses_natural_keys_and_custom_filter(tmp_path):
+    stock = {"Standard": "934", "Material": "8", "Diameter": 12.0, "Weight": 0.016, "OwnerText": "DSC"}
+    custom = {"Standard": "934", "Material": "8", "Diameter": 14.0, "Weight": 0.02, "OwnerText": "ACME"}
+    write_dump(tmp_path / "old", "SetNutsBolts", [stock, custom])
+    write_dump(tmp_path / "old", "Sets", [{"Key": "2M"}])
+    write_dump(tmp_path / "new", "SetNutsBolts", [dict(stock, Weight=0.017, Extra=1)])
+
+    changes = list(diff_sources(DumpSource(tmp_path / "old"), DumpSource(tmp_path / "new")))
+    by_change = {(c["table"], c["change"]): c for c in changes}
+    assert by_change[("SetNutsBolts", "columns")]["added"] == ["Extra"]
+    assert by_change[("SetNutsBolts", "changed")]["delta"] == {"Weight": [0.016, 0.017]}
+    assert by_change[("SetNutsBolts", "removed")]["key"]["Diameter"] == 14.0
+    assert ("Sets", "table_removed") in by_change
+
+    changes = list(diff_sources(
+        DumpSource(tmp_path / "old"), DumpSource(tmp_path / "new"),
+        tables=["SetNutsBolts"], custom_only=True,
+    ))
+    assert [c["change"] for c in changes] == ["columns", "removed"]
+
+
+def test_diff_rows_matches_sql_types_against_dump_text():
+    from datetime import datetime
+    from decimal import Decimal
+
+    sql = [
+        {"ID": Decimal("2.50"), "Changed": datetime(2024, 5, 1, 12, 0), "Weight": Decimal("0.016")},
+        {"ID": Decimal("10.00"), "Changed": datetime(2024, 5, 2), "Weight": Decimal("0.020")},
+    ]
+    # The same rows after a round trip through sql_dump.py.
+    dump = json.loads(json.dumps(sql, default=str))
+    dump[1]["Weight"] = "0.021"
+    changes = list(diff_rows(sql, dump, ["ID"], ["ID", "Changed", "Weight"], chunk_size=1))
+    assert changes == [
+        {"change": "changed", "key": {"ID": "10.00"}, "delta": {"Weight": ["0.020", "0.021"]}},
+    ]
@@ -0,0 +1,72 @@
+"""List and undo edits recorded in the change journal.
+
+Every write made through the web app is journaled with the before image of
+the rows it touched, so a single edit or everything done in a time window
+can be reverted in place without restoring an MDF backup. Like the app's
+``/undo`` route, undoing is refused while ``READ_ONLY`` is set in
+``config.py``; listing always works.
+
+Examples::
+
+    python undo.py list --table ASTORBASE__SetBolts.json
+    python undo.py undo 42
+    python undo.py undo --since 2025-03-01T14:00 --until 2025-03-01T15:30
+"""
+
+import argparse
+import datetime
+import sys
+
+import config
+from app import journal, undo_changes
+from utils.journal import parse_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Undo journaled table edits")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = sub.add_parser("list", help="List journal entries")
+    undo_parser = sub.add_parser("undo", help="Undo entries by id or time range")
+    undo_parser.add_argument("entry", nargs="*", type=int, help="Journal entry ids")
+    for p in (list_parser, undo_parser):
+        p.add_argument("-t", "--table", help="Table file, e.g. ASTORBASE__SetBolts.json")
+        p.add_argument("--since", help="Start time (ISO 8601 or epoch seconds)")
+        p.add_argument("--until", help="End time (ISO 8601 or epoch seconds)")
+    args = parser.parse_args()
+
+    since = parse_time(args.since) if args.since else None
+    until = parse_time(args.until) if args.until else None
+
+    if args.command == "list":
+        for entry in journal.entries(args.table, since, until):
+            when = datetime.datetime.fromtimestamp(entry["ts"]).isoformat(timespec="seconds")
+            counts = {}
+            for op in entry["ops"]:
+                counts[op["op"]] = counts.get(op["op"], 0) + 1
+            note = f" (undo of {entry['undo_of']})" if "undo_of" in entry else ""
+            ops = ", ".join(f"{n} {op}" for op, n in counts.items())
+            print(f"{entry['id']:>6}  {when}  {entry['table']}  {ops}{note}")
+        return
+
+    if config.READ_ONLY:
+        parser.exit(1, "undo.py: READ_ONLY is set in config.py; nothing was changed\n")
+    if not args.entry and since is None:
+        parser.error("give entry ids or --since")
+    results = undo_changes(args.entry, since, until, args.table)
+    for result in results:
+        print(
+            f"Undid entry {result['undone']}: {result['added']} restored, "
+            f"{result['updated']} reverted, {result['removed']} removed"
+        )
+        for conflict in result["conflicts"]:
+            print(
+                f"  skipped {conflict['key']}: row was {conflict['reason']} since",
+                file=sys.stderr,
+            )
+    if not results:
+        print("Nothing to undo")
+
+
+if __name__ == "__main__":
+    main()
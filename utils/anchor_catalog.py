@@ -0,0 +1,138 @@
+"""Faceted search over AnchorsName with bitmap indexes.
+
+Every distinct value of a facet column owns a bitmap (a Python ``int``) with
+bit ``i`` set when row ``i`` of AnchorsName has that value. A selection is
+answered by OR-ing the chosen values within a facet and AND-ing across
+facets; facet counts are popcounts of the intersections.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Sequence
+
+FACETS = ["Standard", "ClassID", "MaterialKey", "Diameter", "SetName"]
+DEFAULT_LIMIT = 100
+
+
+def facet_value(value: Any) -> str:
+    """Normalize a cell or query value to its facet key."""
+    if value is None:
+        return ""
+    text = str(value).strip()
+    try:
+        number = float(text)
+    except ValueError:
+        return text
+    return str(int(number)) if number.is_integer() else str(number)
+
+
+def _bitmap(positions: List[int], size: int) -> int:
+    bits = bytearray((size + 7) // 8)
+    for i in positions:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, "little")
+
+
+def build_anchor_catalog(
+    name_rows: Iterable[Dict[str, Any]],
+    definition_rows: Iterable[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Build bitmaps for every facet value and the AnchorID join index."""
+    rows = list(name_rows)
+    positions: Dict[str, Dict[str, List[int]]] = {f: {} for f in FACETS}
+    for i, row in enumerate(rows):
+        for facet in FACETS:
+            positions[facet].setdefault(facet_value(row.get(facet)), []).append(i)
+    bitmaps = {
+        facet: {key: _bitmap(idx, len(rows)) for key, idx in values.items()}
+        for facet, values in positions.items()
+    }
+
+    definitions: Dict[Any, List[Dict[str, Any]]] = {}
+    for row in definition_rows:
+        definitions.setdefault(row.get("AnchorID"), []).append(row)
+
+    return {
+        "rows": rows,
+        "all": (1 << len(rows)) - 1,
+        "bitmaps": bitmaps,
+        "definitions": definitions,
+    }
+
+
+def _facet_mask(catalog: Dict[str, Any], facet: str, values: Sequence[Any]) -> int:
+    mask = 0
+    bitmaps = catalog["bitmaps"][facet]
+    for value in values:
+        mask |= bitmaps.get(facet_value(value), 0)
+    return mask
+
+
+def select(
+    catalog: Dict[str, Any],
+    selections: Mapping[str, Sequence[Any]],
+    exclude: str = "",
+) -> int:
+    """Return the bitmap of rows matching ``selections``.
+
+    ``exclude`` names a facet whose selection is ignored, which is what the
+    counts for that facet are computed against.
+    """
+    mask = catalog["all"]
+    for facet, values in selections.items():
+        if facet in catalog["bitmaps"] and values and facet != exclude:
+            mask &= _facet_mask(catalog, facet, values)
+    return mask
+
+
+def facet_counts(
+    catalog: Dict[str, Any],
+    selections: Mapping[str, Sequence[Any]],
+) -> Dict[str, Dict[str, int]]:
+    """Return live counts for every facet value under the other selections.
+
+    Values matching no row are left out, except selected ones, which are
+    kept with a count of 0 so they can still be unselected.
+    """
+    counts = {}
+    for facet in FACETS:
+        base = select(catalog, selections, exclude=facet)
+        bitmaps = catalog["bitmaps"][facet]
+        selected = {facet_value(v) for v in selections.get(facet) or ()}
+        counts[facet] = {
+            value: n
+            for value in sorted(bitmaps.keys() | selected)
+            if (n := (bitmaps.get(value, 0) & base).bit_count()) or value in selected
+        }
+    return counts
+
+
+def iter_rows(catalog: Dict[str, Any], mask: int) -> Iterator[Dict[str, Any]]:
+    """Yield AnchorsName rows whose bits are set in ``mask``, in table order."""
+    rows = catalog["rows"]
+    while mask:
+        low = mask & -mask
+        yield rows[low.bit_length() - 1]
+        mask ^= low
+
+
+def browse(
+    catalog: Dict[str, Any],
+    selections: Mapping[str, Sequence[Any]],
+    limit: int = DEFAULT_LIMIT,
+    offset: int = 0,
+) -> Dict[str, Any]:
+    """Return matching anchors with their definitions and facet counts."""
+    mask = select(catalog, selections)
+    anchors = []
+    for i, row in enumerate(iter_rows(catalog, mask)):
+        if i < offset:
+            continue
+        if len(anchors) >= limit:
+            break
+        anchor = dict(row)
+        anchor["definitions"] = catalog["definitions"].get(row.get("ID"), [])
+        anchors.append(anchor)
+    return {
+        "count": mask.bit_count(),
+        "facets": facet_counts(catalog, selections),
+        "anchors": anchors,
+    }
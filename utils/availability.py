@@ -0,0 +1,141 @@
+"""Which bolt lengths exist for a standard, set, grade and diameter.
+
+:class:`AvailabilityCube` nests Standard, then Set, then Material, then
+Diameter, and ends in the sorted lengths of that specification. SetOfBolts
+rows make a specification available; ScrewNew rows add the lengths their
+grip ranges can select (:func:`utils.grip_length.covered_lengths`).
+SetNutsBolts holds the nuts and washers of a set, keyed without Set or
+Length, so it has no place in this hierarchy.
+
+Every level keeps its options as a sorted list that is replaced, never
+changed, when rows come and go, so :meth:`AvailabilityCube.options` is a
+few dictionary lookups and readers need no lock. Each option counts the
+rows behind it, which lets :meth:`AvailabilityCube.add` and
+:meth:`AvailabilityCube.remove` apply single rows without a rebuild.
+"""
+
+import re
+from bisect import insort
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from utils.bolt_sets import set_key
+from utils.grip_length import covered_lengths
+
+LEVELS = ["Standard", "Set", "Material", "Diameter", "Length"]
+TABLES = ["SetOfBolts", "ScrewNew"]
+
+
+def sort_key(value: Any):
+    """Order numbers numerically and text naturally (``8.8`` before ``10.9``)."""
+    if value is None:
+        return (2,)
+    if isinstance(value, (int, float)):
+        return (0, value)
+    parts = re.split(r"(\d+)", str(value).casefold())
+    return (1, tuple((0, int(p), "") if p.isdigit() else (1, 0, p) for p in parts if p))
+
+
+class _Level:
+    """Options of one level, each with the rows behind it."""
+
+    __slots__ = ("counts", "children", "options")
+
+    def __init__(self):
+        self.counts: Dict[Any, int] = {}
+        self.children: Dict[Any, "_Level"] = {}
+        self.options: List[Any] = []
+
+    def change(self, value: Any, delta: int, resort: bool = True) -> None:
+        count = self.counts.get(value, 0) + delta
+        if count > 0:
+            if resort and value not in self.counts:
+                options = list(self.options)
+                insort(options, value, key=sort_key)
+                self.options = options
+            self.counts[value] = count
+        else:
+            self.counts.pop(value, None)
+            self.children.pop(value, None)
+            self.options = [v for v in self.options if v != value]
+
+
+class AvailabilityCube:
+    """Nested availability index over SetOfBolts and ScrewNew rows."""
+
+    def __init__(
+        self,
+        set_rows: Iterable[Mapping[str, Any]] = (),
+        screw_rows: Iterable[Mapping[str, Any]] = (),
+    ):
+        self.root = _Level()
+        self._lock = Lock()
+        for row in set_rows:
+            self._apply("SetOfBolts", row, 1, resort=False)
+        for row in screw_rows:
+            self._apply("ScrewNew", row, 1, resort=False)
+        self._sort(self.root)
+
+    def _sort(self, level: _Level) -> None:
+        level.options = sorted(level.counts, key=sort_key)
+        for child in level.children.values():
+            self._sort(child)
+
+    def _apply(self, table: str, row: Mapping[str, Any], delta: int, resort: bool = True) -> None:
+        path = list(set_key(row.get("Standard"), row.get("Set"), row.get("Material"), row.get("Diameter")))
+        lengths = covered_lengths(dict(row)) if table == "ScrewNew" else []
+        with self._lock:
+            if delta < 0:
+                # Only rows that were counted can be removed.
+                level = self.root
+                for value in path:
+                    if value not in level.counts:
+                        return
+                    level = level.children[value]
+            level = self.root
+            for value in path:
+                level.change(value, delta, resort)
+                child = level.children.get(value)
+                if child is None:
+                    if value not in level.counts:
+                        # The last row below ``value`` is gone.
+                        return
+                    child = level.children[value] = _Level()
+                level = child
+            for length in lengths:
+                level.change(length, delta, resort)
+
+    def add(self, table: str, row: Mapping[str, Any]) -> None:
+        """Count a row inserted into ``table``."""
+        self._apply(table, row, 1)
+
+    def remove(self, table: str, row: Mapping[str, Any]) -> None:
+        """Forget a row deleted from ``table``."""
+        self._apply(table, row, -1)
+
+    def options(self, selection: Sequence[Any] = ()) -> Optional[List[Any]]:
+        """Return the options of the level below ``selection``.
+
+        ``selection`` holds values for the leading levels (Standard, Set,
+        ...); with four values the lengths are returned. Returns ``None``
+        when a selected value is not available.
+        """
+        level = self.root
+        for value in selection:
+            level = level.children.get(value)
+            if level is None:
+                return None
+        return level.options
+
+
+def parse_selection(args: Mapping[str, Any]) -> List[Any]:
+    """Return the leading levels given in ``args``, normalized like the index.
+
+    Stops at the first level without a value.
+    """
+    raw = [args.get(level) for level in LEVELS[:4]]
+    given = 0
+    while given < len(raw) and raw[given] not in (None, ""):
+        given += 1
+    key = set_key(*(raw + [None] * 4)[:4])
+    return list(key[:given])
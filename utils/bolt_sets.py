@@ -0,0 +1,127 @@
+"""Resolve SetOfBolts assemblies into their SetNutsBolts components.
+
+Each SetOfBolts row lists up to six components through repeated column
+groups (``DIN1``/``Diameter1 (mm)``/``Material1``/``Position1`` ...). The
+components themselves live in SetNutsBolts keyed by Standard, Material and
+Diameter.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+COMPONENT_SLOTS = range(1, 7)
+EMPTY_MARKERS = {"", "-"}
+
+ComponentKey = Tuple[str, str, Optional[float]]
+SetKey = Tuple[str, str, str, Optional[float]]
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value).strip()
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def component_key(standard: Any, material: Any, diameter: Any) -> ComponentKey:
+    """Return the normalized SetNutsBolts lookup key."""
+    return (_text(standard), _text(material), _number(diameter))
+
+
+def set_key(standard: Any, set_name: Any, material: Any, diameter: Any) -> SetKey:
+    """Return the normalized SetOfBolts lookup key."""
+    return (_text(standard), _text(set_name), _text(material), _number(diameter))
+
+
+def build_component_index(
+    rows: Iterable[Dict[str, Any]],
+) -> Dict[ComponentKey, Dict[str, Any]]:
+    """Index SetNutsBolts rows by (Standard, Material, Diameter)."""
+    return {
+        component_key(r.get("Standard"), r.get("Material"), r.get("Diameter")): r
+        for r in rows
+    }
+
+
+def iter_slots(row: Dict[str, Any]):
+    """Yield ``(position, standard, material, diameter)`` for filled slots.
+
+    Both the SetOfBolts (``Diameter1 (mm)``) and AnchorsName (``Diameter1``)
+    spellings of the diameter column are accepted.
+    """
+    for n in COMPONENT_SLOTS:
+        standard = _text(row.get(f"DIN{n}"))
+        if standard in EMPTY_MARKERS:
+            continue
+        diameter = row.get(f"Diameter{n} (mm)", row.get(f"Diameter{n}"))
+        yield row.get(f"Position{n}"), standard, _text(row.get(f"Material{n}")), diameter
+
+
+def resolve_set(
+    row: Dict[str, Any],
+    component_index: Dict[ComponentKey, Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Expand a SetOfBolts row into resolved and unresolved components."""
+    components = []
+    unresolved = []
+    weight = 0.0
+    for position, standard, material, diameter in iter_slots(row):
+        part = {
+            "Position": position,
+            "Standard": standard,
+            "Material": material,
+            "Diameter": _number(diameter),
+        }
+        match = component_index.get(component_key(standard, material, diameter))
+        if match is None:
+            unresolved.append(part)
+            continue
+        part.update(
+            Name=match.get("Name"),
+            Type=match.get("Type"),
+            Weight=match.get("Weight"),
+        )
+        weight += _number(match.get("Weight")) or 0.0
+        components.append(part)
+    return {
+        "Standard": row.get("Standard"),
+        "Set": row.get("Set"),
+        "Material": row.get("Material"),
+        "Diameter": row.get("Diameter"),
+        "OwnerText": row.get("OwnerText"),
+        "components": components,
+        "unresolved": unresolved,
+        "weight": round(weight, 6),
+    }
+
+
+def build_set_index(
+    set_rows: Iterable[Dict[str, Any]],
+    component_rows: Iterable[Dict[str, Any]],
+) -> Dict[SetKey, Dict[str, Any]]:
+    """Resolve every SetOfBolts row and index the result by set key."""
+    component_index = build_component_index(component_rows)
+    index = {}
+    for row in set_rows:
+        key = set_key(row.get("Standard"), row.get("Set"), row.get("Material"), row.get("Diameter"))
+        index[key] = resolve_set(row, component_index)
+    return index
+
+
+def lookup_set(
+    index: Dict[SetKey, Dict[str, Any]],
+    standard: Any,
+    set_name: Any,
+    material: Any,
+    diameter: Any,
+) -> Optional[Dict[str, Any]]:
+    """Return the resolved set for the given key or ``None``."""
+    return index.get(set_key(standard, set_name, material, diameter))
+
+
+def unresolved_sets(index: Dict[SetKey, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Return resolved sets that reference at least one missing component."""
+    return [s for s in index.values() if s["unresolved"]]
@@ -0,0 +1,75 @@
+"""Preloaded, read-only copies of the catalog tables.
+
+The production server (``serve.py``) loads the tables behind the lookup
+routes once, before forking its workers. Rows are stored as tuples sharing
+one :class:`utils.rows.Header` per table, which keeps the copy compact and
+means workers only read the pages, so they stay shared copy-on-write.
+
+Each table remembers the write counter (:mod:`utils.table_cache`) it was
+loaded at; once the table is written, its preloaded copy is ignored and rows
+come from SQL again until the catalog is reloaded.
+"""
+
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from config import DEFAULT_DATABASE
+from utils.rows import Header, Row, make_rows
+from utils.table_cache import table_version
+
+CATALOG_TABLES = [
+    f"{DEFAULT_DATABASE}__{table}.json"
+    for table in (
+        "SetBolts",
+        "SetOfBolts",
+        "SetNutsBolts",
+        "ScrewNew",
+        "AnchorsName",
+        "AnchorsDefinition",
+        "BoltsDistances",
+        "ConnectorDistances",
+    )
+]
+
+# filename -> (version, header, rows)
+_tables: Dict[str, Tuple[int, Header, Tuple[Tuple[Any, ...], ...]]] = {}
+
+
+def freeze_rows(rows: Sequence[Mapping[str, Any]]) -> Tuple[Header, Tuple[Tuple[Any, ...], ...]]:
+    """Return ``(header, rows)`` with every row as a tuple in column order."""
+    if not rows:
+        return Header(()), ()
+    header = Header(rows[0].keys())
+    return header, tuple(tuple(row.get(c) for c in header.columns) for row in rows)
+
+
+def preload(
+    tables: Sequence[str],
+    loader: Callable[[str], List[Dict[str, Any]]],
+) -> None:
+    """Load ``tables`` with ``loader`` and keep frozen copies."""
+    for filename in tables:
+        header, rows = freeze_rows(loader(filename))
+        _tables[filename] = (table_version(filename), header, rows)
+
+
+def get_rows(filename: str) -> Optional[List[Row]]:
+    """Return the rows of a preloaded table, wrapping the stored tuples.
+
+    Returns ``None`` when the table was not preloaded or has been written
+    since, in which case the caller loads it from SQL.
+    """
+    entry = _tables.get(filename)
+    if entry is None or entry[0] != table_version(filename):
+        return None
+    _, header, rows = entry
+    return make_rows(header, rows)
+
+
+def loaded_tables() -> List[str]:
+    """Return the preloaded tables that are still current."""
+    return [f for f, entry in _tables.items() if entry[0] == table_version(f)]
+
+
+def clear() -> None:
+    """Drop every preloaded table."""
+    _tables.clear()
@@ -0,0 +1,197 @@
+"""Detect table changes made outside the app and push them to browsers.
+
+Advance Steel's Management Tools write to AstorBase directly, so the write
+counters in :mod:`utils.table_cache` would never hear about those edits. A
+:class:`ChangeWatcher` thread polls a cheap change signal and bumps the
+version of every table that changed, which invalidates the lookup caches and
+ETags. The preferred signal is ``last_user_update`` from
+``sys.dm_db_index_usage_stats``, which is per table. Without ``VIEW SERVER
+STATE`` permission the watcher falls back to the modification time of
+``AstorBase.mdf`` and bumps every table when it moves. Writes through the
+app move the same signals; a table whose version already moved since the
+previous poll is not bumped again.
+
+Every version bump, whether from the watcher or a write through the app, is
+also published to the queues handed out by :func:`subscribe`, which the
+``/events`` Server-Sent Events stream reads from.
+"""
+
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.table_cache import add_listener, bump_version, sync_versions, table_versions
+
+INDEX_USAGE_SQL = (
+    "SELECT OBJECT_NAME(object_id), MAX(last_user_update) "
+    "FROM sys.dm_db_index_usage_stats "
+    "WHERE database_id = DB_ID() GROUP BY object_id"
+)
+TABLES_SQL = (
+    "SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_TYPE='BASE TABLE'"
+)
+MAX_QUEUED = 100
+
+_subscribers: List["queue.Queue[Tuple[str, int]]"] = []
+_subscribers_lock = threading.Lock()
+
+
+def subscribe() -> "queue.Queue[Tuple[str, int]]":
+    """Return a queue receiving ``(table, version)`` for every bump."""
+    q: "queue.Queue[Tuple[str, int]]" = queue.Queue(MAX_QUEUED)
+    with _subscribers_lock:
+        _subscribers.append(q)
+    return q
+
+
+def unsubscribe(q: "queue.Queue[Tuple[str, int]]") -> None:
+    with _subscribers_lock:
+        if q in _subscribers:
+            _subscribers.remove(q)
+
+
+def publish(table: str, version: int) -> None:
+    """Hand a version bump to every subscriber without blocking."""
+    with _subscribers_lock:
+        subscribers = list(_subscribers)
+    for q in subscribers:
+        try:
+            q.put_nowait((table, version))
+        except queue.Full:
+            # A stalled client only misses events; its next page load is fresh.
+            pass
+
+
+add_listener(publish)
+
+
+def changed_tables(
+    previous: Dict[str, Any],
+    current: Dict[str, Any],
+) -> List[str]:
+    """Return tables whose change signal moved between two polls.
+
+    Signals that disappear or reset to ``None`` (statistics are cleared when
+    the LocalDB instance restarts) are not treated as changes.
+    """
+    return sorted(
+        table
+        for table, stamp in current.items()
+        if stamp is not None and previous.get(table) != stamp
+    )
+
+
+class ChangeWatcher:
+    """Poll change signals of one database on a background thread.
+
+    Parameters
+    ----------
+    connect:
+        Returns ``(conn, cursor)`` for the watched database.
+    database:
+        Prefix of the table filenames whose versions are bumped.
+    mdf_path:
+        Data file whose modification time is used when the index usage
+        statistics cannot be read.
+    interval:
+        Seconds between polls.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Tuple[Any, Any]],
+        database: str,
+        mdf_path: Optional[Path] = None,
+        interval: float = 2.0,
+    ):
+        self.connect = connect
+        self.database = database
+        self.mdf_path = mdf_path
+        self.interval = interval
+        self._conn = None
+        self._cur = None
+        self._signals: Optional[Dict[str, Any]] = None
+        # Table versions right after the previous poll.
+        self._versions: Dict[str, int] = {}
+        self._use_mtime = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def filename(self, table: str) -> str:
+        return f"{self.database}__{table}.json"
+
+    def _cursor(self):
+        if self._cur is None:
+            self._conn, self._cur = self.connect()
+        return self._cur
+
+    def _read_signals(self) -> Dict[str, Any]:
+        if not self._use_mtime:
+            try:
+                cur = self._cursor()
+                cur.execute(INDEX_USAGE_SQL)
+                return {name: stamp for name, stamp in cur.fetchall() if name}
+            except Exception as e:
+                if "permission" not in str(e).lower() or self.mdf_path is None:
+                    raise
+                self._use_mtime = True
+        return {"*": self.mdf_path.stat().st_mtime}
+
+    def _all_tables(self) -> List[str]:
+        cur = self._cursor()
+        cur.execute(TABLES_SQL)
+        return [row[0] for row in cur.fetchall()]
+
+    def poll(self) -> List[str]:
+        """Read the signals once and bump tables that changed.
+
+        The first poll only records the baseline. Tables written through
+        the app since the previous poll already had their version bumped and
+        are skipped. Returns the filenames whose versions were bumped.
+        """
+        try:
+            signals = self._read_signals()
+            tables = []
+            if self._signals is not None:
+                tables = changed_tables(self._signals, signals)
+            if tables == ["*"]:
+                tables = self._all_tables()
+        except Exception:
+            # Keep the old baseline so the change is seen on the next poll.
+            self.close()
+            return []
+        self._signals = signals
+        # Writes from other worker processes arrive through the shared file.
+        sync_versions()
+        current = table_versions()
+        filenames = [
+            f for f in (self.filename(t) for t in tables)
+            if current.get(f, 0) == self._versions.get(f, 0)
+        ]
+        for filename in filenames:
+            bump_version(filename)
+        self._versions = table_versions()
+        return filenames
+
+    def run(self) -> None:
+        while not self._stop.is_set():
+            self.poll()
+            self._stop.wait(self.interval)
+        self.close()
+
+    def start(self) -> "ChangeWatcher":
+        self._thread = threading.Thread(target=self.run, name="change-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn = self._cur = None
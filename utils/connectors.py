@@ -0,0 +1,131 @@
+"""Shear connector specifications joined across the Connector tables.
+
+ConnectorRelations only names a standard, material and diameter per stud.
+:func:`build_connector_catalog` joins each relation with ConnectorStandard,
+ConnectorMaterial, ConnectorDiameters and ConnectorDistances once, through
+dictionaries keyed like the relation columns, so a lookup is a single hash
+probe returning the full spec with its spacing rows attached. Relations
+whose keys have no matching entry are kept and listed by
+:func:`verify_connectors`.
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from utils.distances import KEY_PRECISION
+
+TABLES = [
+    "ConnectorRelations",
+    "ConnectorStandard",
+    "ConnectorMaterial",
+    "ConnectorDiameters",
+    "ConnectorDistances",
+]
+
+ConnectorKey = Tuple[str, str, Optional[float]]
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value).strip()
+
+
+def _diameter(value: Any) -> Optional[float]:
+    try:
+        return round(float(value), KEY_PRECISION)
+    except (TypeError, ValueError):
+        return None
+
+
+def connector_key(standard: Any, material: Any, diameter: Any) -> ConnectorKey:
+    """Return the normalized (standard, material, diameter) lookup key."""
+    return (_text(standard), _text(material), _diameter(diameter))
+
+
+def build_connector_catalog(
+    relations: Iterable[Mapping[str, Any]],
+    standards: Iterable[Mapping[str, Any]],
+    materials: Iterable[Mapping[str, Any]],
+    diameters: Iterable[Mapping[str, Any]],
+    distances: Iterable[Mapping[str, Any]],
+) -> Dict[str, Any]:
+    """Join the connector tables into one spec per relation.
+
+    Returns ``{"specs": {key: spec}, "problems": [...]}``. Each spec holds
+    the relation columns, ``Standard``, ``Material`` and ``Diameter`` (the
+    joined rows, or ``None`` when missing) and ``Distances``, the
+    ConnectorDistances rows of its diameter sorted by hole tolerance.
+    """
+    standard_rows = {_text(r.get("Key")): dict(r) for r in standards}
+    material_rows = {_text(r.get("Key")): dict(r) for r in materials}
+    diameter_rows = {_diameter(r.get("Key")): dict(r) for r in diameters}
+    distance_rows: Dict[Optional[float], List[Dict[str, Any]]] = {}
+    for row in distances:
+        distance_rows.setdefault(_diameter(row.get("Key")), []).append({
+            "HoleTolerance": row.get("HoleTolerance"),
+            "along": row.get("along"),
+            "across": row.get("across"),
+        })
+    for rows in distance_rows.values():
+        rows.sort(key=lambda r: r["HoleTolerance"] or 0)
+
+    specs: Dict[ConnectorKey, Dict[str, Any]] = {}
+    problems = []
+    for relation in relations:
+        key = connector_key(
+            relation.get("ConnectorStandard"),
+            relation.get("ConnectorMaterial"),
+            relation.get("ConnectorDiameter"),
+        )
+        spec = dict(relation)
+        spec["Standard"] = standard_rows.get(key[0])
+        spec["Material"] = material_rows.get(key[1])
+        spec["Diameter"] = diameter_rows.get(key[2])
+        spec["Distances"] = distance_rows.get(key[2], [])
+
+        missing = [
+            table
+            for table, found in (
+                ("ConnectorStandard", spec["Standard"]),
+                ("ConnectorMaterial", spec["Material"]),
+                ("ConnectorDiameters", spec["Diameter"]),
+                ("ConnectorDistances", spec["Distances"]),
+            )
+            if not found
+        ]
+        if key in specs:
+            missing.append("duplicate")
+        if missing:
+            problems.append({"Key": relation.get("Key"), "relation": list(key), "missing": missing})
+        specs.setdefault(key, spec)
+    return {"specs": specs, "problems": problems}
+
+
+def lookup_connector(
+    catalog: Dict[str, Any],
+    standard: Any,
+    material: Any,
+    diameter: Any,
+) -> Optional[Dict[str, Any]]:
+    """Return the joined spec of one connector, or ``None``."""
+    return catalog["specs"].get(connector_key(standard, material, diameter))
+
+
+def lookup_connectors(
+    catalog: Dict[str, Any],
+    requests: Iterable[Mapping[str, Any]],
+) -> List[Optional[Dict[str, Any]]]:
+    """Resolve many ``{"Standard", "Material", "Diameter"}`` requests."""
+    return [
+        lookup_connector(catalog, r.get("Standard"), r.get("Material"), r.get("Diameter"))
+        if isinstance(r, Mapping) else None
+        for r in requests
+    ]
+
+
+def verify_connectors(catalog: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Return the relation rows pointing at missing entries.
+
+    Each problem names the relation ``Key``, its normalized ``relation``
+    key and the tables lacking a matching entry. ``duplicate`` marks a
+    relation repeating an earlier one.
+    """
+    return catalog["problems"]
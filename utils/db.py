@@ -1,19 +1,32 @@
-# utils/db.py
-"""Helper for connecting to the configured SQL Server."""
+"""Helper for connecting to the configured SQL Server.
 
-import pyodbc
-from typing import Tuple
+``pyodbc`` is imported on the first connection so tools and tests that never
+reach SQL Server start quickly and work without the ODBC driver installed.
+"""
 
-from config import DB_CONFIG, DEFAULT_DATABASE
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from config import DB_CONFIG, DEFAULT_DATABASE, validate_config
+
+if TYPE_CHECKING:
+    import pyodbc
 
 
 def connect_sql_server(
     database: str = DEFAULT_DATABASE,
-) -> Tuple[pyodbc.Connection, pyodbc.Cursor]:
-    """Return a connection and cursor to the configured SQL Server."""
+    server: Optional[str] = None,
+) -> Tuple["pyodbc.Connection", "pyodbc.Cursor"]:
+    """Return a connection and cursor to the configured SQL Server.
+
+    ``server`` overrides ``DB_CONFIG['server']``, e.g. to reach the LocalDB
+    instance of another Advance Steel version.
+    """
+    import pyodbc
+
+    validate_config()
     conn_str = (
         f"DRIVER={{{DB_CONFIG['driver']}}};"
-        f"SERVER={DB_CONFIG['server']};"
+        f"SERVER={server or DB_CONFIG['server']};"
         f"Trusted_Connection={DB_CONFIG['trusted_connection']};"
     )
     conn = pyodbc.connect(conn_str, autocommit=True)
@@ -0,0 +1,124 @@
+"""Minimum edge and pitch distance lookups.
+
+BoltsDistances and ConnectorDistances hold the minimum ``along`` and
+``across`` distances per diameter and hole tolerance. Each table is loaded
+into parallel sorted arrays so point and batch queries are answered with
+binary search instead of scanning rows.
+"""
+
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# URL name -> (table, diameter column)
+DISTANCE_TABLES = {
+    "bolts": ("BoltsDistances", "Diameter"),
+    "connectors": ("ConnectorDistances", "Key"),
+}
+RULES = ("exact", "nearest")
+KEY_PRECISION = 4
+
+
+def build_distance_table(
+    rows: Iterable[Dict[str, Any]],
+    diameter_field: str = "Diameter",
+) -> Dict[str, Any]:
+    """Return sorted lookup arrays for a distances table.
+
+    ``diameters`` holds each distinct diameter once; rows for
+    ``diameters[i]`` occupy ``offsets[i]:offsets[i + 1]`` of the
+    ``tolerances``/``along``/``across`` arrays, sorted by tolerance.
+    """
+    entries = []
+    for row in rows:
+        try:
+            diameter = round(float(row[diameter_field]), KEY_PRECISION)
+            tolerance = round(float(row.get("HoleTolerance") or 0), KEY_PRECISION)
+        except (KeyError, TypeError, ValueError):
+            continue
+        entries.append((diameter, tolerance, row.get("along"), row.get("across")))
+    entries.sort(key=lambda e: (e[0], e[1]))
+
+    table = {
+        "diameters": array("d"),
+        "offsets": array("l"),
+        "tolerances": array("d"),
+        "along": [],
+        "across": [],
+    }
+    for diameter, tolerance, along, across in entries:
+        if not table["diameters"] or table["diameters"][-1] != diameter:
+            table["diameters"].append(diameter)
+            table["offsets"].append(len(table["tolerances"]))
+        table["tolerances"].append(tolerance)
+        table["along"].append(along)
+        table["across"].append(across)
+    table["offsets"].append(len(table["tolerances"]))
+    return table
+
+
+def _result(table: Dict[str, Any], group: int, pos: int) -> Dict[str, Any]:
+    return {
+        "Diameter": table["diameters"][group],
+        "HoleTolerance": table["tolerances"][pos],
+        "along": table["along"][pos],
+        "across": table["across"][pos],
+    }
+
+
+def lookup_distance(
+    table: Dict[str, Any],
+    diameter: float,
+    tolerance: float = 0.0,
+    rule: str = "exact",
+) -> Optional[Dict[str, Any]]:
+    """Return the distances for one diameter and hole tolerance.
+
+    Parameters
+    ----------
+    rule:
+        ``"exact"`` requires both values to exist in the table.
+        ``"nearest"`` returns the smallest diameter at or above ``diameter``
+        that has a tolerance at or above ``tolerance``.
+    """
+    if rule not in RULES:
+        raise ValueError(f"Unknown rule: {rule}. Expected one of {RULES}")
+    diameter = round(float(diameter), KEY_PRECISION)
+    tolerance = round(float(tolerance), KEY_PRECISION)
+    diameters = table["diameters"]
+    offsets = table["offsets"]
+    tolerances = table["tolerances"]
+    result = None
+    group = bisect_left(diameters, diameter)
+    while group < len(diameters):
+        if rule == "exact" and diameters[group] != diameter:
+            break
+        start, end = offsets[group], offsets[group + 1]
+        pos = bisect_left(tolerances, tolerance, start, end)
+        if pos < end and (rule == "nearest" or tolerances[pos] == tolerance):
+            result = _result(table, group, pos)
+            break
+        if rule == "exact":
+            break
+        group += 1
+    return result
+
+
+def lookup_distances(
+    table: Dict[str, Any],
+    diameters: Sequence[float],
+    tolerances: Sequence[float],
+    rule: str = "exact",
+) -> List[Optional[Dict[str, Any]]]:
+    """Answer a batch of queries.
+
+    A single tolerance is applied to every diameter; otherwise both
+    sequences must have the same length.
+    """
+    if len(tolerances) == 1:
+        tolerances = list(tolerances) * len(diameters)
+    if len(tolerances) != len(diameters):
+        raise ValueError("diameters and tolerances must have the same length")
+    return [
+        lookup_distance(table, d, t, rule) for d, t in zip(diameters, tolerances)
+    ]
@@ -0,0 +1,182 @@
+"""Find duplicated rows in the fastener libraries.
+
+Rows cloned over the years end up as exact or near-exact copies. Rows are
+compared on their defining columns, i.e. everything except bookkeeping
+columns such as ``ID``, ``OwnerText`` and ``Source``.
+
+* Exact duplicates share a hash of their normalized values (numbers compared
+  as floats, so ``12`` equals ``12.0``) and are grouped in one pass.
+* Near duplicates also ignore case and whitespace in text and accept
+  differences up to a tolerance on numeric columns such as ``Diameter`` and
+  ``Length``. Each distinct row is placed in a block keyed by its normalized
+  text and its tolerance columns cut into buckets one tolerance wide, and
+  is only compared with rows in the same or adjacent buckets, so no pairs
+  across the whole table are compared.
+
+Clusters list every member's ``OwnerText``, and clusters mixing stock and
+custom rows are reported first.
+"""
+
+import hashlib
+import math
+from itertools import product
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from utils.row_keys import is_custom, natural_key
+
+IGNORED_COLUMNS = {"ID", "OwnerText", "Source"}
+# Largest difference, in the table's units (mm), at which values still match.
+TOLERANCES = {"Diameter": 0.05, "Length": 0.05}
+LIBRARY_TABLES = ["SetOfBolts", "ScrewNew", "SetNutsBolts"]
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _exact(value: Any) -> Any:
+    if _is_number(value):
+        return round(float(value), 9)
+    return value
+
+
+def _loose(value: Any) -> Any:
+    if isinstance(value, str):
+        return "".join(value.split()).casefold()
+    return _exact(value)
+
+
+def defining_columns(columns: Sequence[str]) -> List[str]:
+    """Return the columns that define what a row describes."""
+    return [c for c in columns if c not in IGNORED_COLUMNS]
+
+
+def row_hash(row: Mapping[str, Any], columns: Sequence[str]) -> bytes:
+    """Return a hash of ``row``'s normalized values over ``columns``."""
+    payload = repr(tuple(_exact(row.get(c)) for c in columns)).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+def _find(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _near_parts(
+    row: Mapping[str, Any],
+    columns: Sequence[str],
+    tolerances: Mapping[str, float],
+) -> Tuple[Tuple[Any, ...], List[Optional[float]]]:
+    """Split a row into its blocking key and its tolerance column values."""
+    base = tuple(_loose(row.get(c)) for c in columns if c not in tolerances)
+    values = []
+    for c in tolerances:
+        value = row.get(c)
+        values.append(float(value) if _is_number(value) else None)
+    return base, values
+
+
+def _within(a: List[Optional[float]], b: List[Optional[float]], tols: Sequence[float]) -> bool:
+    for x, y, tol in zip(a, b, tols):
+        if x is None or y is None:
+            if x is not y:
+                return False
+        elif abs(x - y) > tol + 1e-9:
+            return False
+    return True
+
+
+def find_duplicates(
+    rows: Sequence[Mapping[str, Any]],
+    columns: Optional[Sequence[str]] = None,
+    tolerances: Mapping[str, float] = TOLERANCES,
+) -> Dict[str, List[List[int]]]:
+    """Return the indexes of exact and near duplicate rows.
+
+    ``exact`` lists groups of rows with identical defining values; ``near``
+    lists clusters joining at least two such groups whose values differ only
+    by case, whitespace or within ``tolerances``. Indexes refer to ``rows``.
+    """
+    if not rows:
+        return {"exact": [], "near": []}
+    if columns is None:
+        columns = defining_columns(list(rows[0].keys()))
+    tolerances = {c: t for c, t in tolerances.items() if c in columns and t > 0}
+    tols = list(tolerances.values())
+
+    groups: Dict[bytes, List[int]] = {}
+    for i, row in enumerate(rows):
+        groups.setdefault(row_hash(row, columns), []).append(i)
+    members = list(groups.values())
+
+    parent = list(range(len(members)))
+    blocks: Dict[Tuple[Any, ...], List[Tuple[int, List[Optional[float]]]]] = {}
+    for g, indexes in enumerate(members):
+        base, values = _near_parts(rows[indexes[0]], columns, tolerances)
+        buckets = [None if v is None else math.floor(v / t) for v, t in zip(values, tols)]
+        for offsets in product((-1, 0, 1), repeat=len(tols)):
+            if any(o and b is None for o, b in zip(offsets, buckets)):
+                continue
+            near = tuple(b if b is None else b + o for b, o in zip(buckets, offsets))
+            for other, other_values in blocks.get((base, near), ()):
+                if _within(values, other_values, tols):
+                    parent[_find(parent, g)] = _find(parent, other)
+        blocks.setdefault((base, tuple(buckets)), []).append((g, values))
+
+    clusters: Dict[int, List[int]] = {}
+    for g in range(len(members)):
+        clusters.setdefault(_find(parent, g), []).append(g)
+    return {
+        "exact": [indexes for indexes in members if len(indexes) > 1],
+        "near": [
+            sorted(i for g in gs for i in members[g])
+            for gs in clusters.values()
+            if len(gs) > 1
+        ],
+    }
+
+
+def _describe(
+    rows: Sequence[Mapping[str, Any]],
+    indexes: Iterable[int],
+    key: Sequence[str],
+) -> Dict[str, Any]:
+    members = [rows[i] for i in indexes]
+    owners = sorted({str(r.get("OwnerText")) for r in members})
+    custom = [is_custom(r) for r in members]
+    return {
+        "size": len(members),
+        "owners": owners,
+        "mixed": any(custom) and not all(custom),
+        "rows": [
+            dict({c: r.get(c) for c in key}, index=i, OwnerText=r.get("OwnerText"),
+                 Source=r.get("Source"))
+            for i, r in zip(indexes, members)
+        ],
+    }
+
+
+def analyze_table(
+    table: str,
+    rows: Sequence[Mapping[str, Any]],
+    tolerances: Mapping[str, float] = TOLERANCES,
+) -> Dict[str, Any]:
+    """Return the duplicate clusters of ``table`` with their owners.
+
+    Clusters mixing stock and custom rows come first, then larger ones.
+    """
+    found = find_duplicates(rows, tolerances=tolerances)
+    key = natural_key(table, list(rows[0].keys())) if rows else []
+
+    def report(clusters):
+        described = [_describe(rows, c, key) for c in clusters]
+        return sorted(described, key=lambda c: (not c["mixed"], -c["size"]))
+
+    return {
+        "table": table,
+        "rows": len(rows),
+        "exact": report(found["exact"]),
+        "near": report(found["near"]),
+    }
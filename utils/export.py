@@ -0,0 +1,360 @@
+"""Write query results as CSV, Parquet, Arrow IPC or XLSX.
+
+Column types come from the table schema (:mod:`utils.schema`) or, failing
+that, from the Python types in ``cursor.description``, so numbers, booleans,
+dates and nulls survive the export instead of becoming text. Rows are
+written batch by batch as they are fetched, and :func:`iter_export` hands
+out the encoded bytes after every batch, so neither the rows nor the file
+are ever held in memory whole.
+
+Parquet and Arrow IPC need the optional ``pyarrow`` package. XLSX is written
+with the standard library: the sheet is streamed into the zip archive with
+inline strings, so no shared string table has to be collected first.
+"""
+
+import csv
+import datetime
+import decimal
+import io
+import zipfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+try:  # optional, needed for Parquet and Arrow IPC
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - depends on the environment
+    pyarrow = None
+
+FETCH_SIZE = 5000
+PARQUET_COMPRESSION = "zstd"
+
+# (name, kind); kind is one of the keys of ARROW_TYPES
+Columns = List[Tuple[str, str]]
+
+SQL_KINDS = {
+    "bit": "bool",
+    "tinyint": "int", "smallint": "int", "int": "int", "bigint": "int",
+    "float": "float", "real": "float",
+    "decimal": "float", "numeric": "float", "money": "float", "smallmoney": "float",
+    "date": "date",
+    "datetime": "datetime", "datetime2": "datetime", "smalldatetime": "datetime",
+    "binary": "binary", "varbinary": "binary", "image": "binary",
+}
+PYTHON_KINDS = [
+    (bool, "bool"),
+    (int, "int"),
+    ((float, decimal.Decimal), "float"),
+    (datetime.datetime, "datetime"),
+    (datetime.date, "date"),
+    ((bytes, bytearray), "binary"),
+]
+
+
+def column_kinds(
+    description: Sequence[Sequence[Any]],
+    sql_types: Optional[Dict[str, str]] = None,
+) -> Columns:
+    """Return ``(name, kind)`` for each column of a result set.
+
+    ``sql_types`` maps column names to SQL Server type names; columns not in
+    it fall back to the Python type pyodbc reports in the description.
+    """
+    columns = []
+    for col in description:
+        name = col[0]
+        sql_type = (sql_types or {}).get(name)
+        if sql_type is not None:
+            kind = SQL_KINDS.get(sql_type.lower(), "text")
+        else:
+            type_code = col[1] if len(col) > 1 else None
+            kind = "text"
+            for types, candidate in PYTHON_KINDS:
+                if isinstance(type_code, type) and issubclass(type_code, types):
+                    kind = candidate
+                    break
+        columns.append((name, kind))
+    return columns
+
+
+def iter_batches(cursor, size: int = FETCH_SIZE) -> Iterator[List[Sequence[Any]]]:
+    """Yield the rows of the cursor's result set ``size`` at a time."""
+    while True:
+        batch = cursor.fetchmany(size)
+        if not batch:
+            return
+        yield batch
+
+
+class _Buffer(io.RawIOBase):
+    """Write-only stream whose contents are collected with :meth:`take`."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class CsvWriter:
+    def __init__(self, sink, columns: Columns):
+        self.text = io.TextIOWrapper(sink, encoding="utf-8", newline="", write_through=True)
+        self.writer = csv.writer(self.text)
+        self.writer.writerow([name for name, _ in columns])
+
+    def write_batch(self, rows: Sequence[Sequence[Any]]) -> None:
+        self.writer.writerows(rows)
+
+    def close(self) -> None:
+        self.text.flush()
+        self.text.detach()
+
+
+def _arrow_schema(columns: Columns):
+    types = {
+        "bool": pyarrow.bool_(),
+        "int": pyarrow.int64(),
+        "float": pyarrow.float64(),
+        "date": pyarrow.date32(),
+        "datetime": pyarrow.timestamp("ms"),
+        "binary": pyarrow.binary(),
+        "text": pyarrow.string(),
+    }
+    return pyarrow.schema([(name, types[kind]) for name, kind in columns])
+
+
+def _arrow_batch(schema, columns: Columns, rows: Sequence[Sequence[Any]]):
+    arrays = []
+    for i, ((_, kind), field) in enumerate(zip(columns, schema)):
+        values = [row[i] for row in rows]
+        if kind == "float":
+            values = [None if v is None else float(v) for v in values]
+        elif kind == "text":
+            values = [None if v is None else str(v) for v in values]
+        arrays.append(pyarrow.array(values, type=field.type))
+    return pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class ParquetWriter:
+    def __init__(self, sink, columns: Columns):
+        self.columns = columns
+        self.schema = _arrow_schema(columns)
+        self.writer = pyarrow.parquet.ParquetWriter(
+            sink, self.schema, compression=PARQUET_COMPRESSION
+        )
+
+    def write_batch(self, rows: Sequence[Sequence[Any]]) -> None:
+        # One row group per batch keeps memory bounded by the fetch size.
+        self.writer.write_batch(_arrow_batch(self.schema, self.columns, rows))
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class ArrowWriter:
+    def __init__(self, sink, columns: Columns):
+        self.columns = columns
+        self.schema = _arrow_schema(columns)
+        self.writer = pyarrow.ipc.new_file(sink, self.schema)
+
+    def write_batch(self, rows: Sequence[Sequence[Any]]) -> None:
+        self.writer.write_batch(_arrow_batch(self.schema, self.columns, rows))
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+# Style 1 formats dates, style 2 date-times (built-in number formats 14 and 22).
+XLSX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="22" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+EXCEL_EPOCH = datetime.datetime(1899, 12, 30)
+# Characters XML 1.0 cannot carry.
+_XML_ILLEGAL = {c: None for c in range(32) if c not in (9, 10, 13)}
+
+
+def _column_letter(index: int) -> str:
+    letters = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _text_cell(ref: str, value: Any) -> str:
+    text = escape(str(value).translate(_XML_ILLEGAL))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+class XlsxWriter:
+    """Single-sheet workbook streamed into a zip archive."""
+
+    def __init__(self, sink, columns: Columns, sheet_name: str = "Sheet1"):
+        self.columns = columns
+        self.letters = [_column_letter(i) for i in range(len(columns))]
+        self.row_number = 1
+        self.zip = zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED)
+        self.zip.writestr("[Content_Types].xml", XLSX_CONTENT_TYPES)
+        self.zip.writestr("_rels/.rels", XLSX_ROOT_RELS)
+        self.zip.writestr("xl/_rels/workbook.xml.rels", XLSX_WORKBOOK_RELS)
+        self.zip.writestr("xl/styles.xml", XLSX_STYLES)
+        self.zip.writestr(
+            "xl/workbook.xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{escape(sheet_name[:31])}" sheetId="1" r:id="rId1"/></sheets>'
+            '</workbook>',
+        )
+        self.sheet = self.zip.open("xl/worksheets/sheet1.xml", "w", force_zip64=True)
+        self.sheet.write(
+            b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            b'<sheetData>'
+        )
+        header = "".join(
+            _text_cell(f"{letter}1", name) for letter, (name, _) in zip(self.letters, columns)
+        )
+        self.sheet.write(f'<row r="1">{header}</row>'.encode("utf-8"))
+
+    def _cell(self, ref: str, kind: str, value: Any) -> str:
+        if value is None:
+            return ""
+        if isinstance(value, bool) or kind == "bool":
+            return f'<c r="{ref}" t="b"><v>{int(bool(value))}</v></c>'
+        if isinstance(value, datetime.datetime):
+            serial = (value.replace(tzinfo=None) - EXCEL_EPOCH).total_seconds() / 86400
+            return f'<c r="{ref}" s="2"><v>{serial!r}</v></c>'
+        if isinstance(value, datetime.date):
+            serial = (datetime.datetime.combine(value, datetime.time()) - EXCEL_EPOCH).days
+            return f'<c r="{ref}" s="1"><v>{serial}</v></c>'
+        if isinstance(value, (int, float, decimal.Decimal)):
+            return f'<c r="{ref}"><v>{value}</v></c>'
+        return _text_cell(ref, value)
+
+    def write_batch(self, rows: Sequence[Sequence[Any]]) -> None:
+        parts = []
+        for row in rows:
+            self.row_number += 1
+            n = self.row_number
+            cells = "".join(
+                self._cell(f"{letter}{n}", kind, value)
+                for letter, (_, kind), value in zip(self.letters, self.columns, row)
+            )
+            parts.append(f'<row r="{n}">{cells}</row>')
+        self.sheet.write("".join(parts).encode("utf-8"))
+
+    def close(self) -> None:
+        self.sheet.write(b"</sheetData></worksheet>")
+        self.sheet.close()
+        self.zip.close()
+
+
+# format -> (writer, file extension, mimetype, needs pyarrow)
+FORMATS: Dict[str, Tuple[Any, str, str, bool]] = {
+    "csv": (CsvWriter, "csv", "text/csv", False),
+    "parquet": (ParquetWriter, "parquet", "application/vnd.apache.parquet", True),
+    "arrow": (ArrowWriter, "arrow", "application/vnd.apache.arrow.file", True),
+    "xlsx": (
+        XlsxWriter,
+        "xlsx",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        False,
+    ),
+}
+
+
+def check_format(fmt: str) -> None:
+    """Raise ``ValueError`` if ``fmt`` is unknown or cannot be written here."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt}. Expected one of {sorted(FORMATS)}")
+    if FORMATS[fmt][3] and pyarrow is None:
+        raise ValueError(f"The {fmt} format needs the pyarrow package")
+
+
+def iter_export(
+    fmt: str,
+    columns: Columns,
+    batches: Iterable[Sequence[Sequence[Any]]],
+) -> Iterator[bytes]:
+    """Encode ``batches`` of rows, yielding the output after each batch."""
+    check_format(fmt)
+    sink = _Buffer()
+    writer = FORMATS[fmt][0](sink, columns)
+    for batch in batches:
+        writer.write_batch(batch)
+        data = sink.take()
+        if data:
+            yield data
+    writer.close()
+    data = sink.take()
+    if data:
+        yield data
+
+
+def export_cursor(cursor, fmt: str, out_path: str, sql_types: Optional[Dict[str, str]] = None) -> int:
+    """Write the cursor's result set to ``out_path`` and return the row count."""
+    columns = column_kinds(cursor.description, sql_types)
+    count = 0
+
+    def counted():
+        nonlocal count
+        for batch in iter_batches(cursor):
+            count += len(batch)
+            yield batch
+
+    with open(out_path, "wb") as f:
+        for chunk in iter_export(fmt, columns, counted()):
+            f.write(chunk)
+    return count
@@ -0,0 +1,340 @@
+"""Local stand-in for SQL Server, backed by SQLite.
+
+:class:`SqliteBackend` seeds one SQLite file per database from the
+``<DB>__<Table>.json`` files written by ``sql_dump.py`` and hands out
+connections shaped like :func:`utils.db.connect_sql_server`, so the app can
+run without LocalDB, e.g. under ``load_test.py``. Each statement sleeps for
+``latency`` seconds first to mimic the round trip to LocalDB.
+
+Only the T-SQL the app sends is understood: ``USE``, the schema batch and
+probe of :mod:`utils.schema`, ``TOP``, ``COUNT_BIG`` and table hints; the
+rest is handed to SQLite as is. Column types are declared with their SQL
+Server names, so :func:`utils.schema.read_schema` sees ``int``, ``float``,
+``bit`` and ``nvarchar`` columns. An ``ID`` column with unique values
+becomes the primary key; an integer one is SQLite's rowid, which numbers
+inserted rows like an IDENTITY column, and ``@@IDENTITY`` reads it back.
+
+``sql_dump.py`` folders often lack SetBolts, which only exists once bolts
+were placed in a model. A database with SetOfBolts but no SetBolts gets one
+derived by :func:`derive_setbolts`, so ``/setbolts`` can be exercised too.
+"""
+
+import json
+import re
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config import DEFAULT_DATABASE
+from utils.bolt_sets import set_key
+from utils.grip_length import covered_lengths
+from utils.schema import PROBE_SQL
+
+# Fixed, as sys.tables.modify_date only changes with the table definitions.
+MODIFY_DATE = "2000-01-01 00:00:00"
+BUSY_TIMEOUT = 30.0
+
+_HINT = re.compile(r"\s+WITH\s*\((?:NOLOCK|UPDLOCK|ROWLOCK|HOLDLOCK|READPAST|,|\s)+\)", re.I)
+_TOP = re.compile(r"^(\s*SELECT\s+)TOP\s*\(?\s*(\d+)\s*\)?\s+", re.I)
+_USE = re.compile(r"^\s*USE\s+\[?([^\]\s;]+)\]?\s*;?\s*$", re.I)
+
+
+def _sql_type(values: Sequence[Any]) -> str:
+    kinds = {type(v) for v in values if v is not None}
+    if kinds and kinds <= {bool}:
+        return "bit"
+    if kinds and kinds <= {int}:
+        return "int"
+    if kinds and kinds <= {int, float}:
+        return "float"
+    return "nvarchar"
+
+
+def _cell(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def derive_setbolts(
+    set_rows: Sequence[Dict[str, Any]],
+    screw_rows: Sequence[Dict[str, Any]] = (),
+) -> List[Dict[str, Any]]:
+    """Return one SetBolts row per SetOfBolts row.
+
+    The length is the shortest one the set's ScrewNew grip ranges can
+    select, if any.
+    """
+    shortest: Dict[Any, float] = {}
+    for row in screw_rows:
+        lengths = covered_lengths(dict(row))
+        if lengths:
+            key = set_key(row.get("Standard"), row.get("Set"), row.get("Material"), row.get("Diameter"))
+            shortest[key] = min(lengths[0], shortest.get(key, lengths[0]))
+    bolts = []
+    for i, row in enumerate(set_rows, start=1):
+        key = set_key(row.get("Standard"), row.get("Set"), row.get("Material"), row.get("Diameter"))
+        size = f" M{key[3]:g}" if key[3] is not None else ""
+        bolts.append({
+            "ID": i,
+            "Standard": row.get("Standard"),
+            "Material": row.get("Material"),
+            "Name": f"{row.get('Standard')} {row.get('Set')}{size}",
+            "Type": row.get("Set"),
+            "Diameter": row.get("Diameter"),
+            "Length": shortest.get(key),
+            "HeadHeight": None,
+            "BoltDefID": -1,
+        })
+    return bolts
+
+
+def translate(query: str) -> str:
+    """Rewrite the T-SQL constructs SQLite lacks."""
+    query = _HINT.sub("", query)
+    query = re.sub(r"\bCOUNT_BIG\s*\(", "COUNT(", query, flags=re.I)
+    query = re.sub(r"@@IDENTITY\b", "last_insert_rowid()", query, flags=re.I)
+    top = _TOP.match(query)
+    if top:
+        query = top.group(1) + query[top.end():].rstrip().rstrip(";") + f" LIMIT {top.group(2)}"
+    return query
+
+
+class FakeCursor:
+    """The subset of ``pyodbc.Cursor`` used by the app."""
+
+    def __init__(self, connection: "FakeConnection"):
+        self.connection = connection
+        self._cursor: Optional[sqlite3.Cursor] = None
+        self._results: List[List[Tuple[Any, ...]]] = []
+        self._rows: List[Tuple[Any, ...]] = []
+        self.description = None
+        self.rowcount = -1
+
+    def _set_rows(self, rows, description) -> None:
+        self._cursor = None
+        self._rows = list(rows)
+        self.description = description
+
+    def execute(self, query: str, params: Sequence[Any] = ()) -> "FakeCursor":
+        self.connection.backend.wait()
+        use = _USE.match(query)
+        if use:
+            self.connection.use(use.group(1))
+            self._set_rows([], None)
+            return self
+        if query.lstrip().upper().startswith("IF OBJECTPROPERTY"):
+            # IDENTITY_INSERT: SQLite accepts explicit ID values anyway.
+            self._set_rows([], None)
+            return self
+        if query.lstrip().upper().startswith("SET NOCOUNT ON"):
+            self._schema_batch()
+            return self
+        if query.strip() == PROBE_SQL:
+            self._set_rows([self._probe()], [("modify_date",), ("count",)])
+            return self
+        self.connection.begin()
+        cursor = self.connection.db.execute(translate(query), list(params or ()))
+        self._cursor = cursor
+        self._rows = []
+        self.description = cursor.description
+        self.rowcount = cursor.rowcount
+        return self
+
+    def _probe(self) -> Tuple[str, int]:
+        count = self.connection.db.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'"
+        ).fetchone()[0]
+        return MODIFY_DATE, count
+
+    def _schema_batch(self) -> None:
+        """Answer :data:`utils.schema.SCHEMA_SQL` from SQLite's catalog."""
+        db = self.connection.db
+        tables = [r[0] for r in db.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name"
+        )]
+        counts, columns, keys, foreign = [], [], [], []
+        for table in tables:
+            counts.append((table, db.execute(f"SELECT COUNT(*) FROM [{table}]").fetchone()[0]))
+            info = db.execute(f"PRAGMA table_info([{table}])").fetchall()
+            for _, name, data_type, notnull, _, pk in info:
+                # Only an INTEGER PRIMARY KEY is a rowid alias.
+                identity = data_type.lower() == "integer" and pk == 1
+                columns.append((table, name, "int" if identity else data_type, not notnull, identity))
+            keys.extend((table, row[1]) for row in sorted(info, key=lambda r: r[5]) if row[5])
+            for fk in db.execute(f"PRAGMA foreign_key_list([{table}])"):
+                foreign.append((f"FK_{table}_{fk[0]}", table, fk[3], fk[2], fk[4]))
+        self._set_rows([self._probe()], [("modify_date",), ("count",)])
+        self._results = [counts, columns, keys, foreign]
+
+    def nextset(self) -> bool:
+        if not self._results:
+            return False
+        self._set_rows(self._results.pop(0), [("value",)])
+        return True
+
+    def fetchone(self):
+        if self._cursor is not None:
+            return self._cursor.fetchone()
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchmany(self, size: int = 1):
+        if self._cursor is not None:
+            return self._cursor.fetchmany(size)
+        batch, self._rows = self._rows[:size], self._rows[size:]
+        return batch
+
+    def fetchall(self):
+        if self._cursor is not None:
+            return self._cursor.fetchall()
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self) -> None:
+        self._cursor = None
+
+
+class FakeConnection:
+    """The subset of ``pyodbc.Connection`` used by the app.
+
+    Turning ``autocommit`` off starts a transaction holding SQLite's write
+    lock, which stands in for SQL Server's update row locks.
+    """
+
+    def __init__(self, backend: "SqliteBackend", database: str):
+        self.backend = backend
+        self.db = backend.open(database)
+        self.autocommit = True
+        self._in_transaction = False
+        self.timeout = 0
+
+    def use(self, database: str) -> None:
+        self.db.close()
+        self.db = self.backend.open(database)
+
+    def begin(self) -> None:
+        if not self.autocommit and not self._in_transaction:
+            self.db.execute("BEGIN IMMEDIATE")
+            self._in_transaction = True
+
+    def commit(self) -> None:
+        if self._in_transaction:
+            self.db.execute("COMMIT")
+            self._in_transaction = False
+
+    def rollback(self) -> None:
+        if self._in_transaction:
+            self.db.execute("ROLLBACK")
+            self._in_transaction = False
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self)
+
+    def close(self) -> None:
+        self.rollback()
+        self.db.close()
+
+
+class SqliteBackend:
+    """SQLite databases seeded from a ``sql_dump.py`` folder.
+
+    Parameters
+    ----------
+    data_dir:
+        Folder holding ``<DB>__<Table>.json`` files.
+    latency:
+        Seconds every statement waits before it runs.
+    directory:
+        Where the SQLite files are written; a temporary folder by default.
+    """
+
+    def __init__(
+        self,
+        data_dir: str | Path,
+        latency: float = 0.0,
+        directory: Optional[str | Path] = None,
+    ):
+        self.latency = latency
+        if directory is None:
+            self._tmp = tempfile.TemporaryDirectory(prefix="fake_sql_")
+            directory = self._tmp.name
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.databases: Dict[str, List[str]] = {}
+        # database -> table -> rows, kept for deriving SetBolts.
+        sources: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        for path in sorted(Path(data_dir).glob("*__*.json")):
+            database, table = path.stem.split("__", 1)
+            if database not in self.databases:
+                # Start from the dump, not from an earlier run's edits.
+                for suffix in ("", "-wal", "-shm"):
+                    Path(f"{self._path(database)}{suffix}").unlink(missing_ok=True)
+            with open(path, "r", encoding="utf-8") as f:
+                rows = json.load(f)["data"]
+            self._seed(database, table, rows)
+            self.databases.setdefault(database, []).append(table)
+            if table in ("SetOfBolts", "ScrewNew"):
+                sources.setdefault(database, {})[table] = rows
+        for database, tables in sources.items():
+            if "SetOfBolts" in tables and "SetBolts" not in self.databases[database]:
+                rows = derive_setbolts(tables["SetOfBolts"], tables.get("ScrewNew", ()))
+                self._seed(database, "SetBolts", rows)
+                self.databases[database].append("SetBolts")
+
+    def _path(self, database: str) -> Path:
+        return self.directory / f"{database}.sqlite"
+
+    def _seed(self, database: str, table: str, rows: List[Dict[str, Any]]) -> None:
+        columns = list(dict.fromkeys(c for row in rows for c in row))
+        if not columns:
+            return
+        types = {c: _sql_type([row.get(c) for row in rows]) for c in columns}
+        ids = [row.get("ID") for row in rows]
+        keyed = "ID" in columns and None not in ids and len(set(ids)) == len(ids)
+        def definition(column: str) -> str:
+            if not (keyed and column == "ID"):
+                return f"[{column}] {types[column]}"
+            if types[column] == "int":
+                return f"[{column}] integer PRIMARY KEY"
+            return f"[{column}] {types[column]} PRIMARY KEY"
+
+        definitions = ", ".join(definition(c) for c in columns)
+        db = sqlite3.connect(self._path(database))
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(f"CREATE TABLE [{table}] ({definitions})")
+            db.executemany(
+                f"INSERT INTO [{table}] VALUES ({', '.join('?' for _ in columns)})",
+                [[_cell(row.get(c)) for c in columns] for row in rows],
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def open(self, database: str) -> sqlite3.Connection:
+        path = self._path(database)
+        if not path.exists():
+            raise sqlite3.OperationalError(f"Database '{database}' does not exist")
+        return sqlite3.connect(
+            path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False
+        )
+
+    def wait(self) -> None:
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def connect(
+        self,
+        database: str = DEFAULT_DATABASE,
+        server: Optional[str] = None,
+    ) -> Tuple[FakeConnection, FakeCursor]:
+        """Drop-in replacement for :func:`utils.db.connect_sql_server`."""
+        conn = FakeConnection(self, database)
+        return conn, conn.cursor()
+
+    def close(self) -> None:
+        """Remove the temporary SQLite files, if the backend created them."""
+        if getattr(self, "_tmp", None) is not None:
+            self._tmp.cleanup()
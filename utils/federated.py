@@ -0,0 +1,179 @@
+"""Search every Advance Steel database at once.
+
+Given the column types of each database's tables (from :mod:`utils.schema`)
+and a search term and/or filters, :func:`plan_queries` builds one ``SELECT``
+per table that could match and skips the rest (a filter on a column the
+table lacks, a numeric comparison on a text column, a term on a table
+without text columns). :func:`run_queries` then runs the plan with one connection
+and thread per database and yields results as each query finishes, tagged
+with the database and table they came from.
+
+Filters use the ``/search`` vocabulary of :func:`utils.search_utils.filter_data`:
+``column=value`` for equality and ``column__gt`` / ``__lt`` / ``__gte`` /
+``__lte`` for numeric comparisons.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from utils.rows import fetch_rows
+
+TEXT_TYPES = {"char", "varchar", "nchar", "nvarchar", "text", "ntext"}
+NUMERIC_TYPES = {
+    "bit", "tinyint", "smallint", "int", "bigint",
+    "decimal", "numeric", "money", "smallmoney", "float", "real",
+}
+OPERATORS = {"gt": ">", "lt": "<", "gte": ">=", "lte": "<="}
+# Rows returned per table, seconds per query and seconds for the whole search.
+ROW_LIMIT = 200
+QUERY_TIMEOUT = 10
+SEARCH_TIMEOUT = 30
+
+# database -> table -> column -> data type
+Catalog = Dict[str, Dict[str, Dict[str, str]]]
+Query = Tuple[str, str, str, List[Any]]
+
+
+def _condition(column: str, data_type: str, op: Optional[str], value: Any):
+    """Return ``(sql, params)`` for one filter, or ``None`` if it cannot match."""
+    if op is not None or data_type in NUMERIC_TYPES:
+        if data_type not in NUMERIC_TYPES:
+            return None
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return None
+        return f"[{column}] {OPERATORS.get(op, '=')} ?", [number]
+    return f"[{column}] = ?", [str(value)]
+
+
+def plan_table(
+    table: str,
+    columns: Mapping[str, str],
+    term: Optional[str],
+    filters: Mapping[str, Any],
+    limit: int = ROW_LIMIT,
+) -> Optional[Tuple[str, List[Any]]]:
+    """Return the query searching ``table``, or ``None`` if it cannot match."""
+    where = []
+    params: List[Any] = []
+    for key, value in filters.items():
+        column, op = key, None
+        if "__" in key:
+            column, op = key.rsplit("__", 1)
+            if op not in OPERATORS:
+                return None
+        if column not in columns:
+            return None
+        condition = _condition(column, columns[column], op, value)
+        if condition is None:
+            return None
+        where.append(condition[0])
+        params.extend(condition[1])
+    if term:
+        alternatives = [f"[{c}] LIKE ?" for c, t in columns.items() if t in TEXT_TYPES]
+        params.extend([f"%{term}%"] * len(alternatives))
+        try:
+            number = float(term)
+        except ValueError:
+            number = None
+        if number is not None:
+            numeric = [c for c, t in columns.items() if t in NUMERIC_TYPES]
+            alternatives += [f"[{c}] = ?" for c in numeric]
+            params.extend([number] * len(numeric))
+        if not alternatives:
+            return None
+        where.append("(" + " OR ".join(alternatives) + ")")
+    if not where:
+        return None
+    return f"SELECT TOP {int(limit)} * FROM [{table}] WHERE " + " AND ".join(where), params
+
+
+def plan_queries(
+    catalog: Catalog,
+    term: Optional[str] = None,
+    filters: Optional[Mapping[str, Any]] = None,
+    limit: int = ROW_LIMIT,
+) -> List[Query]:
+    """Return ``(database, table, sql, params)`` for every table that could match."""
+    plan = []
+    for database, tables in catalog.items():
+        for table, columns in tables.items():
+            query = plan_table(table, columns, term, filters or {}, limit)
+            if query is not None:
+                plan.append((database, table, *query))
+    return plan
+
+
+def run_queries(
+    connect: Callable[[str], Tuple[Any, Any]],
+    databases: Mapping[str, str],
+    plan: List[Query],
+    query_timeout: int = QUERY_TIMEOUT,
+    timeout: float = SEARCH_TIMEOUT,
+) -> Iterator[Dict[str, Any]]:
+    """Run ``plan`` concurrently, yielding results as they arrive.
+
+    Each database gets its own connection and thread and runs its queries in
+    turn. Yields ``{"database", "table", "rows"}`` per query with rows, and
+    ``{"database", "table", "error"}`` for failed queries, failed
+    connections (``table`` is ``None``) and databases still running when
+    ``timeout`` seconds have passed. Closing the iterator stops the threads
+    after their current query.
+    """
+    by_database: Dict[str, List[Query]] = {}
+    for query in plan:
+        by_database.setdefault(query[0], []).append(query)
+    results: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+    stop = threading.Event()
+
+    def worker(database: str, queries: List[Query]) -> None:
+        conn = None
+        try:
+            conn, cur = connect(databases[database])
+            # pyodbc applies this to every statement on the connection.
+            conn.timeout = query_timeout
+            for _, table, sql, params in queries:
+                if stop.is_set():
+                    break
+                try:
+                    cur.execute(sql, params)
+                    rows = fetch_rows(cur)
+                except Exception as e:
+                    results.put({"database": database, "table": table, "error": str(e)})
+                    continue
+                if rows:
+                    results.put({"database": database, "table": table, "rows": rows})
+        except Exception as e:
+            results.put({"database": database, "table": None, "error": str(e)})
+        finally:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            results.put({"database": database, "done": True})
+
+    pending = set(by_database)
+    for database, queries in by_database.items():
+        threading.Thread(
+            target=worker, args=(database, queries), name=f"search-{database}", daemon=True
+        ).start()
+    deadline = time.monotonic() + timeout
+    try:
+        while pending:
+            remaining = deadline - time.monotonic()
+            try:
+                result = results.get(timeout=max(remaining, 0))
+            except queue.Empty:
+                for database in sorted(pending):
+                    yield {"database": database, "table": None, "error": "timed out"}
+                return
+            if result.pop("done", False):
+                pending.discard(result["database"])
+            else:
+                yield result
+    finally:
+        stop.set()
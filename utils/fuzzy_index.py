@@ -0,0 +1,161 @@
+"""Indexed "did you mean" matching of column values.
+
+``difflib.get_close_matches`` compares the search term with every value. A
+:class:`TrigramIndex` first narrows the values to those sharing the most
+three-letter sequences with the term and only scores those with
+``SequenceMatcher``, so lookups stay fast on columns with thousands of
+distinct values. Scores are difflib's, but values sharing few trigrams with
+the term are never scored; difflib rarely picks those anyway.
+
+:class:`ValueCache` keeps the distinct values of table columns, optionally on
+disk, and rebuilds an index only when a cheap probe of the column (row count
+and checksum, see :func:`probe_column`) changes.
+"""
+
+import hashlib
+import heapq
+import json
+from collections import Counter
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Values pre-ranked by trigram overlap that are scored with SequenceMatcher.
+CANDIDATES = 50
+
+
+def trigrams(text: str) -> Set[str]:
+    """Return the lower-cased three-letter sequences of ``text``.
+
+    The text is padded so short values and word starts produce trigrams too.
+    """
+    padded = f"  {text.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Distinct string values indexed by their trigrams."""
+
+    def __init__(self, values: Iterable[str]):
+        self.values: List[str] = list(dict.fromkeys(values))
+        self._known = set(self.values)
+        self._sizes: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+        for i, value in enumerate(self.values):
+            grams = trigrams(value)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __contains__(self, value: object) -> bool:
+        return value in self._known
+
+    def closest(
+        self,
+        term: str,
+        n: int = 3,
+        cutoff: float = 0.6,
+        candidates: int = CANDIDATES,
+    ) -> List[str]:
+        """Return up to ``n`` values most similar to ``term``, best first.
+
+        Similarity and ``cutoff`` follow ``difflib.get_close_matches``.
+        """
+        grams = trigrams(term)
+        shared: Counter = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+        # Dice coefficient of the trigram sets picks the values worth scoring.
+        best = heapq.nlargest(
+            candidates,
+            shared.items(),
+            key=lambda item: 2 * item[1] / (len(grams) + self._sizes[item[0]]),
+        )
+        matcher = SequenceMatcher()
+        matcher.set_seq2(term)
+        scored = []
+        for i, _ in best:
+            matcher.set_seq1(self.values[i])
+            if (
+                matcher.real_quick_ratio() >= cutoff
+                and matcher.quick_ratio() >= cutoff
+                and matcher.ratio() >= cutoff
+            ):
+                scored.append((matcher.ratio(), self.values[i]))
+        return [value for _, value in heapq.nlargest(n, scored)]
+
+
+def probe_column(cursor, table: str, column: str) -> List[Any]:
+    """Return a cheap fingerprint of a column: row count and checksum.
+
+    Columns ``BINARY_CHECKSUM`` cannot read (``text``, ``image``) are probed
+    by row count only.
+    """
+    try:
+        cursor.execute(
+            f"SELECT COUNT_BIG(*), CHECKSUM_AGG(BINARY_CHECKSUM([{column}])) FROM [{table}]"
+        )
+    except Exception:
+        cursor.execute(f"SELECT COUNT_BIG(*) FROM [{table}]")
+    return list(cursor.fetchone())
+
+
+class ValueCache:
+    """Distinct values of table columns keyed by ``(database, table, column)``.
+
+    Parameters
+    ----------
+    directory:
+        Folder where values are kept between runs. ``None`` keeps them in
+        memory only.
+    """
+
+    def __init__(self, directory: Optional[str | Path] = None):
+        self.directory = Path(directory) if directory else None
+        self._entries: Dict[Tuple[str, ...], Tuple[Any, TrigramIndex]] = {}
+
+    def _path(self, key: Sequence[str]) -> Path:
+        digest = hashlib.sha1("\0".join(key).encode("utf-8")).hexdigest()[:16]
+        return self.directory / f"{digest}.json"
+
+    def _read(self, key: Tuple[str, ...]) -> Optional[Tuple[Any, TrigramIndex]]:
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("key") != list(key):
+            return None
+        return data["probe"], TrigramIndex(data["values"])
+
+    def _write(self, key: Tuple[str, ...], probe: Any, index: TrigramIndex) -> None:
+        if self.directory is None:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self._path(key), "w", encoding="utf-8") as f:
+                json.dump({"key": list(key), "probe": probe, "values": index.values}, f)
+        except OSError:
+            pass
+
+    def get(
+        self,
+        key: Sequence[str],
+        probe: Any,
+        load: Callable[[], Iterable[str]],
+    ) -> TrigramIndex:
+        """Return the index for ``key``, calling ``load`` if ``probe`` changed."""
+        key = tuple(key)
+        # Round-trip through JSON so probes compare equal to stored ones.
+        probe = json.loads(json.dumps(probe, default=str))
+        entry = self._entries.get(key) or self._read(key)
+        if entry is None or entry[0] != probe:
+            entry = (probe, TrigramIndex(load()))
+            self._write(key, probe, entry[1])
+        self._entries[key] = entry
+        return entry[1]
@@ -0,0 +1,116 @@
+"""Select bolt lengths from the ScrewNew grip-length ranges.
+
+Each ScrewNew row holds up to seven ranges
+(``GripLengthMin{n}``/``GripLengthMax{n}``/``ScrewLengthBase{n}``/
+``ScrewLengthDelta{n}``). A bolt of length ``base + k * delta`` covers grips
+from ``min + k * delta`` up to the next step, so the length for a grip is
+found by locating its range and counting whole steps above the range start.
+"""
+
+import math
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.bolt_sets import SetKey, set_key
+
+GRIP_RANGES = range(1, 8)
+# Decimals kept of computed lengths and grips, dropping float noise.
+DIGITS = 6
+
+# (grip min, grip max, base length, length delta, range number)
+Interval = Tuple[float, float, float, float, int]
+GripIndex = Dict[SetKey, Tuple[List[float], List[Interval]]]
+
+
+def _intervals(row: Dict[str, Any]) -> List[Interval]:
+    intervals = []
+    for n in GRIP_RANGES:
+        values = [row.get(f"{c}{n}") for c in (
+            "GripLengthMin", "GripLengthMax", "ScrewLengthBase", "ScrewLengthDelta"
+        )]
+        if any(v is None for v in values[:3]):
+            continue
+        low, high, base, delta = (float(v or 0) for v in values)
+        if high <= low or base <= 0:
+            continue
+        intervals.append((low, high, base, delta, n))
+    return sorted(intervals)
+
+
+def covered_lengths(row: Dict[str, Any]) -> List[float]:
+    """Return the lengths of every step of a ScrewNew row's grip ranges.
+
+    A step starting exactly at the end of its range covers no grips and is
+    left out.
+    """
+    lengths = set()
+    for low, high, base, delta, _ in _intervals(row):
+        steps = math.ceil((high - low) / delta - 1e-9) if delta > 0 else 1
+        lengths.update(round(base + k * delta, DIGITS) for k in range(steps))
+    return sorted(lengths)
+
+
+def build_grip_index(rows: Iterable[Dict[str, Any]]) -> GripIndex:
+    """Index ScrewNew grip ranges by (Standard, Set, Material, Diameter).
+
+    Each entry keeps the range start values separately so a grip can be
+    located with :func:`bisect.bisect_right`.
+    """
+    index: GripIndex = {}
+    for row in rows:
+        intervals = _intervals(row)
+        if intervals:
+            key = set_key(row.get("Standard"), row.get("Set"), row.get("Material"), row.get("Diameter"))
+            index[key] = ([i[0] for i in intervals], intervals)
+    return index
+
+
+def select_length(
+    index: GripIndex,
+    grip: float,
+    standard: Any,
+    set_name: Any,
+    material: Any,
+    diameter: Any,
+) -> Optional[Dict[str, Any]]:
+    """Return the bolt length entry covering ``grip`` or ``None``."""
+    entry = index.get(set_key(standard, set_name, material, diameter))
+    if entry is None:
+        return None
+    starts, intervals = entry
+    grip = float(grip)
+    # Walk back from the last range starting at or below the grip so that
+    # overlapping ranges are still honoured.
+    for pos in range(bisect_right(starts, grip) - 1, -1, -1):
+        low, high, base, delta, n = intervals[pos]
+        if grip > high:
+            continue
+        steps = math.floor((grip - low) / delta + 1e-9) if delta > 0 else 0
+        return {
+            "Length": round(base + steps * delta, DIGITS),
+            "GripLengthMin": round(low + steps * delta, DIGITS),
+            "GripLengthMax": round(
+                min(high, low + (steps + 1) * delta) if delta > 0 else high, DIGITS
+            ),
+            "Range": n,
+        }
+    return None
+
+
+def select_lengths(
+    index: GripIndex,
+    requests: Iterable[Dict[str, Any]],
+) -> List[Optional[Dict[str, Any]]]:
+    """Resolve many ``{"grip", "Standard", "Set", "Material", "Diameter"}`` requests."""
+    results = []
+    for req in requests:
+        try:
+            grip = float(req["grip"])
+        except (KeyError, TypeError, ValueError):
+            results.append(None)
+            continue
+        results.append(select_length(
+            index, grip, req.get("Standard"), req.get("Set"),
+            req.get("Material"), req.get("Diameter"),
+        ))
+    return results
@@ -0,0 +1,107 @@
+"""ETags and precompressed bodies for table responses.
+
+A table response only changes when the table is written, so its ETag is
+derived from the table's write counter (see :mod:`utils.table_cache`) and
+the request variant. Rendered bodies are kept per ETag and encoding in a
+small LRU so a hot table is loaded and compressed once per version.
+"""
+
+import gzip
+import hashlib
+import uuid
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Optional, Tuple
+
+from utils.table_cache import table_version
+
+try:  # optional, used when the client accepts it
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# Counters restart with the process, so tags from a previous run never match.
+BOOT_ID = uuid.uuid4().hex[:8]
+MAX_BODIES = 64
+GZIP_LEVEL = 6
+
+
+def table_etag(table: str, variant: str = "") -> str:
+    """Return a strong ETag for ``table`` at its current version.
+
+    ``variant`` distinguishes responses built from the same table, such as
+    different query strings or content encodings.
+    """
+    digest = hashlib.blake2b(variant.encode("utf-8"), digest_size=6).hexdigest()
+    return f"{table}-{BOOT_ID}-{table_version(table)}-{digest}"
+
+
+def choose_encoding(accept_encoding: str) -> str:
+    """Return ``br``, ``gzip`` or ``identity`` for an Accept-Encoding header."""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        params = params.strip()
+        try:
+            quality = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            quality = 0.0
+        if quality > 0:
+            accepted.add(name.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return "identity"
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Return ``body`` encoded with ``encoding``."""
+    if encoding == "br":
+        return brotli.compress(body)
+    if encoding == "gzip":
+        return gzip.compress(body, GZIP_LEVEL)
+    return body
+
+
+class BodyCache:
+    """LRU of rendered bodies keyed by ETag and content encoding."""
+
+    def __init__(self, max_entries: int = MAX_BODIES):
+        self.max_entries = max_entries
+        self._bodies: "OrderedDict[Tuple[str, str], Tuple[bytes, str]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(
+        self,
+        etag: str,
+        encoding: str,
+        render: Callable[[], bytes],
+        min_size: int,
+    ) -> Tuple[bytes, str]:
+        """Return ``(body, encoding)`` for ``etag``, rendering it when missing.
+
+        Bodies shorter than ``min_size`` are sent uncompressed, so the
+        returned encoding may be ``identity`` even when compression was
+        requested.
+        """
+        key = (etag, encoding)
+        with self._lock:
+            cached: Optional[Tuple[bytes, str]] = self._bodies.get(key)
+            if cached is not None:
+                self._bodies.move_to_end(key)
+                return cached
+        identity = self._bodies.get((etag, "identity"))
+        body = identity[0] if identity else render()
+        used = encoding if len(body) >= min_size else "identity"
+        entry = (compress(body, used), used)
+        with self._lock:
+            self._bodies[(etag, "identity")] = (body, "identity")
+            self._bodies[key] = entry
+            while len(self._bodies) > self.max_entries:
+                self._bodies.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bodies.clear()
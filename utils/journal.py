@@ -0,0 +1,218 @@
+"""Append-only journal of table writes made through the app.
+
+Every write is stored as one JSON line holding the affected rows' before and
+after images (only the changed columns for updates). A second file indexes
+each entry by table and time with its byte offset in the log, so entries are
+found without scanning the log and a single edit or a time range can be
+undone by replaying the inverse operations.
+
+Several processes may share a journal (``serve.py`` workers, ``undo.py``
+next to the app). Writers take a lock on a file beside the log and read the
+index lines other processes appended before assigning the next id, so ids
+stay unique and every reader sees the same entry under an id.
+"""
+
+import json
+import os
+import time
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LOG_NAME = "changes.jsonl"
+INDEX_NAME = "index.jsonl"
+LOCK_NAME = "journal.lock"
+
+
+@contextmanager
+def _file_lock(path: Path):
+    """Hold an exclusive lock on ``path`` across processes."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            # LK_LOCK retries for about ten seconds before giving up.
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        yield
+    finally:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        os.close(fd)
+
+
+class Journal:
+    """Change log stored in ``directory``."""
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self.log_path = self.directory / LOG_NAME
+        self.index_path = self.directory / INDEX_NAME
+        self.lock_path = self.directory / LOCK_NAME
+        self._lock = Lock()
+        self._index: List[Dict[str, Any]] = []
+        self._by_table: Dict[str, List[int]] = {}
+        self._index_offset = 0
+
+    def _load_index(self) -> List[Dict[str, Any]]:
+        """Return the index after reading lines appended since the last call."""
+        try:
+            with open(self.index_path, "rb") as f:
+                f.seek(self._index_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return self._index
+        # A writer may be mid-line; leave the partial line for the next call.
+        complete = data[: data.rfind(b"\n") + 1]
+        for line in complete.decode("utf-8").splitlines():
+            if line.strip():
+                self._add_to_index(json.loads(line))
+        self._index_offset += len(complete)
+        return self._index
+
+    def _add_to_index(self, item: Dict[str, Any]) -> None:
+        self._by_table.setdefault(item["table"], []).append(len(self._index))
+        self._index.append(item)
+
+    def record(
+        self,
+        table: str,
+        key: Sequence[str],
+        ops: List[Dict[str, Any]],
+        undo_of: Optional[Sequence[int]] = None,
+    ) -> Optional[int]:
+        """Append an entry for a committed write and return its id.
+
+        ``ops`` use the editor delta vocabulary with before images:
+        ``add`` (``value``), ``replace`` (``key``, ``before``, ``value``) and
+        ``remove`` (``key``, ``before``). Ops may carry the ``version`` token
+        of the row after the write, which undo uses to detect later edits.
+        Nothing is written for an empty ``ops`` list.
+        """
+        if not ops:
+            return None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock, _file_lock(self.lock_path):
+            index = self._load_index()
+            entry = {
+                "id": len(index) + 1,
+                "ts": time.time(),
+                "table": table,
+                "key": list(key),
+                "ops": ops,
+            }
+            if undo_of:
+                entry["undo_of"] = list(undo_of)
+            line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+            with open(self.log_path, "ab") as f:
+                offset = f.tell()
+                f.write(line.encode("utf-8"))
+            item = {
+                "id": entry["id"],
+                "ts": entry["ts"],
+                "table": table,
+                "offset": offset,
+            }
+            if undo_of:
+                item["undo_of"] = entry["undo_of"]
+            with open(self.index_path, "ab") as f:
+                f.write((json.dumps(item) + "\n").encode("utf-8"))
+            self._load_index()
+            return entry["id"]
+
+    def undone(self) -> set:
+        """Return the ids of entries that were undone by a later entry."""
+        with self._lock:
+            return {i for item in self._load_index() for i in item.get("undo_of", ())}
+
+    def _read(self, items: Sequence[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        if not items:
+            return
+        with open(self.log_path, "rb") as f:
+            for item in items:
+                f.seek(item["offset"])
+                yield json.loads(f.readline())
+
+    def get(self, entry_id: int) -> Optional[Dict[str, Any]]:
+        """Return the entry with ``entry_id`` or ``None``."""
+        with self._lock:
+            index = self._load_index()
+            if not 1 <= entry_id <= len(index):
+                return None
+            return next(self._read([index[entry_id - 1]]))
+
+    def entries(
+        self,
+        table: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return entries for ``table`` (or all tables) with ``since <= ts <= until``.
+
+        Entries are returned oldest first.
+        """
+        with self._lock:
+            index = self._load_index()
+            if table is None:
+                items = index
+            else:
+                items = [index[i] for i in self._by_table.get(table, [])]
+            times = [item["ts"] for item in items]
+            start = bisect_left(times, since) if since is not None else 0
+            end = bisect_right(times, until) if until is not None else len(items)
+            return list(self._read(items[start:end]))
+
+
+def parse_time(value: str | float) -> float:
+    """Return epoch seconds for a number or an ISO 8601 timestamp."""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def inverse_delta(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the delta that undoes ``entry``.
+
+    Ops are inverted in reverse order. Inverse ops carry the recorded
+    version token so rows edited again since the entry are reported as
+    conflicts instead of being overwritten.
+    """
+    key_columns = entry["key"]
+    ops = []
+    for op in reversed(entry["ops"]):
+        action = op["op"]
+        if action == "add":
+            inverse = {
+                "op": "remove",
+                "key": {c: op["value"].get(c) for c in key_columns},
+            }
+        elif action == "replace":
+            inverse = {
+                "op": "replace",
+                "key": {c: op["value"].get(c, op["key"][c]) for c in key_columns},
+                "value": op["before"],
+            }
+        else:
+            inverse = {"op": "add", "value": op["before"]}
+        if op.get("version") and inverse["op"] != "add":
+            inverse["version"] = op["version"]
+        ops.append(inverse)
+    return {"key": list(key_columns), "ops": ops}
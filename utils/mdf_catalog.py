@@ -0,0 +1,141 @@
+"""Persistent catalog of the ``.mdf`` database files under a set of folders.
+
+Walking the Advance Steel ProgramData tree takes many seconds on
+network-redirected profiles. The catalog stores, per directory, its
+modification time, its subdirectories and the size and modification time of
+the ``.mdf`` files in it. A directory's mtime changes whenever an entry is
+added, removed or renamed in it, so on later runs a directory whose mtime is
+unchanged is not listed again; only its ``.mdf`` files are re-stat'ed to
+refresh their sizes. Directories are visited level by level with a thread
+pool, so a full rescan lists sibling folders in parallel.
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config import ADVANCE_STEEL_VERSION
+
+SCAN_WORKERS = 8
+
+
+def search_roots(version: int = ADVANCE_STEEL_VERSION) -> List[str]:
+    """Return the folders holding the databases of an Advance Steel version."""
+    return [rf"C:\ProgramData\Autodesk\Advance Steel {version}\USA"]
+
+
+def load_catalog(path: str | Path, roots: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """Return the cached directories for ``roots``.
+
+    A missing or unreadable catalog, or one saved for other roots, gives an
+    empty result so everything is scanned.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("roots") != list(roots):
+        return {}
+    return data.get("dirs", {})
+
+
+def save_catalog(path: str | Path, roots: Sequence[str], dirs: Dict[str, Dict[str, Any]]) -> None:
+    """Write the catalog, replacing the old file only once it is complete."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"roots": list(roots), "dirs": dirs}, f)
+    os.replace(tmp, path)
+
+
+def _list_dir(path: str) -> Dict[str, Any]:
+    files = {}
+    subdirs = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.name)
+            elif entry.name.lower().endswith(".mdf"):
+                st = entry.stat()
+                files[entry.name] = {"size": st.st_size, "mtime": st.st_mtime}
+    return {"files": files, "dirs": sorted(subdirs)}
+
+
+def _visit(path: str, cached: Optional[Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """Return the current entry of ``path`` and whether it was listed.
+
+    The entry is ``None`` when the directory no longer exists.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+        if cached is not None and cached.get("mtime") == mtime:
+            files = {}
+            for name in cached["files"]:
+                st = os.stat(os.path.join(path, name))
+                files[name] = {"size": st.st_size, "mtime": st.st_mtime}
+            return {"mtime": mtime, "files": files, "dirs": cached["dirs"]}, False
+        return {"mtime": mtime, **_list_dir(path)}, True
+    except FileNotFoundError:
+        if cached is not None and os.path.isdir(path):
+            # A cataloged file vanished without the mtime moving (coarse
+            # timestamps on some shares); list the folder again.
+            return _visit(path, None)
+        return None, False
+    except OSError:
+        return None, False
+
+
+def refresh(
+    roots: Sequence[str],
+    cached: Dict[str, Dict[str, Any]],
+    workers: int = SCAN_WORKERS,
+) -> Tuple[Dict[str, Dict[str, Any]], int]:
+    """Bring the cached directories up to date.
+
+    Returns the new directory entries and the number of directories that had
+    to be listed.
+    """
+    dirs: Dict[str, Dict[str, Any]] = {}
+    listed = 0
+    level = list(roots)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while level:
+            results = pool.map(lambda p: _visit(p, cached.get(p)), level)
+            next_level = []
+            for path, (entry, was_listed) in zip(level, results):
+                if entry is None:
+                    continue
+                dirs[path] = entry
+                listed += was_listed
+                next_level.extend(os.path.join(path, d) for d in entry["dirs"])
+            level = next_level
+    return dirs, listed
+
+
+def mdf_files(dirs: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Return ``path``, ``size`` and ``mtime`` of every cataloged file, sorted by path."""
+    found = [
+        {"path": os.path.join(d, name), **info}
+        for d, entry in dirs.items()
+        for name, info in entry["files"].items()
+    ]
+    return sorted(found, key=lambda f: f["path"])
+
+
+def find_mdf_files(
+    roots: Sequence[str],
+    catalog_path: Optional[str | Path] = None,
+    workers: int = SCAN_WORKERS,
+) -> List[Dict[str, Any]]:
+    """Return the ``.mdf`` files under ``roots``, reusing and updating the catalog."""
+    cached = load_catalog(catalog_path, roots) if catalog_path else {}
+    dirs, listed = refresh(roots, cached, workers)
+    if catalog_path and (listed or dirs != cached):
+        try:
+            save_catalog(catalog_path, roots, dirs)
+        except OSError:
+            pass
+    return mdf_files(dirs)
@@ -0,0 +1,91 @@
+"""Row identity helpers shared by the editor, importer and diff tools."""
+
+import hashlib
+from typing import Any, Dict, Iterable, List, Sequence
+
+from utils.rows import json_default
+
+# Tables without an ID/Key column and the columns that identify a row.
+NATURAL_KEYS = {
+    "SetOfBolts": ["Standard", "Set", "Material", "Diameter"],
+    "ScrewNew": ["Standard", "Set", "Material", "Diameter"],
+    "Screw": ["Standard", "Set", "Material", "Diameter"],
+    "SetNutsBolts": ["Standard", "Material", "Diameter"],
+    "BoltsDistances": ["Diameter", "HoleTolerance"],
+    "ConnectorDistances": ["Key", "HoleTolerance"],
+}
+
+# OwnerText of the rows shipped with Advance Steel; anything else is custom.
+STOCK_OWNER = "DSC"
+
+
+def is_custom(row: Dict[str, Any]) -> bool:
+    """Return whether ``row`` was added by a user rather than shipped as stock."""
+    owner = row.get("OwnerText")
+    return owner is not None and str(owner).strip() != STOCK_OWNER
+
+
+def natural_key(table: str, columns: Sequence[str]) -> List[str]:
+    """Return the columns identifying a row of ``table``."""
+    key = NATURAL_KEYS.get(table)
+    if key and all(c in columns for c in key):
+        return key
+    for candidate in ("ID", "Key"):
+        if candidate in columns:
+            return [candidate]
+    return list(columns)
+
+
+def plain_value(value: Any) -> Any:
+    """Return ``value`` as ``sql_dump.py`` writes it to JSON.
+
+    ``Decimal``, ``datetime`` and other driver types become the text stored
+    in dumps, so a value read from SQL equals the same value read back from
+    a dump.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return json_default(value)
+
+
+def row_digest(row: Dict[str, Any], columns: Sequence[str]) -> bytes:
+    """Return a content hash of ``row`` over ``columns``.
+
+    Values are hashed in their :func:`plain_value` form.
+    """
+    payload = repr(tuple(plain_value(row.get(c)) for c in columns)).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+def row_version(row: Dict[str, Any]) -> str:
+    """Return a version token for ``row`` derived from its full content."""
+    return row_digest(row, list(row.keys())).hex()
+
+
+def build_delta(
+    before: Iterable[Dict[str, Any]],
+    after: Iterable[Dict[str, Any]],
+    key_columns: Sequence[str],
+) -> Dict[str, Any]:
+    """Return the add/replace/remove ops turning ``before`` into ``after``.
+
+    Rows are matched on ``key_columns``; replace ops carry only the changed
+    columns. The result has the shape accepted by
+    :func:`utils.validation.validate_delta`.
+    """
+    def key_of(row):
+        return {c: row.get(c) for c in key_columns}
+
+    remaining = {tuple(map(r.get, key_columns)): r for r in before}
+    ops = []
+    for row in after:
+        old = remaining.pop(tuple(map(row.get, key_columns)), None)
+        if old is None:
+            ops.append({"op": "add", "value": row})
+            continue
+        changed = {c: v for c, v in row.items() if old.get(c) != v}
+        if changed:
+            ops.append({"op": "replace", "key": key_of(old), "value": changed})
+    for old in remaining.values():
+        ops.append({"op": "remove", "key": key_of(old)})
+    return {"key": list(key_columns), "ops": ops}
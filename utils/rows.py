@@ -0,0 +1,99 @@
+"""Compact read-only rows for query results.
+
+``dict(zip(columns, row))`` gives every row its own hash table of column
+names. A :class:`Row` instead keeps its values in a tuple and points at a
+:class:`Header` shared by the whole result set, so a table costs one small
+object per row. Rows behave like read-only mappings, which is all the
+templates, filters and index builders need; :meth:`Row.copy` returns a plain
+dict for callers that edit values.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+FETCH_SIZE = 5000
+
+
+class Header:
+    """Column names of a result set and their positions."""
+
+    __slots__ = ("columns", "index")
+
+    def __init__(self, columns: Iterable[str]):
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self.index: Dict[str, int] = {c: i for i, c in enumerate(self.columns)}
+
+    def __reduce__(self):
+        return Header, (self.columns,)
+
+    @classmethod
+    def from_cursor(cls, cursor) -> "Header":
+        return cls(c[0] for c in cursor.description)
+
+
+class Row(Mapping):
+    """Read-only mapping of column name to value backed by a tuple."""
+
+    __slots__ = ("_header", "_values")
+
+    def __init__(self, header: Header, values: Sequence[Any]):
+        self._header = header
+        self._values = tuple(values)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[self._header.index[key]]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        i = self._header.index.get(key)
+        return default if i is None else self._values[i]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._header.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._header.columns)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        return f"Row({self.copy()!r})"
+
+    def __reduce__(self):
+        return Row, (self._header, self._values)
+
+    def copy(self) -> Dict[str, Any]:
+        """Return the row as a new, editable dict."""
+        return dict(zip(self._header.columns, self._values))
+
+
+def make_rows(header: Header, records: Iterable[Sequence[Any]]) -> List[Row]:
+    """Wrap raw value sequences sharing ``header``."""
+    return [Row(header, r) for r in records]
+
+
+def fetch_rows(cursor) -> List[Row]:
+    """Return every row of the cursor's current result set."""
+    if cursor.description is None:
+        return []
+    return make_rows(Header.from_cursor(cursor), cursor.fetchall())
+
+
+def iter_rows(cursor, size: int = FETCH_SIZE) -> Iterator[Row]:
+    """Yield rows of the current result set, fetching ``size`` at a time."""
+    if cursor.description is None:
+        return
+    header = Header.from_cursor(cursor)
+    while True:
+        batch = cursor.fetchmany(size)
+        if not batch:
+            return
+        for record in batch:
+            yield Row(header, record)
+
+
+def json_default(obj: Any) -> Any:
+    """``json.dump`` hook serializing rows as objects and anything else as text."""
+    if isinstance(obj, Row):
+        return obj.copy()
+    return str(obj)
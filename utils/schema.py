@@ -0,0 +1,200 @@
+"""Cached description of the tables of each database.
+
+:func:`read_schema` loads the tables, their columns and types, primary keys,
+foreign keys and approximate row counts (from ``sys.partitions``) in one
+batch, so one round trip describes the whole database. :class:`SchemaCatalog`
+keeps the result per database and reloads it only when the newest
+``sys.tables.modify_date`` or the number of tables changes, which it checks
+at most every ``probe_interval`` seconds. Row counts are refreshed with the
+rest of the schema, so they are approximate between reloads. A failed
+connection is remembered for ``probe_interval`` seconds as well: the last
+known schema is returned, or the error raised again, without reconnecting.
+
+Each table is described as::
+
+    {
+        "columns": {name: {"type": str, "nullable": bool, "identity": bool}},
+        "primary_key": [column, ...],
+        "foreign_keys": [{"name", "columns", "references", "ref_columns"}],
+        "rows": int,
+    }
+"""
+
+import time
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+PROBE_SQL = "SELECT MAX(modify_date), COUNT(*) FROM sys.tables"
+SCHEMA_SQL = ";\n".join([
+    "SET NOCOUNT ON",
+    PROBE_SQL,
+    "SELECT t.name, SUM(p.rows) FROM sys.tables t "
+    "JOIN sys.partitions p ON p.object_id = t.object_id AND p.index_id IN (0, 1) "
+    "GROUP BY t.name",
+    "SELECT t.name, c.name, TYPE_NAME(c.system_type_id), c.is_nullable, c.is_identity "
+    "FROM sys.tables t JOIN sys.columns c ON c.object_id = t.object_id "
+    "ORDER BY t.name, c.column_id",
+    "SELECT t.name, c.name FROM sys.tables t "
+    "JOIN sys.indexes i ON i.object_id = t.object_id AND i.is_primary_key = 1 "
+    "JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id "
+    "JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id "
+    "ORDER BY t.name, ic.key_ordinal",
+    "SELECT fk.name, pt.name, pc.name, rt.name, rc.name "
+    "FROM sys.foreign_key_columns fkc "
+    "JOIN sys.foreign_keys fk ON fk.object_id = fkc.constraint_object_id "
+    "JOIN sys.tables pt ON pt.object_id = fkc.parent_object_id "
+    "JOIN sys.columns pc ON pc.object_id = fkc.parent_object_id "
+    "AND pc.column_id = fkc.parent_column_id "
+    "JOIN sys.tables rt ON rt.object_id = fkc.referenced_object_id "
+    "JOIN sys.columns rc ON rc.object_id = fkc.referenced_object_id "
+    "AND rc.column_id = fkc.referenced_column_id "
+    "ORDER BY fk.name, fkc.constraint_column_id",
+])
+PROBE_INTERVAL = 30.0
+
+# table -> description (see the module docstring)
+Schema = Dict[str, Dict[str, Any]]
+
+
+def _probe_value(row) -> Tuple[str, int]:
+    return str(row[0]), int(row[1])
+
+
+def probe(cursor) -> Tuple[str, int]:
+    """Return the newest table modification date and the number of tables."""
+    cursor.execute(PROBE_SQL)
+    return _probe_value(cursor.fetchone())
+
+
+def read_schema(cursor) -> Tuple[Tuple[str, int], Schema]:
+    """Describe every table of the current database in one round trip.
+
+    Returns the probe value the schema was read at and the schema.
+    """
+    cursor.execute(SCHEMA_SQL)
+    probed = _probe_value(cursor.fetchone())
+    results: List[List[Any]] = []
+    for _ in range(4):
+        cursor.nextset()
+        results.append(cursor.fetchall())
+    counts, columns, keys, foreign = results
+
+    tables: Schema = {}
+    for table, column, data_type, nullable, identity in columns:
+        info = tables.setdefault(
+            table, {"columns": {}, "primary_key": [], "foreign_keys": [], "rows": 0}
+        )
+        info["columns"][column] = {
+            "type": str(data_type).lower(),
+            "nullable": bool(nullable),
+            "identity": bool(identity),
+        }
+    for table, rows in counts:
+        if table in tables:
+            tables[table]["rows"] = int(rows or 0)
+    for table, column in keys:
+        if table in tables:
+            tables[table]["primary_key"].append(column)
+    by_name: Dict[str, Dict[str, Any]] = {}
+    for name, table, column, ref_table, ref_column in foreign:
+        if table not in tables:
+            continue
+        fk = by_name.get(name)
+        if fk is None:
+            fk = by_name[name] = {
+                "name": name, "columns": [], "references": ref_table, "ref_columns": [],
+            }
+            tables[table]["foreign_keys"].append(fk)
+        fk["columns"].append(column)
+        fk["ref_columns"].append(ref_column)
+    return probed, tables
+
+
+def column_types(info: Dict[str, Any]) -> Dict[str, Tuple[str, bool]]:
+    """Return ``{column: (data type, nullable)}`` of a table description."""
+    return {name: (c["type"], c["nullable"]) for name, c in info["columns"].items()}
+
+
+def identity_column(info: Dict[str, Any]) -> Optional[str]:
+    """Return the IDENTITY column of a table description, if any."""
+    return next((name for name, c in info["columns"].items() if c["identity"]), None)
+
+
+class SchemaCatalog:
+    """Schemas of several databases, read through ``connect(database)``."""
+
+    def __init__(
+        self,
+        connect: Callable[[str], Tuple[Any, Any]],
+        probe_interval: float = PROBE_INTERVAL,
+    ):
+        self.connect = connect
+        self.probe_interval = probe_interval
+        # database -> (probe value, monotonic time of the last check, schema)
+        self._entries: Dict[str, Tuple[Tuple[str, int], float, Schema]] = {}
+        # database -> (monotonic time of the failed check, error)
+        self._failures: Dict[str, Tuple[float, Exception]] = {}
+        self._lock = Lock()
+
+    def _recent(self, database: str, now: float) -> Optional[Schema]:
+        """Return the schema if ``database`` was checked recently, else ``None``.
+
+        Raises the remembered error of a recent failed check when no schema
+        was ever read.
+        """
+        entry = self._entries.get(database)
+        if entry is not None and now - entry[1] < self.probe_interval:
+            return entry[2]
+        failure = self._failures.get(database)
+        if failure is not None and now - failure[0] < self.probe_interval:
+            if entry is not None:
+                return entry[2]
+            raise failure[1]
+        return None
+
+    def get(self, database: str) -> Schema:
+        """Return the schema of ``database``, reloading it if it changed.
+
+        Raises
+        ------
+        Exception
+            Whatever ``connect`` or the schema query raised, when no schema
+            of ``database`` was read before.
+        """
+        tables = self._recent(database, time.monotonic())
+        if tables is not None:
+            return tables
+        with self._lock:
+            # Another thread may have checked while this one waited.
+            now = time.monotonic()
+            tables = self._recent(database, now)
+            if tables is not None:
+                return tables
+            entry = self._entries.get(database)
+            try:
+                conn, cur = self.connect(database)
+                try:
+                    if entry is not None:
+                        probed = probe(cur)
+                        if probed == entry[0]:
+                            self._entries[database] = (probed, now, entry[2])
+                            return entry[2]
+                    probed, tables = read_schema(cur)
+                finally:
+                    conn.close()
+            except Exception as e:
+                self._failures[database] = (now, e)
+                if entry is not None:
+                    return entry[2]
+                raise
+            self._failures.pop(database, None)
+            self._entries[database] = (probed, now, tables)
+            return tables
+
+    def table(self, database: str, table: str) -> Optional[Dict[str, Any]]:
+        """Return the description of one table, or ``None`` if it does not exist."""
+        return self.get(database).get(table)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._failures.clear()
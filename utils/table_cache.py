@@ -0,0 +1,172 @@
+"""In-process cache for structures derived from SQL tables.
+
+Lookup indexes are expensive to build but cheap to query, so they are built
+once and reused until one of the tables they were built from changes. Each
+table has a write counter; writes made through the app bump it and the next
+lookup rebuilds anything that depended on that table.
+
+When several processes serve the app, :func:`share_versions` makes every
+write also append the table name to a shared version file. Each process
+calls :func:`sync_versions` before handling a request to replay writes made
+by the others. Callbacks registered with :func:`add_listener` are told about
+every version bump, local or replayed.
+"""
+
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+_versions: Dict[str, int] = {}
+_entries: Dict[str, Tuple[Tuple[int, ...], Any]] = {}
+_lock = Lock()
+_shared_path: Optional[Path] = None
+_shared_offset = 0
+_listeners: List[Callable[[str, int], None]] = []
+
+
+def table_version(table: str) -> int:
+    """Return the current write counter for ``table``."""
+    return _versions.get(table, 0)
+
+
+def table_versions() -> Dict[str, int]:
+    """Return a copy of every table's write counter."""
+    return dict(_versions)
+
+
+def bump_version(table: str) -> int:
+    """Record a write to ``table`` and return its new version."""
+    with _lock:
+        if _shared_path is not None:
+            _replay_shared()
+            # One O_APPEND write per line keeps concurrent writers intact.
+            fd = os.open(_shared_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+            try:
+                os.write(fd, f"{table}\n".encode("utf-8"))
+            finally:
+                os.close(fd)
+            _replay_shared()
+        else:
+            _bump(table)
+        return _versions[table]
+
+
+def add_listener(callback: Callable[[str, int], None]) -> None:
+    """Call ``callback(table, version)`` after every version bump.
+
+    Callbacks run while the version lock is held and must not block.
+    """
+    if callback not in _listeners:
+        _listeners.append(callback)
+
+
+def _bump(table: str) -> None:
+    _versions[table] = _versions.get(table, 0) + 1
+    for callback in _listeners:
+        callback(table, _versions[table])
+
+
+def share_versions(path: str | Path) -> None:
+    """Share write counters with other processes through the file at ``path``.
+
+    Writes already in the file are replayed, so processes that share the
+    file agree on every table version.
+    """
+    global _shared_path, _shared_offset
+    with _lock:
+        _shared_path = Path(path)
+        _shared_path.parent.mkdir(parents=True, exist_ok=True)
+        _shared_path.touch()
+        _versions.clear()
+        _shared_offset = 0
+        _replay_shared()
+
+
+def sync_versions() -> bool:
+    """Apply writes recorded by other processes; return True if any."""
+    if _shared_path is None:
+        return False
+    try:
+        size = os.stat(_shared_path).st_size
+    except FileNotFoundError:
+        return False
+    if size == _shared_offset:
+        return False
+    with _lock:
+        return _replay_shared()
+
+
+def _replay_shared() -> bool:
+    global _shared_offset
+    with open(_shared_path, "rb") as f:
+        f.seek(_shared_offset)
+        data = f.read()
+    # A writer may be mid-line; leave the partial line for the next call.
+    complete = data[: data.rfind(b"\n") + 1]
+    for line in complete.decode("utf-8").splitlines():
+        _bump(line)
+    _shared_offset += len(complete)
+    return bool(complete)
+
+
+def get_cached(
+    name: str,
+    tables: Sequence[str],
+    builder: Callable[[], Any],
+) -> Any:
+    """Return the cached value for ``name``, rebuilding it when stale.
+
+    Parameters
+    ----------
+    name:
+        Unique name of the derived structure.
+    tables:
+        Tables the structure is built from.
+    builder:
+        Callable producing a fresh value.
+    """
+    versions = tuple(table_version(t) for t in tables)
+    entry = _entries.get(name)
+    if entry is not None and entry[0] == versions:
+        return entry[1]
+    value = builder()
+    with _lock:
+        _entries[name] = (versions, value)
+    return value
+
+
+def update_cached(
+    name: str,
+    tables: Sequence[str],
+    table: str,
+    update: Callable[[Any], None],
+) -> bool:
+    """Apply a write to ``table`` to the cached value for ``name`` in place.
+
+    Call right after :func:`bump_version` for the write. ``update`` receives
+    the cached value only when it was current just before that write;
+    otherwise nothing happens and :func:`get_cached` rebuilds the value as
+    usual. Returns whether the value was updated.
+    """
+    with _lock:
+        entry = _entries.get(name)
+        if entry is None:
+            return False
+        versions = tuple(table_version(t) for t in tables)
+        before = tuple(v - 1 if t == table else v for t, v in zip(tables, versions))
+        if table not in tables or entry[0] != before:
+            return False
+        update(entry[1])
+        _entries[name] = (versions, entry[1])
+        return True
+
+
+def clear() -> None:
+    """Drop every cached value and reset all table versions."""
+    global _shared_path, _shared_offset
+    with _lock:
+        _entries.clear()
+        _versions.clear()
+        _shared_path = None
+        _shared_offset = 0
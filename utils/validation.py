@@ -44,3 +44,49 @@ def validate_rows(rows: Iterable[Dict[str, Any]], reference_keys: Sequence[str]
     check(first)
     for r in iterator:
         check(r)
+
+
+DELTA_OPS = ("add", "replace", "remove")
+
+
+def validate_delta(delta: Dict[str, Any]) -> None:
+    """Validate a keyed table delta before applying it.
+
+    A delta has the form ``{"key": [...], "ops": [...]}`` where each op is
+    ``{"op": "add", "value": row}``, ``{"op": "replace", "key": {...},
+    "value": {changed columns}}`` or ``{"op": "remove", "key": {...}}``.
+    Replace and remove ops may carry a ``version`` token for conflict checks.
+
+    Raises
+    ------
+    ValueError
+        If the delta is malformed, an op names an unknown action, a key does
+        not match the key columns or added rows have inconsistent keys.
+    """
+    if not isinstance(delta, dict):
+        raise ValueError("delta must be an object")
+    key_columns = delta.get("key")
+    ops = delta.get("ops")
+    if not key_columns or not isinstance(key_columns, list):
+        raise ValueError("delta key columns missing")
+    if not isinstance(ops, list):
+        raise ValueError("delta ops must be a list")
+
+    added = []
+    for i, op in enumerate(ops):
+        action = op.get("op") if isinstance(op, dict) else None
+        if action not in DELTA_OPS:
+            raise ValueError(f"op {i}: unknown action {action!r}")
+        if action == "add":
+            row = op.get("value")
+            if not isinstance(row, dict) or any(k not in row for k in key_columns):
+                raise ValueError(f"op {i}: added row must include key columns")
+            added.append(row)
+            continue
+        if not isinstance(op.get("key"), dict) or set(op["key"]) != set(key_columns):
+            raise ValueError(f"op {i}: key must name exactly {key_columns}")
+        if action == "replace" and not isinstance(op.get("value"), dict):
+            raise ValueError(f"op {i}: replace needs a value object")
+        if "version" in op and not isinstance(op["version"], str):
+            raise ValueError(f"op {i}: version must be a string")
+    validate_rows(added)
@@ -0,0 +1,337 @@
+"""Compare AstorBase tables across Advance Steel versions.
+
+A source is either the LocalDB instance of an Advance Steel version (given as
+the version number, e.g. ``2024``) or a folder written by ``sql_dump.py``.
+Rows are streamed from both sources, sorted by natural key with an external
+merge sort that spills to temporary files, and compared with a sort-merge
+join so memory stays bounded by ``chunk_size`` regardless of table size.
+"""
+
+import argparse
+import heapq
+import json
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from config import SUPPORTED_VERSIONS
+from utils.db import connect_sql_server
+from utils.row_keys import is_custom, natural_key, plain_value, row_digest
+from utils.rows import iter_rows
+
+CHUNK_SIZE = 50000
+FETCH_SIZE = 5000
+
+
+def _sortable(value: Any) -> Tuple[int, Any]:
+    # None, numbers and text never compare with each other directly. Driver
+    # types sort by their dump text so both sources share one order.
+    value = plain_value(value)
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (1, value)
+    return (2, str(value))
+
+
+class DumpSource:
+    """Tables read from a ``sql_dump.py`` output folder."""
+
+    def __init__(self, folder: str | Path, database: str = "ASTORBASE"):
+        self.folder = Path(folder)
+        self.prefix = f"{database.upper()}__"
+        self.label = str(folder)
+
+    def tables(self) -> List[str]:
+        return sorted(
+            p.stem[len(self.prefix):]
+            for p in self.folder.glob(f"{self.prefix}*.json")
+        )
+
+    def rows(self, table: str) -> Iterator[Dict[str, Any]]:
+        return iter_dump_rows(self.folder / f"{self.prefix}{table}.json")
+
+    def close(self) -> None:
+        pass
+
+
+class SqlSource:
+    """Tables read from the LocalDB instance of an Advance Steel version."""
+
+    def __init__(self, version: int, database: str = "ASTORBASE"):
+        server = rf"(LocalDB)\ADVANCESTEEL{version}"
+        self.conn, self.cur = connect_sql_server(database, server=server)
+        self.label = f"Advance Steel {version}"
+
+    def tables(self) -> List[str]:
+        self.cur.execute(
+            "SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES "
+            "WHERE TABLE_TYPE='BASE TABLE'"
+        )
+        return sorted(row[0] for row in self.cur.fetchall())
+
+    def rows(self, table: str) -> Iterator[Dict[str, Any]]:
+        self.cur.execute(f"SELECT * FROM [{table}]")
+        return iter_rows(self.cur, FETCH_SIZE)
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def open_source(spec: str, database: str = "ASTORBASE"):
+    """Return a source for a version number or dump folder."""
+    if spec.isdigit() and int(spec) in SUPPORTED_VERSIONS:
+        return SqlSource(int(spec), database)
+    if os.path.isdir(spec):
+        return DumpSource(spec, database)
+    raise ValueError(
+        f"Source must be a dump folder or one of {sorted(SUPPORTED_VERSIONS)}: {spec}"
+    )
+
+
+def iter_dump_rows(path: str | Path, block_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+    """Stream the rows of a ``sql_dump.py`` JSON file without loading it whole."""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = ""
+        pos = -1
+        while pos < 0:
+            more = f.read(block_size)
+            if not more:
+                return
+            buf += more
+            pos = buf.find('"data"')
+            if pos >= 0:
+                pos = buf.find("[", pos)
+        pos += 1
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                more = f.read(block_size)
+                if not more:
+                    return
+                buf, pos = buf[pos:] + more, 0
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                row, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                more = f.read(block_size)
+                if not more:
+                    raise
+                buf, pos = buf[pos:] + more, 0
+                continue
+            yield row
+            pos = end
+
+
+def _spill(run: List[Tuple[Any, ...]]) -> str:
+    fd, path = tempfile.mkstemp(suffix=".run")
+    with os.fdopen(fd, "wb") as f:
+        for item in run:
+            pickle.dump(item, f, pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _read_run(path: str) -> Iterator[Tuple[Any, ...]]:
+    try:
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
+    finally:
+        os.remove(path)
+
+
+def sorted_by_key(
+    rows: Iterable[Dict[str, Any]],
+    key_columns: Sequence[str],
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[Tuple[Any, ...]]:
+    """Yield ``(sort_key, row)`` ordered by ``key_columns``.
+
+    Runs of ``chunk_size`` rows are sorted in memory and spilled to temporary
+    files, then merged with :func:`heapq.merge`.
+    """
+    runs: List[str] = []
+    run: List[Tuple[Any, ...]] = []
+    try:
+        for row in rows:
+            sort_key = tuple(_sortable(row.get(c)) for c in key_columns)
+            run.append((sort_key, len(run), row))
+            if len(run) >= chunk_size:
+                run.sort(key=lambda item: item[:2])
+                runs.append(_spill(run))
+                run = []
+        run.sort(key=lambda item: item[:2])
+        if not runs:
+            for sort_key, _, row in run:
+                yield sort_key, row
+            return
+        runs.append(_spill(run))
+        streams = [_read_run(p) for p in runs]
+        for sort_key, _, row in heapq.merge(*streams, key=lambda item: item[:2]):
+            yield sort_key, row
+    finally:
+        for path in runs:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def diff_rows(
+    old_rows: Iterable[Dict[str, Any]],
+    new_rows: Iterable[Dict[str, Any]],
+    key_columns: Sequence[str],
+    columns: Sequence[str],
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """Sort-merge join two row streams and yield change records.
+
+    Each record has ``change`` (``added``, ``removed`` or ``changed``), the
+    natural ``key`` and either the full ``row`` or a column-level ``delta``
+    of ``[old, new]`` pairs over ``columns``.
+    """
+    old_iter = sorted_by_key(old_rows, key_columns, chunk_size)
+    new_iter = sorted_by_key(new_rows, key_columns, chunk_size)
+    old = next(old_iter, None)
+    new = next(new_iter, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and old[0] < new[0]):
+            row = old[1]
+            yield {"change": "removed", "key": {c: row.get(c) for c in key_columns}, "row": row}
+            old = next(old_iter, None)
+        elif old is None or new[0] < old[0]:
+            row = new[1]
+            yield {"change": "added", "key": {c: row.get(c) for c in key_columns}, "row": row}
+            new = next(new_iter, None)
+        else:
+            old_row, new_row = old[1], new[1]
+            if row_digest(old_row, columns) != row_digest(new_row, columns):
+                values = (
+                    (c, plain_value(old_row.get(c)), plain_value(new_row.get(c)))
+                    for c in columns
+                )
+                delta = {c: [before, after] for c, before, after in values if before != after}
+                yield {
+                    "change": "changed",
+                    "key": {c: new_row.get(c) for c in key_columns},
+                    "delta": delta,
+                }
+            old = next(old_iter, None)
+            new = next(new_iter, None)
+
+
+def _peek_columns(rows: Iterator[Dict[str, Any]]) -> Tuple[List[str], Iterator[Dict[str, Any]]]:
+    first = next(rows, None)
+    if first is None:
+        return [], iter(())
+    return list(first.keys()), _prepend(first, rows)
+
+
+def _prepend(first: Dict[str, Any], rest: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    yield first
+    yield from rest
+
+
+def diff_table(
+    old_source,
+    new_source,
+    table: str,
+    custom_only: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """Yield change records for one table, tagged with its name.
+
+    The first record (``change == "columns"``) lists columns added or
+    removed between the versions; rows are compared on shared columns.
+    ``custom_only`` keeps only rows whose OwnerText is not ``DSC``.
+    """
+    old_columns, old_rows = _peek_columns(old_source.rows(table))
+    new_columns, new_rows = _peek_columns(new_source.rows(table))
+    if custom_only:
+        old_rows = (r for r in old_rows if is_custom(r))
+        new_rows = (r for r in new_rows if is_custom(r))
+    shared = [c for c in new_columns if c in old_columns]
+    yield {
+        "table": table,
+        "change": "columns",
+        "added": [c for c in new_columns if c not in old_columns],
+        "removed": [c for c in old_columns if c not in new_columns],
+    }
+    key_columns = natural_key(table, shared)
+    for record in diff_rows(old_rows, new_rows, key_columns, shared, chunk_size):
+        record["table"] = table
+        yield record
+
+
+def diff_sources(
+    old_source,
+    new_source,
+    tables: Optional[Sequence[str]] = None,
+    custom_only: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """Yield change records for every table present in both sources.
+
+    Tables present in only one source produce a single ``table_added`` or
+    ``table_removed`` record.
+    """
+    old_tables = set(old_source.tables())
+    new_tables = set(new_source.tables())
+    for table in sorted(old_tables | new_tables):
+        if tables and table not in tables:
+            continue
+        if table not in new_tables:
+            yield {"table": table, "change": "table_removed"}
+        elif table not in old_tables:
+            yield {"table": table, "change": "table_added"}
+        else:
+            yield from diff_table(old_source, new_source, table, custom_only, chunk_size)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Diff AstorBase tables across versions")
+    parser.add_argument("old", help="Old source: version number or sql_dump folder")
+    parser.add_argument("new", help="New source: version number or sql_dump folder")
+    parser.add_argument("-d", "--database", default="ASTORBASE", help="Database name")
+    parser.add_argument("-t", "--table", action="append", help="Limit to table (repeatable)")
+    parser.add_argument(
+        "--custom-only",
+        action="store_true",
+        help="Only compare rows whose OwnerText is not DSC",
+    )
+    parser.add_argument("-o", "--output", help="Write change records as JSON lines")
+    args = parser.parse_args()
+
+    old_source = open_source(args.old, args.database)
+    new_source = open_source(args.new, args.database)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    summary: Dict[str, Dict[str, int]] = {}
+    try:
+        for record in diff_sources(old_source, new_source, args.table, args.custom_only):
+            counts = summary.setdefault(record["table"], {})
+            counts[record["change"]] = counts.get(record["change"], 0) + 1
+            out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+    finally:
+        old_source.close()
+        new_source.close()
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"\n{old_source.label} -> {new_source.label}", file=sys.stderr)
+    for table, counts in summary.items():
+        parts = ", ".join(
+            f"{n} {change}" for change, n in counts.items() if change != "columns"
+        )
+        print(f" - {table}: {parts or 'no row changes'}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()